@@ -36,6 +36,21 @@ async function migrateFridgeTable() {
       console.log('✅ image_url column already exists');
     }
 
+    // Check if location column exists (shelf zone the item was seen in)
+    const [columns3] = await pool.execute(
+      "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = 'fridge_items' AND COLUMN_NAME = 'location'"
+    );
+
+    if (columns3.length === 0) {
+      console.log('➕ Adding location column...');
+      await pool.execute(
+        'ALTER TABLE fridge_items ADD COLUMN location VARCHAR(100) AFTER image_url'
+      );
+      console.log('✅ Added location column');
+    } else {
+      console.log('✅ location column already exists');
+    }
+
     console.log('✅ Migration completed successfully!');
     process.exit(0);
   } catch (err) {
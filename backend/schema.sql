@@ -7,12 +7,54 @@ CREATE TABLE IF NOT EXISTS devices (
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- python/setup/manage_sensor_partitions.py converts this table to monthly
+-- partitions on recorded_at (PRIMARY KEY becomes (id, recorded_at)) and
+-- drops partitions past the retention horizon once they are rolled up
 CREATE TABLE IF NOT EXISTS sensors (
   id BIGINT AUTO_INCREMENT PRIMARY KEY,
   topic VARCHAR(255) NOT NULL,
   value_json JSON NOT NULL,
   recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_topic_time (topic, recorded_at)
+  -- Typed copies of the numeric payload fields; NULL when absent or not a number
+  temp DECIMAL(10,3) AS (CASE WHEN JSON_TYPE(JSON_EXTRACT(value_json, '$.temp')) IN ('INTEGER', 'UNSIGNED INTEGER', 'DECIMAL', 'DOUBLE')
+    THEN CAST(JSON_EXTRACT(value_json, '$.temp') AS DECIMAL(10,3)) END) STORED,
+  hum DECIMAL(10,3) AS (CASE WHEN JSON_TYPE(JSON_EXTRACT(value_json, '$.hum')) IN ('INTEGER', 'UNSIGNED INTEGER', 'DECIMAL', 'DOUBLE')
+    THEN CAST(JSON_EXTRACT(value_json, '$.hum') AS DECIMAL(10,3)) END) STORED,
+  ldr INT AS (CASE WHEN JSON_TYPE(JSON_EXTRACT(value_json, '$.ldr')) IN ('INTEGER', 'UNSIGNED INTEGER', 'DECIMAL', 'DOUBLE')
+    THEN CAST(JSON_EXTRACT(value_json, '$.ldr') AS SIGNED) END) STORED,
+  pir INT AS (CASE WHEN JSON_TYPE(JSON_EXTRACT(value_json, '$.pir')) IN ('INTEGER', 'UNSIGNED INTEGER', 'DECIMAL', 'DOUBLE')
+    THEN CAST(JSON_EXTRACT(value_json, '$.pir') AS SIGNED) END) STORED,
+  ir INT AS (CASE WHEN JSON_TYPE(JSON_EXTRACT(value_json, '$.ir')) IN ('INTEGER', 'UNSIGNED INTEGER', 'DECIMAL', 'DOUBLE')
+    THEN CAST(JSON_EXTRACT(value_json, '$.ir') AS SIGNED) END) STORED,
+  -- Covers latest-per-topic lookups and typed aggregates without reading rows
+  INDEX idx_topic_time (topic, recorded_at, temp, hum, ldr, pir, ir)
+);
+
+-- Per-minute and per-hour aggregates of sensors, kept current by
+-- python/core/sensor_rollup.py. Each numeric field has count, mean,
+-- population variance, min and max so buckets can be merged exactly
+CREATE TABLE IF NOT EXISTS sensor_rollup_minute (
+  topic VARCHAR(255) NOT NULL,
+  bucket_start TIMESTAMP NOT NULL,
+  samples INT NOT NULL,
+  temp_count INT NOT NULL DEFAULT 0, temp_avg DOUBLE, temp_var DOUBLE, temp_min DOUBLE, temp_max DOUBLE,
+  hum_count INT NOT NULL DEFAULT 0, hum_avg DOUBLE, hum_var DOUBLE, hum_min DOUBLE, hum_max DOUBLE,
+  ldr_count INT NOT NULL DEFAULT 0, ldr_avg DOUBLE, ldr_var DOUBLE, ldr_min DOUBLE, ldr_max DOUBLE,
+  pir_events INT NOT NULL DEFAULT 0,
+  ir_events INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (topic, bucket_start)
+);
+
+CREATE TABLE IF NOT EXISTS sensor_rollup_hour (
+  topic VARCHAR(255) NOT NULL,
+  bucket_start TIMESTAMP NOT NULL,
+  samples INT NOT NULL,
+  temp_count INT NOT NULL DEFAULT 0, temp_avg DOUBLE, temp_var DOUBLE, temp_min DOUBLE, temp_max DOUBLE,
+  hum_count INT NOT NULL DEFAULT 0, hum_avg DOUBLE, hum_var DOUBLE, hum_min DOUBLE, hum_max DOUBLE,
+  ldr_count INT NOT NULL DEFAULT 0, ldr_avg DOUBLE, ldr_var DOUBLE, ldr_min DOUBLE, ldr_max DOUBLE,
+  pir_events INT NOT NULL DEFAULT 0,
+  ir_events INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (topic, bucket_start)
 );
 
 CREATE TABLE IF NOT EXISTS logs (
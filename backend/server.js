@@ -68,6 +68,9 @@ const mqttClient = mqtt.connect(MQTT_URL, {
 
 let latest = {}; // cache of latest sensor values
 
+// SENSOR_INGEST=python: python/core/sensor_ingest.py batches the sensors inserts instead
+const SAVE_SENSOR_ROWS = process.env.SENSOR_INGEST !== 'python';
+
 // Add error handling for MQTT connection
 mqttClient.on('error', (error) => {
   console.error('❌ MQTT Error:', error);
@@ -300,7 +303,7 @@ mqttClient.on('message', (topic, message) => {
   }
 
   // save to DB (only if it's JSON object)
-  if (typeof data === 'object') {
+  if (typeof data === 'object' && SAVE_SENSOR_ROWS) {
     pool.execute('INSERT INTO sensors (topic, value_json) VALUES (?, ?)', [
       topic,
       JSON.stringify(data)
@@ -531,9 +534,40 @@ app.get('/api/sensors/history', async (req, res) => {
     if (!topic) return res.status(400).json({ error: 'topic is required' });
 
     let interval = '24 HOUR';
-    if (period.endsWith('h')) interval = `${parseInt(period)} HOUR`;
-    if (period.endsWith('d')) interval = `${parseInt(period)} DAY`;
+    let hours = 24;
+    if (period.endsWith('h')) { interval = `${parseInt(period)} HOUR`; hours = parseInt(period); }
+    if (period.endsWith('d')) { interval = `${parseInt(period)} DAY`; hours = parseInt(period) * 24; }
+
+    // Read the rollup that fits the range: minute buckets up to 48h, hourly beyond.
+    // Points keep the sensor field names so the charts read them like raw payloads.
+    const rollupTable = hours <= 48 ? 'sensor_rollup_minute' : 'sensor_rollup_hour';
+    const [buckets] = await pool.execute(
+      `SELECT bucket_start, samples, temp_avg, hum_avg, ldr_avg, pir_events, ir_events
+       FROM ${rollupTable}
+       WHERE topic = ? AND bucket_start >= NOW() - INTERVAL ${interval}
+       ORDER BY bucket_start ASC`,
+      [topic]
+    );
+
+    if (buckets.length > 0) {
+      return res.json({
+        topic,
+        resolution: rollupTable === 'sensor_rollup_minute' ? 'minute' : 'hour',
+        points: buckets.map(b => ({
+          t: b.bucket_start,
+          v: {
+            temp: b.temp_avg,
+            hum: b.hum_avg,
+            ldr: b.ldr_avg,
+            pir: b.pir_events > 0 ? 1 : 0,
+            ir: b.ir_events > 0 ? 1 : 0,
+            samples: b.samples
+          }
+        }))
+      });
+    }
 
+    // Topics without rollups (or before the rollup job has run) read raw rows
     const [rows] = await pool.execute(
       `SELECT recorded_at, value_json 
        FROM sensors 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Command Burst Benchmark
+Fires N home/control/<device> commands at the ESP32 command receiver
+(python/core/esp32_command_receiver.py) as fast as possible and measures
+the time until every esp/ack/<device> acknowledgement has arrived, against
+the N x ACTUATION_DELAY a receiver sleeping in on_message would need.
+
+Commands toggle the devices round-robin, so every one is a real state
+change with a full actuation delay. Without --broker it starts the local
+broker stand-in and runs the receiver in-process.
+
+Usage: python python/benchmarks/bench_command_burst.py --commands 10
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+import esp32_command_receiver as receiver
+import mqtt_publisher
+from local_broker import BrokerThread
+
+
+class AckCounter:
+    def __init__(self, broker, port):
+        self.count = 0
+        self.condition = threading.Condition()
+        subscribed = threading.Event()
+        self.client = mqtt.Client()
+        self.client.on_connect = lambda client, userdata, flags, rc: client.subscribe("esp/ack/+", 1)
+        self.client.on_subscribe = lambda client, userdata, mid, granted: subscribed.set()
+        self.client.on_message = self.on_message
+        self.client.connect(broker, port, 60)
+        self.client.loop_start()
+        subscribed.wait(5)
+
+    def on_message(self, client, userdata, msg):
+        with self.condition:
+            self.count += 1
+            self.condition.notify_all()
+
+    def wait_for(self, count, timeout):
+        with self.condition:
+            return self.condition.wait_for(lambda: self.count >= count, timeout)
+
+    def close(self):
+        self.client.disconnect()
+        self.client.loop_stop()
+
+
+def start_receiver(broker, port):
+    """ESP32 command receiver on background threads, connected and subscribed"""
+    receiver.BROKER, receiver.PORT = broker, port
+    esp32 = receiver.ESP32Simulator()
+    connected = threading.Event()
+    esp32.client.on_subscribe = lambda client, userdata, mid, granted: connected.set()
+    esp32.scheduler.start()
+    esp32.client.connect(broker, port, 60)
+    esp32.client.loop_start()
+    connected.wait(5)
+    return esp32
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to acknowledge a burst of device commands")
+    parser.add_argument("--broker", help="MQTT broker host (default: in-process local broker)")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--commands", type=int, default=10)
+    args = parser.parse_args()
+
+    broker_thread = None
+    if args.broker:
+        broker, port = args.broker, args.port
+    else:
+        broker_thread = BrokerThread()
+        broker, port = "127.0.0.1", broker_thread.start()
+
+    esp32 = start_receiver(broker, port)
+    acks = AckCounter(broker, port)
+    publisher = mqtt_publisher.PersistentPublisher(broker, port)
+    publisher.wait_connected()
+
+    devices = list(esp32.device_state.devices)
+    states = dict(esp32.device_state.devices)
+    start = time.perf_counter()
+    for i in range(args.commands):
+        device = devices[i % len(devices)]
+        states[device] = "on" if states[device] == "off" else "off"
+        publisher.publish(f"home/control/{device}", states[device], qos=1)
+    complete = acks.wait_for(args.commands, timeout=args.commands * receiver.ACTUATION_DELAY + 10)
+    elapsed = time.perf_counter() - start
+
+    serial = args.commands * receiver.ACTUATION_DELAY
+    print()
+    print("📊 Command Burst Benchmark")
+    print("=" * 60)
+    print(f"🔗 Broker: {broker}:{port}, commands: {args.commands}, actuation delay: {receiver.ACTUATION_DELAY}s")
+    print(f"✅ Acknowledged: {acks.count}/{args.commands}{'' if complete else ' (timed out)'}")
+    print(f"⏱️ Time to all acks: {elapsed:.3f} s (sleeping in on_message: {serial:.1f} s)")
+    print(f"⚡ Speedup: {serial / elapsed:.1f}x")
+
+    publisher.close()
+    acks.close()
+    esp32.client.disconnect()
+    esp32.client.loop_stop()
+    esp32.scheduler.stop()
+    mqtt_publisher.close_all()
+    if broker_thread:
+        broker_thread.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Detector Replay Benchmark
+Replays frames through a freshly loaded YOLO model, the way
+YOLOFridgeDetector (python/features/yolo_fridge_detection.py) calls it,
+and reports cold (first inference) and warm (steady state) latency
+separately, then the latency of the first real frame after the startup
+warm-up (python/core/model_warmup.py) on a second fresh model.
+
+Frames come from --video (a recording, read with cv2) or are synthetic
+camera-sized frames. Needs ultralytics installed.
+
+Usage: python python/benchmarks/bench_detector_replay.py --model yolov8n.pt --frames 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from model_warmup import describe, synthetic_batch, timed, warm_up, WARMUP_RUNS
+
+
+def load_frames(video, count, width, height):
+    if not video:
+        return synthetic_batch(width, height, count, seed=1)
+    import cv2
+
+    capture = cv2.VideoCapture(video)
+    frames = []
+    while len(frames) < count:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def replay(infer, frames):
+    """Latency in ms of every frame, in order"""
+    return [timed(infer, [frame]) for frame in frames]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm detector latency on replayed frames")
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--video", help="video file to replay (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--warmup-runs", type=int, default=WARMUP_RUNS)
+    args = parser.parse_args()
+
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        print("⚠️ ultralytics not installed - install with: pip install ultralytics")
+        return
+
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    if not frames:
+        print(f"❌ No frames read from {args.video}")
+        return
+
+    model = YOLO(args.model)
+    cold_run = replay(lambda frame: model(frame, verbose=False), frames)
+    warm = cold_run[1:] or cold_run
+
+    model = YOLO(args.model)
+    warmup = warm_up(lambda frame: model(frame, verbose=False), args.width, args.height, runs=args.warmup_runs)
+    after_warmup = replay(lambda frame: model(frame, verbose=False), frames[:1])[0]
+
+    print("📊 Detector Replay Benchmark")
+    print("=" * 60)
+    print(f"🎞️ {len(frames)} frames from {args.video or 'synthetic source'}, model {args.model}")
+    print(f"🥶 Cold (first frame):        {cold_run[0]:8.1f} ms")
+    print(f"🔥 Warm (p50 / p95):          {statistics.median(warm):8.1f} / {percentile(warm, 0.95):.1f} ms")
+    print(f"⏱️ Warm-up at startup:        {describe(warmup)}")
+    print(f"✅ First frame after warm-up: {after_warmup:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Import Time Benchmark
+Imports each camera/detection script in a fresh interpreter with
+`python -X importtime` and reports the cumulative import time of the module
+itself, plus whether importing it pulled in cv2, torch, ultralytics or
+face_recognition. Importing a script must not load models, open sockets or
+create directories; that all happens in its main().
+
+Usage: python python/benchmarks/bench_import_time.py --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+MODULES = [
+    ("core", "face_recognition_simple"),
+    ("network", "real_esp8266_integration"),
+    ("features", "face_recognition_entry"),
+    ("features", "fridge_detection"),
+    ("features", "fridge_detection_improved"),
+    ("features", "yolo_fridge_detection"),
+]
+HEAVY_MODULES = ("cv2", "torch", "ultralytics", "face_recognition", "dlib")
+
+PROBE = (
+    "import sys\n"
+    "sys.path[:0] = {paths!r}\n"
+    "import {module}\n"
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))\n"
+)
+
+
+def import_time(folder, module):
+    """(cumulative import time in ms, heavy modules loaded) for one fresh import"""
+    paths = [os.path.join(PYTHON_DIR, folder), os.path.join(PYTHON_DIR, 'core')]
+    code = PROBE.format(paths=paths, module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    # stderr lines: "import time: <self us> | <cumulative us> | <indented name>"
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative_ms = int(fields[1]) / 1000
+            return cumulative_ms, [m for m in result.stdout.strip().split(",") if m]
+    raise RuntimeError(f"{module} not in -X importtime output")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import cost of the detection scripts")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("📊 Import Time Benchmark")
+    print("=" * 72)
+    print(f"⏱️ Median of {args.runs} fresh interpreters per module")
+    print()
+    print(f"{'module':<28} {'import (ms)':>12}  heavy modules loaded")
+    for folder, module in MODULES:
+        try:
+            runs = [import_time(folder, module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{module:<28} {'failed':>12}  {e}")
+            continue
+        median = statistics.median(ms for ms, _ in runs)
+        heavy = runs[-1][1]
+        print(f"{module:<28} {median:>12.1f}  {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+MQTT Publish Benchmark
+Compares messages per second for paho.mqtt.publish.single (connect,
+publish, disconnect per message) against the persistent shared client
+in python/core/mqtt_publisher.py
+
+Usage: python python/benchmarks/bench_mqtt_publish.py --broker localhost --count 500
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import paho.mqtt.publish as publish
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from mqtt_publisher import PersistentPublisher
+
+TOPIC = "bench/sensors"
+
+
+def sample_payload(i):
+    return json.dumps({
+        "temp": 25.3,
+        "hum": 61.2,
+        "ldr": 312,
+        "pir": 0,
+        "ir": 0,
+        "seq": i,
+        "timestamp": time.time()
+    })
+
+
+def bench_single(broker, port, count, qos):
+    start = time.perf_counter()
+    for i in range(count):
+        publish.single(TOPIC, sample_payload(i), qos=qos, hostname=broker, port=port)
+    return time.perf_counter() - start
+
+
+def bench_persistent(broker, port, count, qos):
+    publisher = PersistentPublisher(broker, port)
+    if not publisher.wait_connected():
+        raise ConnectionError(f"Could not connect to {broker}:{port}")
+
+    start = time.perf_counter()
+    infos = [publisher.publish(TOPIC, sample_payload(i), qos=qos) for i in range(count)]
+    for info in infos:
+        info.wait_for_publish()
+    elapsed = time.perf_counter() - start
+
+    publisher.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="publish.single vs persistent MQTT client")
+    parser.add_argument("--broker", default="localhost")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--qos", type=int, default=0, choices=[0, 1])
+    args = parser.parse_args()
+
+    print("📊 MQTT Publish Benchmark")
+    print("=" * 60)
+    print(f"🔗 Broker: {args.broker}:{args.port}, messages: {args.count}, QoS: {args.qos}")
+    print()
+
+    results = {}
+    for name, bench in (("publish.single", bench_single), ("persistent", bench_persistent)):
+        elapsed = bench(args.broker, args.port, args.count, args.qos)
+        results[name] = args.count / elapsed
+        print(f"{name:<16} {elapsed:8.3f} s  {results[name]:10.1f} msg/s")
+
+    print()
+    print(f"⚡ Speedup: {results['persistent'] / results['publish.single']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Report-by-Exception Benchmark
+Replays an hour (by default) of 2-second samples from the sensor data
+generators through ExceptionReporter (python/core/report_by_exception.py)
+and reports how many messages, and bytes, reach the broker and the
+sensors table against publishing every sample.
+
+Profiles:
+  simulator   continuous_esp32_simulator.generate_sensor_data (also the
+              distribution of esp32_network_simulator)
+  enhanced    EnhancedSensorData pattern-based samples with the default
+              patterns (needs mysql.connector importable)
+  drift       slowly drifting signals with occasional motion, closer to
+              what real DHT/LDR hardware reports
+
+Usage: python python/benchmarks/bench_report_by_exception.py --hours 1 --max-silence 30
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'features'))
+from continuous_esp32_simulator import generate_sensor_data
+from report_by_exception import ExceptionReporter, MAX_SILENCE
+
+SAMPLE_INTERVAL = 2  # seconds, like the simulators
+
+
+def enhanced_generator():
+    from enhanced_sensor_data import EnhancedSensorData, patterns_from_stats
+
+    system = EnhancedSensorData.__new__(EnhancedSensorData)  # skip the database connection
+    system.db_connection = None
+    system.historical_patterns = patterns_from_stats({})
+    system.hourly_patterns = {}
+    return system.generate_enhanced_sensor_data
+
+
+def drift_generator():
+    state = {"temp": 25.0, "hum": 60.0, "ldr": 300.0}
+    motion = [0]
+
+    def generate():
+        state["temp"] += random.gauss(0, 0.03)
+        state["hum"] += random.gauss(0, 0.1)
+        state["ldr"] += random.gauss(0, 2)
+        if motion[0]:
+            motion[0] -= 1
+        elif random.random() < 0.01:  # someone walks by about every 3 minutes
+            motion[0] = random.randint(2, 10)
+        return {"temp": round(state["temp"], 1), "hum": round(state["hum"], 1), "ldr": int(state["ldr"]),
+                "pir": 1 if motion[0] else 0, "ir": 1 if motion[0] else 0}
+    return generate
+
+
+PROFILES = {
+    "simulator": lambda: generate_sensor_data,
+    "enhanced": enhanced_generator,
+    "drift": drift_generator
+}
+
+
+def replay(generate, samples, max_silence):
+    reporter = ExceptionReporter(max_silence=max_silence)
+    all_bytes = published_bytes = 0
+    for i in range(samples):
+        now = i * SAMPLE_INTERVAL
+        sample = dict(generate(), timestamp=now)
+        size = len(json.dumps(sample))
+        all_bytes += size
+        publish, reason = reporter.should_publish(sample, now)
+        if publish:
+            reporter.published(sample, reason, now)
+            published_bytes += size
+    return reporter, all_bytes, published_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Messages suppressed by report-by-exception")
+    parser.add_argument("--hours", type=float, default=1)
+    parser.add_argument("--max-silence", type=float, default=MAX_SILENCE)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    samples = int(args.hours * 3600 / SAMPLE_INTERVAL)
+    print("📊 Report-by-Exception Benchmark")
+    print("=" * 72)
+    print(f"⏱️ {samples} samples every {SAMPLE_INTERVAL}s, heartbeat after {args.max_silence:g}s of silence")
+    print()
+    print(f"{'profile':<11} {'published':>10} {'suppressed':>11} {'bytes saved':>12}  top reasons")
+    for name, load in PROFILES.items():
+        try:
+            generate = load()
+        except ImportError as e:
+            print(f"{name:<11} skipped ({e})")
+            continue
+        reporter, all_bytes, published_bytes = replay(generate, samples, args.max_silence)
+        reasons = sorted(reporter.stats["reasons"].items(), key=lambda item: -item[1])[:3]
+        print(f"{name:<11} {reporter.stats['published']:>10} {reporter.suppression_ratio():>11.0%} "
+              f"{1 - published_bytes / all_bytes:>12.0%}  {', '.join(f'{r}={n}' for r, n in reasons)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Sensor Codec Benchmark
+Payload size and encode/decode throughput of the JSON esp/sensors samples
+against the compact schema 1 encoding in python/core/sensor_codec.py, for
+the sample shapes the simulators publish.
+
+Usage: python python/benchmarks/bench_sensor_codec.py --count 100000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+import sensor_codec
+from continuous_esp32_simulator import generate_sensor_data
+
+
+def sample_shapes():
+    """One sample of each shape published on esp/sensors"""
+    basic = generate_sensor_data()
+    network = dict(basic, hardware_ip="192.168.1.50", source="hardware_machine")
+    enhanced = dict(basic, source="enhanced_database", pattern_based=True)
+    return {"continuous simulator": basic, "network simulator": network, "enhanced (database)": enhanced}
+
+
+def rate(func, items, count):
+    start = time.perf_counter()
+    for i in range(count):
+        func(items[i % len(items)])
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON vs compact binary sensor payloads")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    shapes = sample_shapes()
+    print("📊 Sensor Codec Benchmark")
+    print("=" * 60)
+    print(f"{'sample':<22} {'json B':>8} {'binary B':>9} {'saved':>7}")
+    for name, sample in shapes.items():
+        json_size = len(json.dumps(sample).encode())
+        binary_size = len(sensor_codec.encode(sample))
+        print(f"{name:<22} {json_size:>8} {binary_size:>9} {1 - binary_size / json_size:>6.0%}")
+
+    samples = [generate_sensor_data() for _ in range(1000)]
+    json_payloads = [json.dumps(sample).encode() for sample in samples]
+    binary_payloads = [sensor_codec.encode(sample) for sample in samples]
+
+    print()
+    print(f"{'operation':<22} {'json msg/s':>12} {'binary msg/s':>13}")
+    encode_json = rate(lambda sample: json.dumps(sample).encode(), samples, args.count)
+    encode_binary = rate(sensor_codec.encode, samples, args.count)
+    print(f"{'encode':<22} {encode_json:>12,.0f} {encode_binary:>13,.0f}")
+    decode_json = rate(lambda payload: sensor_codec.decode_message(sensor_codec.TOPIC_SENSORS, payload),
+                       json_payloads, args.count)
+    decode_binary = rate(lambda payload: sensor_codec.decode_message(sensor_codec.TOPIC_SENSORS_BIN, payload),
+                         binary_payloads, args.count)
+    print(f"{'decode':<22} {decode_json:>12,.0f} {decode_binary:>13,.0f}")
+
+    # MQTT PUBLISH overhead: fixed header (2) + topic length (2) + topic
+    overhead_json = 4 + len(sensor_codec.TOPIC_SENSORS)
+    overhead_binary = 4 + len(sensor_codec.TOPIC_SENSORS_BIN)
+    json_wire = overhead_json + sum(map(len, json_payloads)) / len(json_payloads)
+    binary_wire = overhead_binary + sum(map(len, binary_payloads)) / len(binary_payloads)
+    print()
+    print(f"📡 QoS 0 PUBLISH on the wire: {json_wire:.0f} B JSON vs {binary_wire:.0f} B binary "
+          f"({json_wire / binary_wire:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
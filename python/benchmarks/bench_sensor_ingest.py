@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Sensor Ingest Benchmark
+Sustained rows per second into the sensors table for the batched ingest
+service (python/core/sensor_ingest.py), end to end from MQTT publish to
+committed rows, against one INSERT and commit per message as server.js
+does it.
+
+Needs the MySQL database from DB_CONFIG in sensor_ingest.py. Rows are
+written under the esp/bench topic and deleted afterwards unless --keep is
+given. Without --broker it starts the local broker stand-in in-process.
+
+Usage: python python/benchmarks/bench_sensor_ingest.py --count 20000 --batch-size 500
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+import sensor_ingest
+from continuous_esp32_simulator import generate_sensor_data
+from local_broker import BrokerThread
+from mqtt_publisher import PersistentPublisher
+
+TOPIC = "esp/bench"
+
+
+def bench_per_row(connection, payloads):
+    """Baseline: one INSERT and commit per message"""
+    cursor = connection.cursor()
+    start = time.perf_counter()
+    for payload in payloads:
+        cursor.execute("INSERT INTO sensors (topic, value_json) VALUES (%s, %s)", (TOPIC, payload))
+        connection.commit()
+    elapsed = time.perf_counter() - start
+    cursor.close()
+    return elapsed
+
+
+def bench_batched(broker, port, payloads, batch_size, flush_interval, spill_path):
+    """Publish every payload and wait until the ingest service has committed them all"""
+    pool = sensor_ingest.create_pool()
+    ingest = sensor_ingest.SensorIngest(pool.get_connection, batch_size, flush_interval,
+                                        sensor_ingest.SpillFile(spill_path))
+    ingest.start()
+    client = sensor_ingest.create_client(ingest, broker, port, client_id="sensor-ingest-bench")
+    client.loop_start()
+    publisher = PersistentPublisher(broker, port)
+    if not publisher.wait_connected():
+        raise ConnectionError(f"Could not connect to {broker}:{port}")
+    time.sleep(0.5)  # let the ingest subscription settle
+
+    start = time.perf_counter()
+    for i, payload in enumerate(payloads):
+        info = publisher.publish(TOPIC, payload, qos=1)
+        if i % 500 == 499:
+            info.wait_for_publish()  # stay inside the publisher's queue bound
+    while ingest.stats["rows_written"] < len(payloads):
+        if time.perf_counter() - start > 120:
+            raise TimeoutError(f"Only {ingest.stats['rows_written']} of {len(payloads)} rows written")
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    publisher.close()
+    client.disconnect()
+    client.loop_stop()
+    ingest.stop()
+    return elapsed, ingest.stats
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description="Batched vs per-row sensor ingest throughput")
+    parser.add_argument("--broker", help="MQTT broker host (default: in-process local broker)")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=sensor_ingest.BATCH_SIZE)
+    parser.add_argument("--flush-interval", type=float, default=sensor_ingest.FLUSH_INTERVAL)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark rows")
+    args = parser.parse_args()
+
+    broker_thread = None
+    if args.broker:
+        broker, port = args.broker, args.port
+    else:
+        broker_thread = BrokerThread()
+        broker, port = "127.0.0.1", broker_thread.start()
+
+    payloads = [json.dumps(generate_sensor_data()) for _ in range(args.count)]
+    connection = mysql.connector.connect(**sensor_ingest.DB_CONFIG)
+
+    print("📊 Sensor Ingest Benchmark")
+    print("=" * 60)
+    print(f"🔗 Broker: {broker}:{port}, rows: {args.count}, batch size: {args.batch_size}")
+    print()
+
+    try:
+        baseline_count = min(args.count, 2000)  # per-row commits are slow; a sample is enough
+        elapsed = bench_per_row(connection, payloads[:baseline_count])
+        per_row = baseline_count / elapsed
+        print(f"{'per-row commit':<16} {elapsed:8.3f} s  {per_row:10.1f} rows/s  ({baseline_count} rows)")
+
+        elapsed, stats = bench_batched(broker, port, payloads, args.batch_size, args.flush_interval,
+                                       sensor_ingest.SPILL_FILE + ".bench")
+        batched = args.count / elapsed
+        print(f"{'batched ingest':<16} {elapsed:8.3f} s  {batched:10.1f} rows/s  ({stats['batches']} batches)")
+        print()
+        print(f"⚡ Speedup: {batched / per_row:.1f}x")
+    finally:
+        if not args.keep:
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM sensors WHERE topic = %s", (TOPIC,))
+            connection.commit()
+            cursor.close()
+        connection.close()
+        if broker_thread:
+            broker_thread.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tiled Inference Benchmark
+Runs a YOLO model over labelled fridge images twice - on the full image
+and with slicing-aided tiling (python/core/tiled_inference.py) - and
+reports per-class recall and the added latency, so tiling is only
+configured for the zones and classes where it pays off.
+
+Labels are YOLO text files next to the images (or in --labels): one
+"<class id> <cx> <cy> <w> <h>" line per object, normalised to the image
+size, with class ids of the model. Needs ultralytics and cv2.
+
+Usage: python python/benchmarks/bench_tiled_inference.py --images data/fridge --classes egg,bottle --tile 320
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from tiled_inference import Tiling, overlap_ratios, TILE_OVERLAP, TILE_SIZE
+
+MATCH_IOU = 0.5
+
+
+def load_labels(path, names, width, height):
+    """[(label, box)] from a YOLO label file"""
+    if not os.path.exists(path):
+        return []
+    objects = []
+    with open(path) as f:
+        for line in f:
+            class_id, cx, cy, w, h = line.split()[:5]
+            cx, cy, w, h = float(cx) * width, float(cy) * height, float(w) * width, float(h) * height
+            objects.append((names[int(class_id)], (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)))
+    return objects
+
+
+def matched(truth, detections):
+    """Ground-truth objects found by a same-class detection with IoU >= MATCH_IOU"""
+    used, hits = set(), []
+    for label, box in truth:
+        for i, (det_label, _, det_box) in enumerate(detections):
+            if i not in used and det_label == label and overlap_ratios(box, det_box)[0] >= MATCH_IOU:
+                used.add(i)
+                hits.append(label)
+                break
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs latency of tiled inference")
+    parser.add_argument("--images", required=True, help="directory of .jpg/.png images")
+    parser.add_argument("--labels", help="directory of YOLO label files (default: next to images)")
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--classes", help="comma-separated classes tiles may add (default: all)")
+    parser.add_argument("--tile", type=int, default=TILE_SIZE)
+    parser.add_argument("--overlap", type=float, default=TILE_OVERLAP)
+    parser.add_argument("--conf", type=float, default=0.25)
+    args = parser.parse_args()
+
+    try:
+        import cv2
+        from ultralytics import YOLO
+    except ImportError as e:
+        print(f"⚠️ {e.name} not installed - this benchmark needs ultralytics and opencv-python")
+        return
+
+    model = YOLO(args.model)
+    tiling = Tiling(args.tile, args.overlap, args.classes.split(",") if args.classes else None)
+
+    def infer(images):
+        return [[(model.names[int(box.cls[0])], float(box.conf[0]), tuple(map(float, box.xyxy[0])))
+                 for box in result.boxes]
+                for result in model(images, verbose=False, conf=args.conf)]
+
+    paths = sorted(glob.glob(os.path.join(args.images, "*.jpg")) + glob.glob(os.path.join(args.images, "*.png")))
+    if not paths:
+        print(f"❌ No images in {args.images}")
+        return
+    infer([cv2.imread(paths[0])])  # warm-up, not timed
+
+    totals, hits = {}, {"full": {}, "tiled": {}}
+    latency = {"full": [], "tiled": []}
+    for path in paths:
+        image = cv2.imread(path)
+        height, width = image.shape[:2]
+        label_dir = args.labels or os.path.dirname(path)
+        truth = load_labels(os.path.join(label_dir, os.path.splitext(os.path.basename(path))[0] + ".txt"),
+                            model.names, width, height)
+        for label, _ in truth:
+            totals[label] = totals.get(label, 0) + 1
+
+        start = time.perf_counter()
+        full = infer([image])[0]
+        latency["full"].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        tiles = tiling.tiles(image)
+        results = infer([image] + [tile for _, tile in tiles])
+        tiled = tiling.merge(results[0], results[1:], [origin for origin, _ in tiles])
+        latency["tiled"].append((time.perf_counter() - start) * 1000)
+
+        for mode, detections in (("full", full), ("tiled", tiled)):
+            for label in matched(truth, detections):
+                hits[mode][label] = hits[mode].get(label, 0) + 1
+
+    full_ms, tiled_ms = statistics.median(latency["full"]), statistics.median(latency["tiled"])
+    print("📊 Tiled Inference Benchmark")
+    print("=" * 64)
+    print(f"🖼️ {len(paths)} images, model {args.model}, tiles {args.tile}px with {args.overlap:.0%} overlap, "
+          f"{len(tiling.tiles(image))} tiles per image")
+    print(f"⏱️ Median latency: full {full_ms:.1f} ms, tiled {tiled_ms:.1f} ms (+{tiled_ms - full_ms:.1f} ms)")
+    print()
+    print(f"{'class':<14} {'objects':>8} {'recall full':>12} {'recall tiled':>13}")
+    for label, total in sorted(totals.items(), key=lambda item: -item[1]):
+        print(f"{label:<14} {total:>8} {hits['full'].get(label, 0) / total:>12.0%} "
+              f"{hits['tiled'].get(label, 0) / total:>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Latency Collector
+Subscribes to every topic, picks up the trace stamped into payloads by the
+simulators and face recognition scripts (see python/core/latency_trace.py)
+and prints per-stage latency histograms, from the sensor publish on
+esp/sensors to the esp/cam result arriving here - the same hop the
+dashboard sees.
+
+Usage: python python/benchmarks/latency_collector.py --broker broker-cn.emqx.io
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+import latency_trace
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, float("inf")]
+BAR_WIDTH = 40
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LatencyCollector:
+    def __init__(self):
+        self.samples = defaultdict(list)   # "from → to" -> [seconds]
+        self.seen = set()                  # (trace id, stage count) already counted
+        self.traces = 0
+
+    def add(self, data):
+        """Record the stage deltas of one payload; returns False if it has no trace"""
+        trace = data.get("trace") if isinstance(data, dict) else None
+        if not isinstance(trace, dict) or not trace.get("stages"):
+            return False
+        key = (trace.get("id"), len(trace["stages"]))
+        if key in self.seen:
+            return True
+        self.seen.add(key)
+        self.traces += 1
+
+        latency_trace.mark(trace, "collected")
+        deltas = latency_trace.stage_deltas(trace)
+        for start, end, seconds in deltas:
+            self.samples[f"{start} → {end}"].append(seconds)
+        if len(deltas) > 1 and len(deltas) == len(trace["stages"]) - 1:
+            first, last = trace["stages"][0], trace["stages"][-1]
+            self.samples[f"{first[0]} → {last[0]} (total)"].append(last[1] - first[1])
+        return True
+
+    def report(self):
+        lines = [f"📊 Latency by stage ({self.traces} traced messages)", "=" * 60]
+        if not self.samples:
+            lines.append("No traced messages yet")
+        for label, values in sorted(self.samples.items(), key=lambda item: -max(item[1])):
+            values_ms = [value * 1000 for value in values]
+            lines.append(f"{label}: n={len(values_ms)} p50={percentile(values_ms, 50):.1f}ms "
+                         f"p95={percentile(values_ms, 95):.1f}ms max={max(values_ms):.1f}ms")
+            lines.extend(histogram(values_ms))
+            lines.append("")
+        return "\n".join(lines)
+
+
+def histogram(values_ms):
+    """Text histogram over BUCKETS_MS, skipping empty leading/trailing buckets"""
+    counts = [0] * len(BUCKETS_MS)
+    for value in values_ms:
+        for i, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                counts[i] += 1
+                break
+    used = [i for i, count in enumerate(counts) if count]
+    if not used:
+        return []
+    peak = max(counts)
+    lines = []
+    for i in range(used[0], used[-1] + 1):
+        bound = BUCKETS_MS[i]
+        label = f"≤{bound:g}ms" if bound != float("inf") else f">{BUCKETS_MS[-2]:g}ms"
+        bar = "█" * max(1 if counts[i] else 0, round(counts[i] / peak * BAR_WIDTH))
+        lines.append(f"  {label:>9} {counts[i]:6d} {bar}")
+    return lines
+
+
+def main():
+    import paho.mqtt.client as mqtt
+
+    parser = argparse.ArgumentParser(description="Per-stage latency collector for traced MQTT payloads")
+    parser.add_argument("--broker", default="broker-cn.emqx.io")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--topic", default="#")
+    parser.add_argument("--interval", type=float, default=30, help="seconds between reports")
+    args = parser.parse_args()
+
+    collector = LatencyCollector()
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            print(f"✅ Connected to {args.broker}:{args.port}, collecting traces on '{args.topic}'")
+            client.subscribe(args.topic)
+        else:
+            print("❌ Failed to connect, return code:", rc)
+
+    def on_message(client, userdata, msg):
+        try:
+            collector.add(json.loads(msg.payload.decode()))
+        except (ValueError, UnicodeDecodeError):
+            pass  # not JSON, cannot carry a trace
+
+    client = mqtt.Client()
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.connect(args.broker, args.port, 60)
+    client.loop_start()
+
+    try:
+        while True:
+            time.sleep(args.interval)
+            print(collector.report())
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping latency collector...")
+    finally:
+        client.loop_stop()
+        client.disconnect()
+        print(collector.report())
+
+
+if __name__ == "__main__":
+    main()
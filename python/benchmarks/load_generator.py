@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Virtual Device Load Generator
+Simulates thousands of ESP32/ESP8266 devices with asyncio to size the MQTT
+broker and the Express ingest in backend/server.js. Each device publishes
+samples from continuous_esp32_simulator.generate_sensor_data() on its own
+topic (<prefix>/<device>/sensors, by default esp/sim/<device>/sensors so
+server.js's esp/# subscription ingests it), on a jittered 2 s schedule,
+with short faster-rate PIR bursts when motion is detected.
+
+Devices are multiplexed over a pool of MQTT connections. The number of
+active devices follows a ramp of "devices:seconds" stages, and the run
+ends with a summary of achieved publish rate, publish latency percentiles
+(PUBACK round trip at QoS 1) and errors.
+
+Without --broker it starts the local broker stand-in in-process.
+
+Usage: python python/benchmarks/load_generator.py --ramp 500:10,2000:20,2000:30
+       --topic-prefix sim   keeps the load away from the Express ingest (broker only)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+import mqtt_wire as wire
+from continuous_esp32_simulator import generate_sensor_data
+from local_broker import LocalBroker
+
+ACK_TIMEOUT = 10          # seconds before an unacknowledged QoS 1 publish counts as an error
+BURST_INTERVAL = 0.5      # seconds between samples during a PIR burst
+BURST_SAMPLES = (3, 8)    # samples per PIR burst
+TOPIC_PREFIX = "esp/sim"  # under esp/#, which backend/server.js subscribes to
+
+
+def parse_ramp(text):
+    """'500:10,2000:20' -> [(500, 10.0), (2000, 20.0)]"""
+    stages = []
+    for stage in text.split(','):
+        devices, seconds = stage.split(':')
+        stages.append((int(devices), float(seconds)))
+    return stages
+
+
+def active_devices(stages, elapsed):
+    """Number of active devices at a point in the ramp (linear within each stage)"""
+    previous = 0
+    for devices, seconds in stages:
+        if elapsed < seconds:
+            return int(previous + (devices - previous) * elapsed / seconds)
+        elapsed -= seconds
+        previous = devices
+    return previous
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Stats:
+    def __init__(self):
+        self.attempted = 0
+        self.published = 0
+        self.errors = {}
+        self.latencies = []
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+class Connection:
+    """One MQTT connection shared by a group of virtual devices"""
+
+    def __init__(self, name, host, port, qos, stats):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.qos = qos
+        self.stats = stats
+        self.reader = None
+        self.writer = None
+        self.inflight = {}  # packet_id -> send time
+        self.next_packet_id = 0
+        self.reader_task = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(wire.connect(self.name))
+        await self.writer.drain()
+        packet = await wire.read_packet(self.reader)
+        if packet is None or packet[0] != wire.CONNACK or packet[2][1] != 0:
+            raise ConnectionError(f"{self.name}: CONNECT refused")
+        self.reader_task = asyncio.create_task(self.read_acks())
+
+    async def read_acks(self):
+        while True:
+            packet = await wire.read_packet(self.reader)
+            if packet is None:
+                break
+            if packet[0] == wire.PUBACK:
+                sent_at = self.inflight.pop(wire.parse_packet_id(packet[2]), None)
+                if sent_at is not None:
+                    self.stats.published += 1
+                    self.stats.latencies.append(time.perf_counter() - sent_at)
+
+    async def publish(self, topic, payload):
+        self.stats.attempted += 1
+        if self.writer is None or self.writer.is_closing():
+            self.stats.error("not_connected")
+            return
+        try:
+            if self.qos:
+                self.next_packet_id = self.next_packet_id % 65535 + 1
+                packet_id = self.next_packet_id
+                self.inflight[packet_id] = time.perf_counter()
+                self.writer.write(wire.publish(topic, payload, 1, packet_id=packet_id))
+                await self.writer.drain()
+            else:
+                sent_at = time.perf_counter()
+                self.writer.write(wire.publish(topic, payload))
+                await self.writer.drain()
+                self.stats.published += 1
+                self.stats.latencies.append(time.perf_counter() - sent_at)
+        except (ConnectionError, OSError):
+            self.stats.error("write_failed")
+
+    def expire_inflight(self, now):
+        for packet_id, sent_at in list(self.inflight.items()):
+            if now - sent_at > ACK_TIMEOUT:
+                del self.inflight[packet_id]
+                self.stats.error("ack_timeout")
+
+    async def close(self):
+        if self.writer is not None:
+            try:
+                self.writer.write(wire.disconnect())
+                await self.writer.drain()
+            except (ConnectionError, OSError):
+                pass
+            self.writer.close()
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+
+
+class VirtualDevice:
+    def __init__(self, index, connection, interval, jitter, burst_probability, topic_prefix=TOPIC_PREFIX):
+        self.index = index
+        self.kind = "esp32" if index % 2 == 0 else "esp8266"
+        self.device_id = f"{self.kind}-{index:05d}"
+        self.topic = f"{topic_prefix.rstrip('/')}/{self.device_id}/sensors"
+        self.connection = connection
+        self.interval = interval
+        self.jitter = jitter
+        self.burst_probability = burst_probability
+        self.burst_left = 0
+
+    def next_sample(self):
+        data = generate_sensor_data()
+        # The simulator's own 10% motion chance becomes the start of a burst
+        if self.burst_left == 0 and (data['pir'] == 1 and random.random() < self.burst_probability * 10):
+            self.burst_left = random.randint(*BURST_SAMPLES)
+        if self.burst_left:
+            self.burst_left -= 1
+            data['pir'] = 1
+            data['ir'] = 1
+        else:
+            data['pir'] = 0
+            data['ir'] = 0
+        data['device'] = self.device_id
+        data['hardware'] = self.kind
+        return data
+
+    def next_delay(self):
+        if self.burst_left:
+            return BURST_INTERVAL
+        return max(0.05, self.interval + random.uniform(-self.jitter, self.jitter))
+
+    async def run(self, generator):
+        # Spread the first publishes over one interval
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while not generator.finished:
+            if self.index < generator.active:
+                await self.connection.publish(self.topic, json.dumps(self.next_sample()))
+                await asyncio.sleep(self.next_delay())
+            else:
+                await asyncio.sleep(0.25)
+
+
+class LoadGenerator:
+    def __init__(self, args):
+        self.args = args
+        self.stages = parse_ramp(args.ramp)
+        self.duration = sum(seconds for _, seconds in self.stages)
+        self.max_devices = max(devices for devices, _ in self.stages)
+        self.stats = Stats()
+        self.active = 0
+        self.finished = False
+
+    async def run(self):
+        broker = None
+        host, port = self.args.broker, self.args.port
+        if host is None:
+            broker = LocalBroker()
+            port = await broker.start()
+            host = "127.0.0.1"
+            print(f"🧪 Started local broker stand-in on {host}:{port}")
+
+        connection_count = min(self.args.connections, self.max_devices)
+        connections = [Connection(f"loadgen-{i}", host, port, self.args.qos, self.stats)
+                       for i in range(connection_count)]
+        results = await asyncio.gather(*(c.connect() for c in connections), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.stats.error("connect_failed")
+
+        devices = [VirtualDevice(i, connections[i % connection_count], self.args.interval,
+                                 self.args.jitter, self.args.burst_probability, self.args.topic_prefix)
+                   for i in range(self.max_devices)]
+        print(f"🚀 {self.max_devices} virtual devices over {connection_count} connections, {self.duration:.0f}s ramp "
+              f"on {devices[0].topic.replace(devices[0].device_id, '<device>')}")
+
+        tasks = [asyncio.create_task(device.run(self)) for device in devices]
+        start = time.perf_counter()
+        last_report = start
+        last_published = 0
+        while True:
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.duration:
+                break
+            self.active = active_devices(self.stages, elapsed)
+            now = time.perf_counter()
+            for connection in connections:
+                connection.expire_inflight(now)
+            if now - last_report >= 5:
+                rate = (self.stats.published - last_published) / (now - last_report)
+                print(f"⏱️ {elapsed:5.1f}s  active={self.active:6d}  rate={rate:8.1f} msg/s  errors={sum(self.stats.errors.values())}")
+                last_report, last_published = now, self.stats.published
+            await asyncio.sleep(0.25)
+
+        self.finished = True
+        # Give outstanding PUBACKs a moment to arrive
+        await asyncio.sleep(min(2.0, ACK_TIMEOUT))
+        elapsed = time.perf_counter() - start
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for connection in connections:
+            for _ in connection.inflight:
+                self.stats.error("unacknowledged")
+            await connection.close()
+        if broker is not None:
+            await broker.stop()
+
+        self.print_summary(elapsed, broker)
+
+    def print_summary(self, elapsed, broker):
+        stats = self.stats
+        latencies_ms = [latency * 1000 for latency in stats.latencies]
+        print()
+        print("📊 Load Generator Summary")
+        print("=" * 60)
+        print(f"Duration:          {elapsed:.1f} s")
+        print(f"Peak devices:      {self.max_devices}")
+        print(f"Publishes:         {stats.published} / {stats.attempted} attempted (QoS {self.args.qos})")
+        print(f"Achieved rate:     {stats.published / elapsed:.1f} msg/s")
+        print(f"Latency p50:       {percentile(latencies_ms, 50):.2f} ms")
+        print(f"Latency p95:       {percentile(latencies_ms, 95):.2f} ms")
+        print(f"Latency p99:       {percentile(latencies_ms, 99):.2f} ms")
+        print(f"Latency max:       {max(latencies_ms) if latencies_ms else 0:.2f} ms")
+        print(f"Errors:            {sum(stats.errors.values())} {stats.errors if stats.errors else ''}")
+        if broker is not None:
+            print(f"Broker messages:   {broker.messages_in} in, {broker.messages_out} out")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="High fan-out virtual ESP32/ESP8266 load generator")
+    parser.add_argument("--broker", default=None, help="MQTT broker host (default: in-process local broker)")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--ramp", default="1000:10,1000:20", help="devices:seconds stages, ramped linearly")
+    parser.add_argument("--connections", type=int, default=100, help="MQTT connections shared by the devices")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between samples per device")
+    parser.add_argument("--jitter", type=float, default=0.5, help="+/- seconds of schedule jitter")
+    parser.add_argument("--burst-probability", type=float, default=0.01, help="chance per sample that a PIR burst starts")
+    parser.add_argument("--qos", type=int, default=1, choices=[0, 1])
+    parser.add_argument("--topic-prefix", default=TOPIC_PREFIX,
+                        help="devices publish on <prefix>/<device>/sensors; keep it under esp/ to reach server.js")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(LoadGenerator(args).run())
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping load generator...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Actuation Scheduler
+asyncio event loop on its own thread for simulated device actuation, so an
+MQTT on_message callback schedules the delayed completion and returns
+instead of sleeping on the network thread. Delays of commands that arrive
+together overlap: ten 0.5 s actuations finish after about 0.5 s, not 5 s.
+"""
+
+import asyncio
+import threading
+
+
+class ActuationScheduler:
+    def __init__(self, name="actuation"):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self.condition = threading.Condition()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        self.thread.start()
+
+    def schedule(self, delay, func, *args):
+        """Run func(*args) on the scheduler thread after `delay` seconds; safe from any thread"""
+        with self.condition:
+            self.pending += 1
+        self.loop.call_soon_threadsafe(self.loop.call_later, delay, self._run, func, args)
+
+    def _run(self, func, args):
+        try:
+            func(*args)
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ Actuation failed: {e}")
+        finally:
+            with self.condition:
+                self.pending -= 1
+                self.completed += 1
+                self.condition.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """Block until every scheduled actuation has run; False on timeout"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending == 0, timeout)
+
+    def stop(self, timeout=5):
+        """Let scheduled actuations finish (up to timeout), then stop the loop"""
+        if self.thread.is_alive():
+            self.wait_idle(timeout)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout)
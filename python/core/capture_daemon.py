@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Camera Capture Daemon
+Owns the camera: decodes frames once and publishes them on the shared-memory
+frame bus (frame_bus.py) so the face recognizer and the fridge detectors can
+run at the same time on one camera. Start it first, then run the consumers
+with FRAME_BUS=<name>.
+
+Usage: python python/core/capture_daemon.py --camera 0 --width 640 --height 480
+"""
+
+import argparse
+import time
+
+from frame_bus import FrameRing, FRAME_BUS_NAME, SLOTS
+
+STATS_INTERVAL = 10  # seconds between frame rate reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish camera frames on the shared-memory frame bus")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--name", default=FRAME_BUS_NAME, help="shared memory name consumers attach to")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--slots", type=int, default=SLOTS)
+    args = parser.parse_args()
+
+    import cv2
+
+    cap = cv2.VideoCapture(args.camera)
+    if not cap.isOpened():
+        print("[ERROR] Camera not accessible!")
+        return
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, args.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, args.height)
+
+    ring = FrameRing.create(args.name, args.width, args.height, args.slots)
+    print(f"📷 Publishing camera {args.camera} at {args.width}x{args.height} on frame bus '{args.name}' "
+          f"({args.slots} slots)")
+    print(f"💡 Run consumers with FRAME_BUS={args.name}")
+
+    frames, window_start = 0, time.time()
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                print("[ERROR] Could not read from camera")
+                break
+            if frame.shape[:2] != (args.height, args.width):
+                frame = cv2.resize(frame, (args.width, args.height))
+            ring.write(frame)
+            frames += 1
+            if time.time() - window_start >= STATS_INTERVAL:
+                print(f"📈 {frames / (time.time() - window_start):.1f} fps, frame {ring.latest_frame_number()}")
+                frames, window_start = 0, time.time()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping capture daemon")
+    finally:
+        cap.release()
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
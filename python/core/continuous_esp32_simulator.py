@@ -4,7 +4,11 @@ Continuous ESP32 sensor data simulator
 Sends realistic sensor data every 2 seconds to simulate ESP32
 """
 
-import paho.mqtt.publish as publish
+import mqtt_publisher
+import latency_trace
+import sensor_codec
+from report_by_exception import ExceptionReporter, MAX_SILENCE
+import argparse
 import json
 import time
 import random
@@ -14,15 +18,16 @@ import sys
 # MQTT Configuration
 BROKER = "broker-cn.emqx.io"
 TOPIC = "esp/sensors"
+TOPIC_BIN = sensor_codec.TOPIC_SENSORS_BIN
+ENCODINGS = ("json", "binary", "both")
+STATS_EVERY = 30  # samples between report-by-exception summaries (1 minute)
 
 def signal_handler(sig, frame):
     print('\n🛑 Stopping ESP32 simulator...')
     sys.exit(0)
 
-signal.signal(signal.SIGINT, signal_handler)
-
-def send_sensor_data():
-    """Send realistic ESP32 sensor data"""
+def generate_sensor_data():
+    """Generate one realistic ESP32 sensor sample"""
     # Generate realistic sensor data with some variation
     temp = 25 + random.uniform(-2, 3)  # Temperature between 23-28°C
     hum = 60 + random.uniform(-5, 10)   # Humidity between 55-70%
@@ -46,28 +51,74 @@ def send_sensor_data():
         "ir": ir,
         "timestamp": time.time()
     }
+    return data
+
+def send_sensor_data(encoding="json", reporter=None):
+    """Send realistic ESP32 sensor data as JSON, compact binary or both
+    
+    With a reporter (report-by-exception mode) samples within the deadbands
+    are suppressed; returns whether the sample was published successfully.
+    """
+    data = generate_sensor_data()
+    if reporter:
+        publish, reason = reporter.should_publish(data)
+        if not publish:
+            return False
     
     try:
-        publish.single(TOPIC, json.dumps(data), hostname=BROKER)
+        compact = None
+        if encoding in ("binary", "both"):
+            try:
+                compact = sensor_codec.encode(data)
+            except ValueError as e:
+                print(f"⚠️ Sample doesn't fit the compact encoding ({e}), sending JSON only")
+        if encoding in ("json", "both") or compact is None:
+            data["trace"] = latency_trace.start()
+            mqtt_publisher.single(TOPIC, json.dumps(data), hostname=BROKER)
+        if compact is not None:
+            mqtt_publisher.single(TOPIC_BIN, compact, hostname=BROKER)
         print(f"📡 ESP32 Data: Temp={data['temp']}°C, Hum={data['hum']}%, LDR={data['ldr']}, PIR={data['pir']}, IR={data['ir']}")
     except Exception as e:
         print(f"❌ Error sending data: {e}")
+        return False
+    if reporter:
+        reporter.published(data, reason)
+    return True
 
 def main():
+    parser = argparse.ArgumentParser(description="Continuous ESP32 sensor data simulator")
+    parser.add_argument("--encoding", choices=ENCODINGS, default="json",
+                        help=f"json on {TOPIC}, compact binary on {TOPIC_BIN}, or both")
+    parser.add_argument("--report-by-exception", action="store_true",
+                        help="publish only on deadband changes, PIR/IR edges and heartbeats")
+    parser.add_argument("--max-silence", type=float, default=MAX_SILENCE,
+                        help="heartbeat interval in report-by-exception mode (seconds)")
+    args = parser.parse_args()
+    reporter = ExceptionReporter(max_silence=args.max_silence) if args.report_by_exception else None
+    signal.signal(signal.SIGINT, signal_handler)
+    
     print("🚀 ESP32 Sensor Data Simulator")
     print("=" * 50)
-    print(f"📡 Publishing to: {TOPIC}")
+    topics = {"json": [TOPIC], "binary": [TOPIC_BIN], "both": [TOPIC, TOPIC_BIN]}[args.encoding]
+    print(f"📡 Publishing to: {', '.join(topics)}")
     print(f"🔗 Broker: {BROKER}")
     print("📊 Sending data every 2 seconds...")
+    if reporter:
+        print(f"📉 Report by exception: deadbands {reporter.deadbands}, heartbeat every {reporter.max_silence:g}s")
     print("Press Ctrl+C to stop")
     print()
     
     try:
         while True:
-            send_sensor_data()
+            send_sensor_data(args.encoding, reporter)
+            if reporter and reporter.stats["samples"] % STATS_EVERY == 0:
+                print(f"📊 Report by exception: {reporter.summary()}")
             time.sleep(2)
     except KeyboardInterrupt:
         print('\n🛑 Stopping ESP32 simulator...')
+    finally:
+        if reporter:
+            print(f"📊 Report by exception: {reporter.summary()}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Temporal Count Smoothing
+Per-frame item counts jump with occlusion and lighting, and every jump used
+to become a database write, a fridge/inventory message and a dashboard
+re-render. CountSmoother keeps the last `window` counts per item and only
+reports a new value when a robust statistic over them (median or mode)
+has changed and stayed changed for `hold` seconds. Raw count changes that
+never made it out are counted as suppressed writes.
+"""
+
+import statistics
+import time
+from collections import deque
+
+WINDOW = 9    # frames per item
+HOLD = 3.0    # seconds a new value must persist before it is reported
+STATISTICS = {"median": statistics.median_low, "mode": statistics.mode}
+
+
+class CountSmoother:
+    def __init__(self, window=WINDOW, hold=HOLD, statistic="median", clock=time.monotonic):
+        self.window = window
+        self.hold = hold
+        self.statistic = STATISTICS[statistic]
+        self.clock = clock
+        self.history = {}    # item -> deque of recent raw counts
+        self.last_raw = {}
+        self.reported = {}   # item -> last reported value
+        self.pending = {}    # item -> (candidate value, first seen at)
+        self.stats = {"observations": 0, "raw_changes": 0, "reported": 0}
+
+    def observe(self, counts, now=None):
+        """
+        Feed one frame's {item: count}; items seen before but missing count as 0.
+        Returns {item: value} for the items whose smoothed value changed.
+        """
+        now = self.clock() if now is None else now
+        self.stats["observations"] += 1
+        changes = {}
+        for item in set(self.history) | set(counts):
+            count = counts.get(item, 0)
+            if count != self.last_raw.get(item, 0):
+                self.stats["raw_changes"] += 1  # a write without smoothing
+            self.last_raw[item] = count
+            history = self.history.setdefault(item, deque(maxlen=self.window))
+            history.append(count)
+
+            value = self.statistic(history)
+            if value == self.reported.get(item, 0):
+                self.pending.pop(item, None)
+                continue
+            candidate, since = self.pending.get(item, (None, now))
+            if candidate != value:
+                candidate, since = value, now
+                self.pending[item] = (candidate, since)
+            if now - since >= self.hold:
+                self.reported[item] = value
+                self.pending.pop(item, None)
+                self.stats["reported"] += 1
+                changes[item] = value
+        return changes
+
+    def value(self, item):
+        return self.reported.get(item, 0)
+
+    def suppressed(self):
+        """Raw count changes that did not turn into a reported change"""
+        return max(0, self.stats["raw_changes"] - self.stats["reported"])
+
+    def summary(self):
+        return (f"{self.stats['reported']} inventory writes for {self.stats['raw_changes']} raw count changes, "
+                f"{self.suppressed()} suppressed")
@@ -7,11 +7,14 @@ Uses real ESP32 sensor data from database when real-time data isn't available
 import json
 import time
 import paho.mqtt.client as mqtt
-import paho.mqtt.publish as publish
+import mqtt_publisher
 import sys
 import os
 import mysql.connector
 from datetime import datetime, timedelta
+from latest_value_cache import LatestValueCache
+from rolling_stats import RollingStats
+import sensor_aggregates
 
 # Database configuration - Update these values to match your MySQL setup
 DB_CONFIG = {
@@ -25,12 +28,20 @@ DB_CONFIG = {
 BROKER = "broker-cn.emqx.io"
 PORT = 1883
 
+# Topics whose latest value is loaded from the database at connect
+LATEST_TOPICS = ['esp/sensors', 'esp/status', 'home/sensors/fan', 'home/sensors/light',
+                 'home/sensors/ac', 'home/sensors/washing-machine']
+
+# Sources stamped on the data this system publishes itself; not live hardware data
+OWN_SOURCES = ("database_enhanced", "simulated")
+
 class DashboardOnlySystem:
     def __init__(self):
         self.client = mqtt.Client()
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
-        self.latest_sensor_data = {}
+        self.latest_sensor_data = LatestValueCache(LATEST_TOPICS)
+        self.rolling_stats = RollingStats(window_hours=24)
         self.db_connection = None
         
     def connect_database(self):
@@ -44,34 +55,14 @@ class DashboardOnlySystem:
             return False
     
     def get_latest_sensor_data(self):
-        """Get latest sensor data from database"""
+        """Load the latest sensor data for every topic from the database in one query"""
         if not self.db_connection:
             return None
             
         try:
-            cursor = self.db_connection.cursor()
-            
-            # Get latest sensor data for each topic
-            topics = ['esp/sensors', 'esp/status', 'home/sensors/fan', 'home/sensors/light', 
-                     'home/sensors/ac', 'home/sensors/washing-machine']
-            
-            for topic in topics:
-                query = """
-                SELECT value_json, recorded_at 
-                FROM sensors 
-                WHERE topic = ? 
-                ORDER BY recorded_at DESC 
-                LIMIT 1
-                """
-                cursor.execute(query, (topic,))
-                result = cursor.fetchone()
-                
-                if result:
-                    data = json.loads(result[0])
-                    self.latest_sensor_data[topic] = data
-                    print(f"📊 Loaded {topic}: {data}")
-            
-            cursor.close()
+            loaded = self.latest_sensor_data.load(self.db_connection)
+            for topic, (data, recorded_at) in loaded.items():
+                print(f"📊 Loaded {topic} ({recorded_at}): {data}")
             return True
             
         except Exception as e:
@@ -79,19 +70,42 @@ class DashboardOnlySystem:
             return False
     
     def get_historical_sensor_data(self, hours=24):
-        """Get historical sensor data for the last N hours"""
+        """Get historical sensor data for the last N hours, newest first
+        
+        Reads minute buckets up to 48 hours and hourly buckets beyond; each
+        point carries the bucket averages, motion flags and sample count.
+        Falls back to the raw rows when the rollup tables are empty.
+        """
         if not self.db_connection:
             return None
             
         try:
             cursor = self.db_connection.cursor()
             
+            granularity = sensor_aggregates.rollup_for_hours(hours)
+            cursor.execute(sensor_aggregates.rollup_history_query(granularity), ('esp/sensors', hours))
+            buckets = cursor.fetchall()
+            if buckets:
+                historical_data = []
+                for bucket_start, samples, temp, hum, ldr, pir_events, ir_events in reversed(buckets):
+                    historical_data.append({
+                        "temp": temp,
+                        "hum": hum,
+                        "ldr": ldr,
+                        "pir": 1 if pir_events else 0,
+                        "ir": 1 if ir_events else 0,
+                        "samples": samples,
+                        "recorded_at": bucket_start
+                    })
+                cursor.close()
+                return historical_data
+            
             # Get historical data for esp/sensors topic
             query = """
             SELECT value_json, recorded_at 
             FROM sensors 
             WHERE topic = 'esp/sensors' 
-            AND recorded_at >= NOW() - INTERVAL ? HOUR
+            AND recorded_at >= NOW() - INTERVAL %s HOUR
             ORDER BY recorded_at DESC
             """
             cursor.execute(query, (hours,))
@@ -110,22 +124,30 @@ class DashboardOnlySystem:
             print(f"❌ Error getting historical data: {e}")
             return None
     
+    def seed_rolling_stats(self):
+        """Seed the 24 hour rolling statistics from one aggregate query"""
+        if not self.db_connection:
+            return False
+            
+        try:
+            buckets = self.rolling_stats.seed_from_db(self.db_connection)
+            print(f"📊 Seeded rolling statistics from {buckets} hourly buckets")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error seeding rolling statistics: {e}")
+            return False
+    
     def simulate_realistic_sensor_data(self):
         """Generate realistic sensor data based on historical patterns"""
-        historical_data = self.get_historical_sensor_data(24)
-        
-        if not historical_data:
-            # Fallback to basic realistic simulation
-            return self.generate_basic_sensor_data()
+        # Rolling 24 hour statistics, kept current by on_message
+        temp_stats = self.rolling_stats.stats('temp')
+        hum_stats = self.rolling_stats.stats('hum')
         
-        # Analyze historical patterns
-        temps = [d.get('temp', 25) for d in historical_data if 'temp' in d]
-        hums = [d.get('hum', 60) for d in historical_data if 'hum' in d]
-        
-        if temps and hums:
+        if temp_stats and hum_stats:
             # Use historical averages with some variation
-            avg_temp = sum(temps) / len(temps)
-            avg_hum = sum(hums) / len(hums)
+            avg_temp = temp_stats['mean']
+            avg_hum = hum_stats['mean']
             
             # Add realistic variation
             import random
@@ -182,12 +204,6 @@ class DashboardOnlySystem:
             client.subscribe("esp/status")
             client.subscribe("home/sensors/+")
             
-            # Load latest sensor data from database
-            self.get_latest_sensor_data()
-            
-            # Start sending enhanced sensor data
-            self.start_sensor_data_simulation()
-            
         else:
             print("❌ Failed to connect, return code:", rc)
     
@@ -199,8 +215,14 @@ class DashboardOnlySystem:
             print(f"📥 Received real-time data: {topic}")
             print(f"📊 Data: {data}")
             
-            # Update latest sensor data
-            self.latest_sensor_data[topic] = data
+            # Keep the latest value cache current; our own simulated samples are not live data
+            if not (isinstance(data, dict) and data.get("source") in OWN_SOURCES):
+                self.latest_sensor_data.update(topic, data, time.time())
+            
+            # Every esp/sensors sample is stored by the backend, so it also
+            # counts towards the rolling statistics that mirror the table
+            if topic == "esp/sensors" and isinstance(data, dict):
+                self.rolling_stats.add(data)
             
         except Exception as e:
             print(f"❌ Error processing message: {e}")
@@ -216,7 +238,7 @@ class DashboardOnlySystem:
                 sensor_data = self.simulate_realistic_sensor_data()
                 
                 # Publish sensor data
-                publish.single("esp/sensors", json.dumps(sensor_data), hostname=BROKER)
+                mqtt_publisher.single("esp/sensors", json.dumps(sensor_data), hostname=BROKER)
                 print(f"📡 Enhanced Sensor Data: Temp={sensor_data['temp']}°C, Hum={sensor_data['hum']}%, Source={sensor_data['source']}")
                 
                 time.sleep(2)  # Send data every 2 seconds
@@ -236,20 +258,27 @@ class DashboardOnlySystem:
         print("Press Ctrl+C to stop")
         print()
         
-        # Connect to database
-        if not self.connect_database():
+        # Connect to database and load the latest values and 24 hour statistics once
+        if self.connect_database():
+            self.get_latest_sensor_data()
+            self.seed_rolling_stats()
+        else:
             print("⚠️ Continuing without database connection...")
         
         try:
+            # The network loop runs in the background so on_message keeps the
+            # latest value cache current while the simulation runs here
             self.client.connect(BROKER, PORT, 60)
-            self.client.loop_forever()
-        except KeyboardInterrupt:
+            self.client.loop_start()
+            self.start_sensor_data_simulation()
+        except Exception as e:
+            print(f"❌ Error: {e}")
+        finally:
             print("\n🛑 Stopping dashboard system...")
             self.client.disconnect()
+            self.client.loop_stop()
             if self.db_connection:
                 self.db_connection.close()
-        except Exception as e:
-            print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
     system = DashboardOnlySystem()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Delta Device State Publisher
+Publishes a device's state only when it changes, as a retained message on
+its own topic (home/sensors/<device>), instead of the whole device map on
+every command. A dashboard subscribes to just the devices it renders and
+gets their current state from the broker on subscribe.
+
+A full snapshot of every device goes out on esp/status, also retained, at
+connect and every SNAPSHOT_INTERVAL seconds so consumers that missed a
+delta resynchronise.
+"""
+
+import json
+import threading
+import time
+
+DEVICE_TOPIC = "home/sensors/{device}"
+SNAPSHOT_TOPIC = "esp/status"
+SNAPSHOT_INTERVAL = 60  # seconds between full snapshots
+
+
+class DeviceStatePublisher:
+    def __init__(self, devices, publish, system, extra_fields=None, snapshot_interval=SNAPSHOT_INTERVAL):
+        """publish: callable(topic, payload, retain) that sends one MQTT message"""
+        self.devices = dict(devices)
+        self.publish = publish
+        self.system = system
+        self.extra_fields = extra_fields or {}
+        self.snapshot_interval = snapshot_interval
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.stats = {"deltas": 0, "unchanged": 0, "snapshots": 0}
+
+    def publish_device(self, device, state):
+        payload = {"state": state, "timestamp": time.time(), "system": self.system}
+        self.publish(DEVICE_TOPIC.format(device=device), json.dumps(payload), True)
+
+    def set(self, device, state):
+        """Record a device state; publishes a retained delta only when it changed"""
+        with self.lock:
+            if self.devices.get(device) == state:
+                self.stats["unchanged"] += 1
+                return False
+            self.devices[device] = state
+            self.stats["deltas"] += 1
+        self.publish_device(device, state)
+        return True
+
+    def publish_snapshot(self):
+        """Retained full device map for resync"""
+        with self.lock:
+            devices = dict(self.devices)
+            self.stats["snapshots"] += 1
+        status = dict(self.extra_fields, timestamp=time.time(), devices=devices, system=self.system, snapshot=True)
+        self.publish(SNAPSHOT_TOPIC, json.dumps(status), True)
+        return status
+
+    def publish_all(self):
+        """Every device topic plus a snapshot, e.g. after (re)connecting"""
+        with self.lock:
+            devices = dict(self.devices)
+        for device, state in devices.items():
+            self.publish_device(device, state)
+        return self.publish_snapshot()
+
+    def run(self):
+        while not self.stopped.wait(self.snapshot_interval):
+            try:
+                self.publish_snapshot()
+            except Exception as e:
+                print(f"❌ Error publishing device snapshot: {e}")
+
+    def start(self):
+        """Publish snapshots every snapshot_interval seconds in the background"""
+        self.thread = threading.Thread(target=self.run, name="device-snapshots", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
@@ -7,7 +7,9 @@ Listens for commands from the frontend dashboard and simulates ESP32 responses
 import json
 import time
 import paho.mqtt.client as mqtt
-import paho.mqtt.publish as publish
+import mqtt_publisher
+from device_state import DeviceStatePublisher
+from actuation_scheduler import ActuationScheduler
 
 # MQTT Configuration
 BROKER = "broker-cn.emqx.io"
@@ -15,17 +17,23 @@ PORT = 1883
 
 # Topics
 TOPIC_COMMANDS = "home/control"  # Will listen to home/control/+
-TOPIC_SENSORS = "esp/sensors"    # Will publish sensor data
-TOPIC_STATUS = "esp/status"      # Will publish device status
+TOPIC_STATUS = "esp/status"      # Will publish retained device snapshots
+TOPIC_DEVICE = "home/sensors/+"  # Will publish retained per-device state
+TOPIC_ACK = "esp/ack/{device}"   # Will acknowledge each command once actuated
+
+ACTUATION_DELAY = 0.5  # simulated seconds for a device to switch
 
 class ESP32Simulator:
     def __init__(self):
-        self.devices = {
+        # Only changed devices are published, retained on home/sensors/<device>
+        self.device_state = DeviceStatePublisher({
             'fan': 'off',
             'light': 'off', 
             'ac': 'off',
             'washing-machine': 'off'
-        }
+        }, self.publish, "esp32_simulator")
+        # Actuation delays run here, never on the MQTT network thread
+        self.scheduler = ActuationScheduler()
         self.client = mqtt.Client()
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
@@ -44,6 +52,7 @@ class ESP32Simulator:
     
     def on_message(self, client, userdata, msg):
         try:
+            received_at = time.time()
             topic = msg.topic
             command = msg.payload.decode()
             
@@ -52,96 +61,81 @@ class ESP32Simulator:
             # Extract device name from topic (home/control/fan -> fan)
             device = topic.split('/')[-1]
             
-            if device in self.devices:
-                # Update device state
-                self.devices[device] = command
+            if device in self.device_state.devices:
+                # Update device state; publishes a retained delta if it changed
+                if not self.device_state.set(device, command):
+                    print(f"⏭️ Device {device} already {command}, nothing published")
+                    self.publish_ack(device, command, received_at, changed=False)
+                    return
                 print(f"🔧 Device {device} set to: {command}")
                 
-                # Publish updated status
-                self.publish_device_status()
-                
                 # Simulate device response
-                self.simulate_device_response(device, command)
+                self.simulate_device_response(device, command, received_at)
             else:
                 print(f"⚠️ Unknown device: {device}")
                 
         except Exception as e:
             print(f"❌ Error processing command: {e}")
     
+    def publish(self, topic, payload, retain=False):
+        mqtt_publisher.single(topic, payload, retain=retain, hostname=BROKER, port=PORT)
+    
     def publish_device_status(self):
-        """Publish current device status"""
-        status = {
-            "timestamp": time.time(),
-            "devices": self.devices,
-            "system": "esp32_simulator"
-        }
-        
+        """Publish every device topic and a full snapshot (after connecting)"""
         try:
-            publish.single(TOPIC_STATUS, json.dumps(status), hostname=BROKER)
+            status = self.device_state.publish_all()
             print(f"📤 Published status: {status}")
         except Exception as e:
             print(f"❌ Error publishing status: {e}")
     
-    def simulate_device_response(self, device, command):
-        """Simulate ESP32 device response"""
+    def simulate_device_response(self, device, command, received_at):
+        """Simulate ESP32 device response; the acknowledgement follows the actuation delay"""
         if command == "on":
             print(f"🟢 {device.upper()} turned ON")
-            # Simulate device turning on (LED, motor, etc.)
-            time.sleep(0.5)
         elif command == "off":
             print(f"🔴 {device.upper()} turned OFF")
-            # Simulate device turning off
-            time.sleep(0.5)
-        
-        # Publish sensor data with device state
-        self.publish_sensor_data()
+        # Simulate the device switching (LED, motor, etc.) without blocking the network loop
+        self.scheduler.schedule(ACTUATION_DELAY, self.publish_ack, device, command, received_at)
     
-    def publish_sensor_data(self):
-        """Publish sensor data with current device states"""
-        import random
-        
-        # Generate realistic sensor data
-        temp = 25 + random.uniform(-2, 3)
-        hum = 60 + random.uniform(-5, 10)
-        ldr = 300 + random.randint(-50, 50)
-        pir = random.choice([0, 1])
-        ir = random.choice([0, 1])
-        
-        # Add device states to sensor data
-        sensor_data = {
-            "temp": round(temp, 1),
-            "hum": round(hum, 1),
-            "ldr": ldr,
-            "pir": pir,
-            "ir": ir,
-            "devices": self.devices,  # Include device states
+    def publish_ack(self, device, command, received_at, changed=True):
+        """Acknowledge a handled command on esp/ack/<device>"""
+        ack = {
+            "device": device,
+            "command": command,
+            "state": self.device_state.devices.get(device),
+            "changed": changed,
+            "received_at": received_at,
             "timestamp": time.time()
         }
-        
         try:
-            publish.single(TOPIC_SENSORS, json.dumps(sensor_data), hostname=BROKER)
-            print(f"📡 Published sensor data: Temp={sensor_data['temp']}°C, Hum={sensor_data['hum']}%, Devices={self.devices}")
+            self.publish(TOPIC_ACK.format(device=device), json.dumps(ack))
         except Exception as e:
-            print(f"❌ Error publishing sensor data: {e}")
+            print(f"❌ Error publishing ack: {e}")
     
     def start(self):
         """Start the ESP32 simulator"""
         print("🚀 ESP32 Command Receiver Starting...")
         print("=" * 50)
         print(f"📡 Listening to: {TOPIC_COMMANDS}/*")
-        print(f"📤 Publishing to: {TOPIC_SENSORS}")
+        print(f"📤 Publishing to: {TOPIC_DEVICE} (changes), {TOPIC_STATUS} (snapshot every {self.device_state.snapshot_interval}s)")
+        print(f"✅ Acknowledging on: {TOPIC_ACK.format(device='<device>')}")
         print("🔧 Supported devices: fan, light, ac, washing-machine")
         print("Press Ctrl+C to stop")
         print()
         
         try:
+            self.scheduler.start()
             self.client.connect(BROKER, PORT, 60)
+            self.device_state.start()
             self.client.loop_forever()
         except KeyboardInterrupt:
             print("\n🛑 Stopping ESP32 simulator...")
             self.client.disconnect()
         except Exception as e:
             print(f"❌ Error: {e}")
+        finally:
+            self.device_state.stop()
+            self.scheduler.stop()
 
 if __name__ == "__main__":
     esp32 = ESP32Simulator()
@@ -1,34 +1,55 @@
-import cv2
 import time
 import os
 import json
 import paho.mqtt.client as mqtt
 import base64
 from datetime import datetime
+from trigger_dispatcher import TriggerDispatcher
+from motion_trigger import MotionTrigger
+import latency_trace
+import sensor_codec
 
 # === MQTT Config ===
 BROKER = "broker-cn.emqx.io"
 PORT = 1883
 TOPIC_SENSORS = "esp/sensors"   # ESP publishes PIR, IR, etc.
+TOPIC_SENSORS_BIN = sensor_codec.TOPIC_SENSORS_BIN  # Same samples, compact binary encoding
 TOPIC_RESULT = "esp/cam"        # Python publishes recognition result
 TOPIC_COMMANDS = "face-detection/commands"  # Server sends commands
 TOPIC_STATUS = "face-detection/status"      # Python publishes status
+TOPIC_TRIGGER_STATS = "face-detection/trigger-stats"  # Python publishes trigger counters
+STATS_INTERVAL = 10  # seconds between trigger counter publishes
 
 SAVE_FOLDER = "captured_faces"
-if not os.path.exists(SAVE_FOLDER):
-    os.makedirs(SAVE_FOLDER)
 
 # === Configuration ===
 config = {
     "timeout": 10,
     "sensitivity": "medium",
     "mode": "auto",
-    "status": "ready"
+    "status": "ready",
+    "debounce": 4,             # seconds of quiet before motion counts as a new event
+    "cooldown": 15             # seconds to ignore motion after a capture
 }
 
+# Camera jobs run on the dispatcher so MQTT callbacks never block the network loop.
+# A single worker because there is a single camera; triggers that arrive while a
+# capture is queued or in flight are coalesced into it.
+CAMERA_JOB = "camera"
+dispatcher = TriggerDispatcher(workers=1, name="face-detection")
+
+# Debounce/cooldown state machine in front of the dispatcher
+# Haar detection can't tell people apart, so there is no repeat-person suppression here
+motion_trigger = MotionTrigger(config['debounce'], config['cooldown'])
+duplicates = sensor_codec.DuplicateFilter()  # --encoding both sends each sample twice
+last_stats_publish = 0
+mqtt_client = None  # created in main(); importing this module has no side effects
+
 # Simple face detection using OpenCV's built-in Haar Cascade
 def detect_faces_in_image(image_path):
     """Simple face detection using OpenCV Haar Cascade"""
+    import cv2
+    
     try:
         # Load the image
         image = cv2.imread(image_path)
@@ -52,10 +73,13 @@ def detect_faces_in_image(image_path):
     except Exception as e:
         return False, f"Error: {str(e)}"
 
-def open_camera_and_capture(reason="motion_detection"):
+def open_camera_and_capture(reason="motion_detection", trace=None):
     """Open camera and capture image for face detection"""
+    import cv2
+    from frame_bus import open_camera
+    
     print(f"[INFO] Opening camera for face detection (reason: {reason})...")
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+    cap = open_camera(0, cv2.CAP_DSHOW)
     start_time = time.time()
     
     if not cap.isOpened():
@@ -85,6 +109,7 @@ def open_camera_and_capture(reason="motion_detection"):
 
     # Process last frame
     if ret:
+        latency_trace.mark(trace, "captured")
         # Save the captured frame
         timestamp = int(time.time())
         frame_path = os.path.join(SAVE_FOLDER, f"capture_{timestamp}.jpg")
@@ -93,6 +118,7 @@ def open_camera_and_capture(reason="motion_detection"):
         
         # Detect faces in the captured image
         face_detected, message = detect_faces_in_image(frame_path)
+        latency_trace.mark(trace, "detected")
         
         result = {
             "timestamp": timestamp,
@@ -123,28 +149,20 @@ def handle_server_command(command):
             priority = command.get('priority', 'normal')
             print(f"[COMMAND] Triggering camera (reason: {reason}, priority: {priority})")
             
-            # Update status
-            config['status'] = 'processing'
-            publish_status()
-            
-            # Trigger face detection
-            result = open_camera_and_capture(reason)
-            
-            # Publish result
-            mqtt_client.publish(TOPIC_RESULT, json.dumps(result))
-            print(f"[COMMAND] Published result: {result}")
-            
-            # Update status back to ready
-            config['status'] = 'ready'
-            publish_status()
+            trace = latency_trace.from_payload(command)
+            if not dispatcher.submit(CAMERA_JOB, run_manual_detection, reason, trace):
+                print(f"[COMMAND] Capture already in progress, trigger merged (result will be published with reason: {reason})")
             
         elif action == 'configure':
             print(f"[COMMAND] Updating configuration: {command}")
             config.update({
                 'timeout': command.get('timeout', config['timeout']),
                 'sensitivity': command.get('sensitivity', config['sensitivity']),
-                'mode': command.get('mode', config['mode'])
+                'mode': command.get('mode', config['mode']),
+                'debounce': command.get('debounce', config['debounce']),
+                'cooldown': command.get('cooldown', config['cooldown'])
             })
+            motion_trigger.configure(config['debounce'], config['cooldown'])
             print(f"[CONFIG] Updated config: {config}")
             publish_status()
             
@@ -165,20 +183,39 @@ def publish_status():
         "status": config['status'],
         "config": config,
         "system": "face_detection",
-        "version": "1.0"
+        "version": "1.0",
+        "dispatcher": dispatcher.get_metrics(),
+        "trigger": motion_trigger.get_stats()
     }
     
     mqtt_client.publish(TOPIC_STATUS, json.dumps(status))
     print(f"[STATUS] Published status: {status}")
 
+def publish_trigger_stats(force=False):
+    """Publish trigger counters, at most once per STATS_INTERVAL unless forced"""
+    global last_stats_publish
+    now = time.monotonic()
+    if not force and now - last_stats_publish < STATS_INTERVAL:
+        return
+    last_stats_publish = now
+    
+    stats = motion_trigger.get_stats()
+    stats.update({
+        "timestamp": time.time(),
+        "system": "face_detection"
+    })
+    mqtt_client.publish(TOPIC_TRIGGER_STATS, json.dumps(stats))
+    print(f"[STATS] Triggers: received={stats['received']}, executed={stats['executed']}, suppressed={stats['suppressed']}")
+
 # === MQTT Callbacks ===
 def on_connect(client, userdata, flags, rc):
     if rc == 0:
         print("✅ Connected to MQTT Broker!")
         # Subscribe to multiple topics for full duplex communication
         client.subscribe(TOPIC_SENSORS)
+        client.subscribe(TOPIC_SENSORS_BIN)
         client.subscribe(TOPIC_COMMANDS)
-        print(f"📡 Subscribed to: {TOPIC_SENSORS}")
+        print(f"📡 Subscribed to: {TOPIC_SENSORS}, {TOPIC_SENSORS_BIN}")
         print(f"📡 Subscribed to: {TOPIC_COMMANDS}")
         
         # Publish initial status
@@ -188,9 +225,10 @@ def on_connect(client, userdata, flags, rc):
 
 def on_message(client, userdata, msg):
     try:
-        topic = msg.topic
-        payload = msg.payload.decode()
-        data = json.loads(payload)  # parse JSON
+        # JSON, or the compact encoding on esp/sensors/bin (reported as esp/sensors)
+        topic, data = sensor_codec.decode_message(msg.topic, msg.payload)
+        if duplicates.duplicate(msg.topic, data):
+            return  # second copy of a sample sent in both encodings
         
         if topic == TOPIC_SENSORS:
             print(f"📥 Received sensor data: {data}")
@@ -205,51 +243,119 @@ def on_message(client, userdata, msg):
         print("⚠️ Error parsing message:", e)
 
 def handle_sensor_data(data):
-    """Handle sensor data and trigger face detection if motion detected"""
+    """Handle sensor data and queue face detection if motion detected"""
     pir = data.get("pir", 0)
     ir = data.get("ir", 0)
 
     # === Trigger camera when PIR or IR == 1 ===
     if pir == 1 or ir == 1:
-        print("[TRIGGER] Motion detected (PIR/IR) → Starting face detection")
-        
-        # Update status
-        config['status'] = 'processing'
-        publish_status()
-        
-        result = open_camera_and_capture("motion_detection")
-        
-        # Add sensor data to result
-        result.update({
-            "pir": pir,
-            "ir": ir,
-            "trigger_time": datetime.now().isoformat()
-        })
+        fire, reason = motion_trigger.on_motion()
+        trace = latency_trace.from_payload(data)
+        if not fire:
+            print(f"[TRIGGER] Motion detected (PIR/IR) → Suppressed ({reason})")
+        elif dispatcher.submit(CAMERA_JOB, run_motion_detection, pir, ir, trace):
+            print("[TRIGGER] Motion detected (PIR/IR) → Face detection queued")
+        else:
+            motion_trigger.on_cancel()
+            print("[TRIGGER] Motion detected (PIR/IR) → Capture already in progress, trigger coalesced")
+        publish_trigger_stats()
+
+def run_motion_detection(pir, ir, trace=None):
+    """Worker job: capture, detect and publish the result of a motion trigger"""
+    latency_trace.mark(trace, "started")
+    # Update status
+    config['status'] = 'processing'
+    publish_status()
+    
+    try:
+        result = open_camera_and_capture("motion_detection", trace)
+    finally:
+        motion_trigger.on_result()
+    
+    # Add sensor data to result
+    result.update({
+        "pir": pir,
+        "ir": ir,
+        "trigger_time": datetime.now().isoformat()
+    })
+    
+    # Publish result
+    result["trace"] = latency_trace.mark(trace, "result_published")
+    mqtt_client.publish(TOPIC_RESULT, json.dumps(result))
+    print(f"[INFO] Published detection result: {result}")
+    publish_merged_results(result, "motion_detection")
+    
+    # Update status back to ready
+    config['status'] = 'ready'
+    publish_status()
+    publish_trigger_stats(force=True)
+
+def publish_merged_results(result, own_reason):
+    """Answer triggers coalesced into this capture, once per distinct reason"""
+    reasons = {own_reason}
+    for merged in dispatcher.pop_merged(CAMERA_JOB):
+        if merged['func'] is run_manual_detection:
+            reason = merged['args'][0]
+        else:
+            reason = "motion_detection"
+        if reason in reasons:
+            continue
+        reasons.add(reason)
         
-        # Publish result
-        mqtt_client.publish(TOPIC_RESULT, json.dumps(result))
-        print(f"[INFO] Published detection result: {result}")
+        merged_result = dict(result, reason=reason, coalesced=True)
+        merged_result.pop("trace", None)
+        mqtt_client.publish(TOPIC_RESULT, json.dumps(merged_result))
+        print(f"[INFO] Published merged result for reason: {reason}")
+
+def run_manual_detection(reason, trace=None):
+    """Worker job: capture, detect and publish the result of a server trigger"""
+    latency_trace.mark(trace, "started")
+    # Update status
+    config['status'] = 'processing'
+    publish_status()
+    
+    # Trigger face detection; a manual capture also starts the motion cooldown
+    try:
+        result = open_camera_and_capture(reason, trace)
+    finally:
+        motion_trigger.on_result()
+    
+    # Publish result
+    result["trace"] = latency_trace.mark(trace, "result_published")
+    mqtt_client.publish(TOPIC_RESULT, json.dumps(result))
+    print(f"[COMMAND] Published result: {result}")
+    publish_merged_results(result, reason)
+    
+    # Update status back to ready
+    config['status'] = 'ready'
+    publish_status()
+
+def main():
+    global mqtt_client
+    os.makedirs(SAVE_FOLDER, exist_ok=True)
+    
+    # === Setup MQTT ===
+    mqtt_client = mqtt.Client()
+    mqtt_client.on_connect = on_connect
+    mqtt_client.on_message = on_message
+    
+    dispatcher.start()
+    
+    print("🔗 Connecting to MQTT broker...")
+    try:
+        mqtt_client.connect(BROKER, PORT, 60)
+        print("✅ Connected to MQTT broker!")
+        print("📡 Waiting for motion detection...")
+        print("Press Ctrl+C to stop")
         
-        # Update status back to ready
-        config['status'] = 'ready'
-        publish_status()
+        # Loop forever
+        mqtt_client.loop_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping face detection system...")
+        mqtt_client.disconnect()
+        dispatcher.stop(timeout=1)
+    except Exception as e:
+        print(f"❌ Error connecting to MQTT: {e}")
 
-# === Setup MQTT ===
-mqtt_client = mqtt.Client()
-mqtt_client.on_connect = on_connect
-mqtt_client.on_message = on_message
-
-print("🔗 Connecting to MQTT broker...")
-try:
-    mqtt_client.connect(BROKER, PORT, 60)
-    print("✅ Connected to MQTT broker!")
-    print("📡 Waiting for motion detection...")
-    print("Press Ctrl+C to stop")
-    
-    # Loop forever
-    mqtt_client.loop_forever()
-except KeyboardInterrupt:
-    print("\n🛑 Stopping face detection system...")
-    mqtt_client.disconnect()
-except Exception as e:
-    print(f"❌ Error connecting to MQTT: {e}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Frame Bus
+One capture process (capture_daemon.py) decodes the camera and writes
+frames into a ring of slots in a multiprocessing.shared_memory block; the
+face and fridge pipelines attach to it by name and read frames as NumPy
+views, so the camera is decoded once and every consumer runs in its own
+process.
+
+Each slot carries a sequence counter used as a seqlock: the writer makes it
+odd before copying a frame in and even again afterwards. A reader takes the
+counter before and after looking at a slot and retries if it changed, and
+a zero-copy view stays valid until the writer laps the ring (see valid()).
+
+Set FRAME_BUS=<name> to make open_camera() read from the bus instead of
+opening the camera itself.
+"""
+
+import os
+import time
+
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+FRAME_BUS_NAME = "smarthome_frames"
+SLOTS = 8
+MAGIC = 0x46524D42  # "FRMB"
+HEADER_FIELDS = 8   # magic, width, height, slots, latest frame number, writer pid, unused...
+READ_RETRIES = 5
+
+_created = set()  # rings created by this process
+
+
+def layout(width, height, slots):
+    """(meta offset, times offset, data offset, total size) in bytes"""
+    meta = HEADER_FIELDS * 8
+    times = meta + slots * 2 * 8
+    data = (times + slots * 8 + 63) // 64 * 64
+    return meta, times, data, data + slots * height * width * 3
+
+
+class FrameRing:
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((HEADER_FIELDS,), np.int64, shm.buf)
+        if self.header[0] != MAGIC:
+            raise ValueError(f"{shm.name} is not a frame bus")
+        self.width, self.height, self.slots = (int(v) for v in self.header[1:4])
+        meta, times, data, _ = layout(self.width, self.height, self.slots)
+        self.meta = np.ndarray((self.slots, 2), np.int64, shm.buf, meta)  # per slot: seq, frame number
+        self.times = np.ndarray((self.slots,), np.float64, shm.buf, times)
+        self.frames = np.ndarray((self.slots, self.height, self.width, 3), np.uint8, shm.buf, data)
+
+    @classmethod
+    def create(cls, name=FRAME_BUS_NAME, width=640, height=480, slots=SLOTS):
+        size = layout(width, height, slots)[3]
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(name)
+        header = np.ndarray((HEADER_FIELDS,), np.int64, shm.buf)
+        header[:] = 0
+        header[1:6] = (width, height, slots, -1, os.getpid())
+        np.ndarray((slots, 2), np.int64, shm.buf, layout(width, height, slots)[0])[:] = 0
+        header[0] = MAGIC
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name=FRAME_BUS_NAME):
+        """Attach to a ring created by another process; FileNotFoundError if there is none"""
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _created:
+            # Only the creator may unlink the block; keep this process's
+            # resource tracker from removing it when the consumer exits
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    def latest_frame_number(self):
+        return int(self.header[4])
+
+    def write(self, frame, timestamp=None):
+        """Copy a (height, width, 3) uint8 frame into the next slot; returns its frame number"""
+        number = self.latest_frame_number() + 1
+        slot = number % self.slots
+        self.meta[slot, 0] += 1  # odd: slot being written
+        self.frames[slot] = frame
+        self.meta[slot, 1] = number
+        self.times[slot] = time.time() if timestamp is None else timestamp
+        self.meta[slot, 0] += 1  # even: slot consistent
+        self.header[4] = number
+        return number
+
+    def valid(self, number):
+        """True while the slot still holds frame `number`, i.e. a view of it is still intact"""
+        slot = number % self.slots
+        seq = self.meta[slot, 0]
+        return seq % 2 == 0 and self.meta[slot, 1] == number and self.meta[slot, 0] == seq
+
+    def read(self, number=None, copy=False):
+        """
+        (frame number, timestamp, frame) for frame `number` (default: latest),
+        or None if there is none yet or it was overwritten. Without copy the
+        frame is a read-only view into shared memory; check valid(number)
+        after using it.
+        """
+        number = self.latest_frame_number() if number is None else number
+        if number < 0:
+            return None
+        slot = number % self.slots
+        for _ in range(READ_RETRIES):
+            seq = self.meta[slot, 0]
+            if seq % 2 or self.meta[slot, 1] != number:
+                if self.meta[slot, 1] > number:
+                    return None  # lapped by the writer
+                time.sleep(0)
+                continue
+            timestamp = float(self.times[slot])
+            frame = self.frames[slot].copy() if copy else self.frames[slot].view()
+            if self.meta[slot, 0] == seq:
+                if not copy:
+                    frame.flags.writeable = False
+                return number, timestamp, frame
+        return None
+
+    def wait_next(self, after, timeout=1.0, poll=0.002):
+        """Frame number newer than `after`, or None after timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            number = self.latest_frame_number()
+            if number > after:
+                return number
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+
+    def close(self):
+        del self.header, self.meta, self.times, self.frames  # release the exported buffer
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+            _created.discard(self.shm.name)
+
+
+class FrameBusCamera:
+    """cv2.VideoCapture stand-in that reads the newest frame from the bus"""
+
+    def __init__(self, name=FRAME_BUS_NAME, timeout=1.0):
+        self.ring = FrameRing.attach(name)
+        self.timeout = timeout
+        self.last = self.ring.latest_frame_number() - 1
+
+    def isOpened(self):
+        return self.ring is not None
+
+    def read(self):
+        """
+        (ok, frame) like VideoCapture.read(). The frame is a private copy
+        because the pipelines draw boxes and labels on it; use read_view()
+        for zero-copy access.
+        """
+        result = self.read_view(copy=True)
+        return (False, None) if result is None else (True, result[2])
+
+    def read_view(self, copy=False):
+        """Next (frame number, timestamp, frame) newer than the last one read, or None"""
+        for _ in range(READ_RETRIES):
+            number = self.ring.wait_next(self.last, self.timeout)
+            if number is None:
+                return None
+            result = self.ring.read(number, copy=copy)
+            if result:
+                self.last = number
+                return result
+        return None
+
+    def set(self, prop, value):
+        return False  # resolution is fixed by the capture daemon
+
+    def release(self):
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+
+
+def open_camera(index=0, *args):
+    """Frame bus camera when FRAME_BUS names a running capture daemon, else cv2.VideoCapture"""
+    name = os.environ.get("FRAME_BUS")
+    if name:
+        try:
+            camera = FrameBusCamera(name)
+            print(f"[INFO] Reading frames from frame bus '{name}'")
+            return camera
+        except FileNotFoundError:
+            print(f"[WARN] Frame bus '{name}' not found, opening camera {index} directly")
+    import cv2
+
+    return cv2.VideoCapture(index, *args)
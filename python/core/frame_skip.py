@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Adaptive Frame Skip
+Picks how many camera frames to skip between detections from measured
+numbers instead of a hard-coded "every Nth frame". It tracks the camera
+frame rate and the recent inference latency (both as moving averages) and
+chooses the smallest stride that
+
+  - does not detect more often than target_rate detections per second, and
+  - keeps inference below cpu_budget of the wall clock (latency / interval),
+
+then backs off further when the machine is loaded (load average above the
+core count) and speeds back up when it is idle.
+"""
+
+import math
+import os
+import time
+
+TARGET_RATE = 2.0   # detections per second
+CPU_BUDGET = 0.5    # share of wall time spent in inference
+MIN_STRIDE = 1
+MAX_STRIDE = 120
+SMOOTHING = 0.2     # weight of the newest measurement in the moving averages
+
+
+def system_load():
+    """Run-queue length per core (1.0 = saturated), or None where unavailable"""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+class AdaptiveFrameSkip:
+    def __init__(self, target_rate=TARGET_RATE, cpu_budget=CPU_BUDGET, min_stride=MIN_STRIDE,
+                 max_stride=MAX_STRIDE, initial_stride=None, load=system_load, clock=time.monotonic):
+        self.target_rate = target_rate
+        self.cpu_budget = cpu_budget
+        self.min_stride = min_stride
+        self.max_stride = max_stride
+        self.stride = initial_stride or min_stride
+        self.load = load
+        self.clock = clock
+        self.frames_since = 0
+        self.last_frame = None
+        self.frame_interval = None   # seconds, moving average
+        self.latency = None          # seconds, moving average
+        self.detections = []         # recent detection times for the achieved rate
+        self.stats = {"frames": 0, "detections": 0, "skipped": 0}
+
+    @staticmethod
+    def smooth(average, value):
+        return value if average is None else average + SMOOTHING * (value - average)
+
+    def tick(self):
+        """Call once per camera frame; True if this frame should run detection"""
+        now = self.clock()
+        if self.last_frame is not None:
+            self.frame_interval = self.smooth(self.frame_interval, now - self.last_frame)
+        self.last_frame = now
+        self.stats["frames"] += 1
+        self.frames_since += 1
+        if self.frames_since >= self.stride:
+            self.frames_since = 0
+            return True
+        self.stats["skipped"] += 1
+        return False
+
+    def record(self, seconds):
+        """Report how long the detection on a ticked frame took; adjusts the stride"""
+        now = self.clock()
+        self.latency = self.smooth(self.latency, seconds)
+        self.stats["detections"] += 1
+        self.detections = [t for t in self.detections if now - t < 10] + [now]
+        self.stride = self.choose_stride()
+        return self.stride
+
+    def choose_stride(self):
+        if not self.frame_interval:
+            return self.stride
+        interval = max(1 / self.target_rate, self.latency / self.cpu_budget)
+        load = self.load() if self.load else None
+        if load and load > 1:
+            interval *= load  # back off while the machine is saturated
+        stride = math.ceil(interval / self.frame_interval - 1e-9)
+        return max(self.min_stride, min(self.max_stride, stride))
+
+    def achieved_rate(self):
+        """Detections per second over the last 10 seconds"""
+        if len(self.detections) < 2:
+            return 0.0
+        span = self.detections[-1] - self.detections[0]
+        return (len(self.detections) - 1) / span if span else 0.0
+
+    def metrics(self):
+        return {
+            "stride": self.stride,
+            "detection_rate": round(self.achieved_rate(), 2),
+            "target_rate": self.target_rate,
+            "camera_fps": round(1 / self.frame_interval, 1) if self.frame_interval else None,
+            "inference_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "cpu_share": round(self.latency / (self.stride * self.frame_interval), 2)
+            if self.latency is not None and self.frame_interval else None,
+            **self.stats
+        }
+
+    def summary(self):
+        m = self.metrics()
+        return (f"stride {m['stride']}, {m['detection_rate']}/s detections (target {m['target_rate']}/s), "
+                f"inference {m['inference_ms']} ms, camera {m['camera_fps']} fps")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Door-Triggered Fridge Scanner
+Instead of running inference on every camera frame all day, the fridge
+scanner sleeps until the door sensor reports that the door was closed
+(open -> closed on the door topic), then captures a short burst, keeps the
+sharpest frames, runs detection on those, and reports the per-item median
+counts that differ from the previous scan. Scans run on a TriggerDispatcher
+worker so the MQTT callback only parses and enqueues; door events that
+arrive while a scan is queued or running are coalesced into it.
+"""
+
+import json
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from trigger_dispatcher import TriggerDispatcher
+
+TOPIC_DOOR = "fridge/door"
+SCAN_JOB = "fridge-scan"
+SETTLE = 0.5       # seconds after the close before capturing
+BURST_FRAMES = 8
+BEST_FRAMES = 3
+
+OPEN_VALUES = ("open", "opened", "1", "true", "on")
+CLOSED_VALUES = ("closed", "close", "0", "false", "off")
+
+
+def parse_door_state(payload):
+    """
+    "open"/"closed" from a door message: plain text ("open", "closed", "1"),
+    or JSON with a "door", "state" or "ir" field. None if unrecognised.
+    """
+    if isinstance(payload, bytes):
+        payload = payload.decode("utf-8", errors="replace")
+    value = payload
+    try:
+        data = json.loads(payload)
+        if isinstance(data, dict):
+            value = next((data[key] for key in ("door", "state", "ir") if key in data), None)
+        else:
+            value = data
+    except (TypeError, ValueError):
+        pass
+    value = str(value).strip().lower()
+    if value in OPEN_VALUES:
+        return "open"
+    if value in CLOSED_VALUES:
+        return "closed"
+    return None
+
+
+def sharpness(frame):
+    """Variance of the Laplacian of the grey image; low for motion blur"""
+    grey = frame.astype(np.float32).mean(axis=2) if frame.ndim == 3 else frame.astype(np.float32)
+    laplacian = (grey[:-2, 1:-1] + grey[2:, 1:-1] + grey[1:-1, :-2] + grey[1:-1, 2:] - 4 * grey[1:-1, 1:-1])
+    return float(laplacian.var())
+
+
+def best_frames(frames, count=BEST_FRAMES):
+    """The `count` sharpest frames, in capture order"""
+    ranked = sorted(range(len(frames)), key=lambda i: -sharpness(frames[i]))[:count]
+    return [frames[i] for i in sorted(ranked)]
+
+
+class DoorScanner:
+    def __init__(self, capture, detect, on_change, burst=BURST_FRAMES, best=BEST_FRAMES, settle=SETTLE):
+        """
+        capture(n) -> list of frames; detect(frame) -> {item: count};
+        on_change(item, count, delta) is called for every item whose median
+        count differs from the previous scan
+        """
+        self.capture = capture
+        self.detect = detect
+        self.on_change = on_change
+        self.burst = burst
+        self.best = best
+        self.settle = settle
+        self.dispatcher = TriggerDispatcher(workers=1, name="fridge-scanner")
+        self.lock = threading.Lock()
+        self.door = None
+        self.inventory = {}
+        self.stats = {"door_events": 0, "closes": 0, "scans": 0, "coalesced": 0, "changes": 0,
+                      "last_scan_ms": None}
+
+    def start(self):
+        self.dispatcher.start()
+
+    def stop(self, timeout=None):
+        self.dispatcher.stop(timeout)
+
+    def on_door(self, state):
+        """Register a door state; queues a scan on open -> closed. True if a scan was queued"""
+        with self.lock:
+            self.stats["door_events"] += 1
+            previous, self.door = self.door, state
+            if not (previous == "open" and state == "closed"):
+                return False
+            self.stats["closes"] += 1
+        if self.dispatcher.submit(SCAN_JOB, self.scan):
+            return True
+        with self.lock:
+            self.stats["coalesced"] += 1
+        return False
+
+    def on_message(self, client, userdata, msg):
+        """paho on_message for the door topic"""
+        state = parse_door_state(msg.payload)
+        if state is None:
+            print(f"⚠️ Unrecognised door message on {msg.topic}: {msg.payload[:50]!r}")
+        elif self.on_door(state):
+            print("🚪 Door closed → fridge scan queued")
+
+    def scan(self):
+        """Capture a burst, detect on the sharpest frames and report changed counts"""
+        time.sleep(self.settle)
+        started = time.perf_counter()
+        frames = self.capture(self.burst)
+        if not frames:
+            print("❌ Fridge scan: no frames captured")
+            return {}
+        per_frame = [self.detect(frame) for frame in best_frames(frames, self.best)]
+        items = set(self.inventory).union(*per_frame)
+        counts = {item: statistics.median_low([found.get(item, 0) for found in per_frame]) for item in items}
+
+        changes = {}
+        for item, count in counts.items():
+            previous = self.inventory.get(item, 0)
+            if count != previous:
+                changes[item] = count
+                self.on_change(item, count, count - previous)
+        self.inventory = {item: count for item, count in counts.items() if count}
+        with self.lock:
+            self.stats["scans"] += 1
+            self.stats["changes"] += len(changes)
+            self.stats["last_scan_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        print(f"🧊 Fridge scan: {len(frames)} frames, {len(per_frame)} used, "
+              f"{len(changes)} change(s) in {self.stats['last_scan_ms']} ms")
+        return changes
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Latency Tracing
+Stamps a trace id into sensor payloads and records a monotonic timestamp at
+each stage of the PIR -> capture -> detection -> esp/cam pipeline, so the
+collector in python/benchmarks/latency_collector.py can show where the time
+goes.
+
+A trace travels inside the JSON payloads as:
+    "trace": {"id": "9f3c...", "host": "pc-1",
+              "stages": [["published", 8123.402], ["received", 8123.455, "pc-2"], ...]}
+
+time.monotonic() is only comparable between processes on the same machine,
+so each stage recorded on another host than the one that started the trace
+carries that host name, and the collector skips deltas across hosts.
+"""
+
+import socket
+import time
+import uuid
+
+HOST = socket.gethostname()
+
+
+def start(stage="published"):
+    """Begin a new trace with its first stage"""
+    return {"id": uuid.uuid4().hex[:16], "host": HOST, "stages": [[stage, time.monotonic()]]}
+
+
+def mark(trace, stage):
+    """Record a stage on a trace; a None trace is ignored"""
+    if trace is None:
+        return None
+    entry = [stage, time.monotonic()]
+    if trace.get("host") != HOST:
+        entry.append(HOST)
+    trace["stages"].append(entry)
+    return trace
+
+
+def from_payload(data, stage="received"):
+    """Continue the trace carried by a payload, or start one at this stage"""
+    trace = data.get("trace") if isinstance(data, dict) else None
+    if isinstance(trace, dict) and "stages" in trace:
+        return mark(trace, stage)
+    return start(stage)
+
+
+def stage_deltas(trace):
+    """[(from_stage, to_stage, seconds), ...] for consecutive same-host stages"""
+    deltas = []
+    stages = trace.get("stages", [])
+    for previous, current in zip(stages, stages[1:]):
+        previous_host = previous[2] if len(previous) > 2 else trace.get("host")
+        current_host = current[2] if len(current) > 2 else trace.get("host")
+        if previous_host != current_host:
+            continue
+        deltas.append((previous[0], current[0], current[1] - previous[1]))
+    return deltas
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Latest Value Cache
+Newest payload per MQTT topic, loaded from the sensors table in one grouped
+query and kept current from live MQTT messages afterwards.
+
+The inner MAX(recorded_at) ... GROUP BY topic is answered from the
+idx_topic_time (topic, recorded_at) index without touching the rows; only the
+newest row per topic is then read back.
+"""
+
+import json
+import threading
+
+LATEST_PER_TOPIC_QUERY = """
+SELECT s.id, s.topic, s.value_json, s.recorded_at
+FROM sensors s
+JOIN (
+    SELECT topic, MAX(recorded_at) AS recorded_at
+    FROM sensors
+    WHERE topic IN ({placeholders})
+    GROUP BY topic
+) latest ON s.topic = latest.topic AND s.recorded_at = latest.recorded_at
+ORDER BY s.id
+"""
+
+
+def decode_json(value):
+    """mysql.connector returns JSON columns as str or bytes depending on version"""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8')
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+class LatestValueCache:
+    def __init__(self, topics):
+        self.topics = list(topics)
+        self.values = {}      # topic -> payload
+        self.updated_at = {}  # topic -> recorded_at / receive time
+        self.lock = threading.Lock()
+        self.db_loads = 0
+        self.live_updates = 0
+
+    def load(self, connection):
+        """Fill the cache with the newest row of every topic in a single query"""
+        query = LATEST_PER_TOPIC_QUERY.format(placeholders=", ".join(["%s"] * len(self.topics)))
+        cursor = connection.cursor()
+        try:
+            cursor.execute(query, tuple(self.topics))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        loaded = {}
+        # Rows sharing the newest second are ordered by id, so the last one wins
+        for _, topic, value_json, recorded_at in rows:
+            loaded[topic] = (decode_json(value_json), recorded_at)
+
+        with self.lock:
+            for topic, (data, recorded_at) in loaded.items():
+                # A live message that raced the query is newer than the database row
+                if topic not in self.values:
+                    self.values[topic] = data
+                    self.updated_at[topic] = recorded_at
+            self.db_loads += 1
+        return loaded
+
+    def update(self, topic, data, received_at=None):
+        """Record a live MQTT payload"""
+        with self.lock:
+            self.values[topic] = data
+            self.updated_at[topic] = received_at
+            self.live_updates += 1
+
+    def get(self, topic, default=None):
+        with self.lock:
+            return self.values.get(topic, default)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.values)
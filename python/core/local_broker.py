@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Local MQTT Broker Stand-in
+A small in-process asyncio MQTT 3.1.1 broker for benchmarks and offline
+tests. Speaks enough of the protocol for paho clients: CONNECT, PUBLISH
+at QoS 0/1, wildcard SUBSCRIBE, UNSUBSCRIBE, retained messages, PING and
+DISCONNECT. No auth, no persistence, no QoS 2
+
+Usage: python python/core/local_broker.py --port 1883
+"""
+
+import argparse
+import asyncio
+import threading
+import mqtt_wire as wire
+
+
+class Session:
+    def __init__(self, client_id, writer):
+        self.client_id = client_id
+        self.writer = writer
+        self.subscriptions = {}  # filter -> granted qos
+        self.next_packet_id = 0
+
+    def packet_id(self):
+        self.next_packet_id = self.next_packet_id % 65535 + 1
+        return self.next_packet_id
+
+
+class LocalBroker:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.server = None
+        self.sessions = {}   # client_id -> Session
+        self.retained = {}   # topic -> (payload, qos)
+        self.messages_in = 0
+        self.messages_out = 0
+        self.connections = 0
+        self.anonymous = 0
+
+    async def start(self):
+        """Start listening; port 0 picks an ephemeral port"""
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for session in list(self.sessions.values()):
+            session.writer.close()
+        self.sessions.clear()
+
+    async def handle_client(self, reader, writer):
+        first = await wire.read_packet(reader)
+        if first is None or first[0] != wire.CONNECT:
+            writer.close()
+            return
+
+        client_id, _, _ = wire.parse_connect(first[2])
+        if not client_id:
+            self.anonymous += 1
+            client_id = f"local-{self.anonymous}"
+        previous = self.sessions.get(client_id)
+        if previous is not None:
+            previous.writer.close()
+
+        session = Session(client_id, writer)
+        self.sessions[client_id] = session
+        self.connections += 1
+        writer.write(wire.connack(0))
+
+        try:
+            while True:
+                packet = await wire.read_packet(reader)
+                if packet is None:
+                    break
+                packet_type, flags, body = packet
+
+                if packet_type == wire.PUBLISH:
+                    topic, payload, qos, retain, packet_id = wire.parse_publish(flags, body)
+                    if qos == 1:
+                        writer.write(wire.puback(packet_id))
+                    self.route(topic, payload, qos, retain)
+                elif packet_type == wire.SUBSCRIBE:
+                    packet_id, topics = wire.parse_subscribe(body)
+                    granted = []
+                    for topic_filter, qos in topics:
+                        qos = min(qos, 1)
+                        session.subscriptions[topic_filter] = qos
+                        granted.append(qos)
+                    writer.write(wire.suback(packet_id, granted))
+                    for topic_filter, qos in topics:
+                        self.send_retained(session, topic_filter, min(qos, 1))
+                elif packet_type == wire.UNSUBSCRIBE:
+                    packet_id, topics = wire.parse_unsubscribe(body)
+                    for topic_filter in topics:
+                        session.subscriptions.pop(topic_filter, None)
+                    writer.write(wire.unsuback(packet_id))
+                elif packet_type == wire.PINGREQ:
+                    writer.write(wire.pingresp())
+                elif packet_type == wire.DISCONNECT:
+                    break
+                # PUBACKs for our QoS 1 deliveries need no bookkeeping
+
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            if self.sessions.get(client_id) is session:
+                del self.sessions[client_id]
+            writer.close()
+
+    def route(self, topic, payload, qos, retain):
+        """Deliver a message to every matching subscription"""
+        self.messages_in += 1
+        if retain:
+            if payload:
+                self.retained[topic] = (payload, qos)
+            else:
+                self.retained.pop(topic, None)
+
+        for session in list(self.sessions.values()):
+            granted = None
+            for topic_filter, sub_qos in session.subscriptions.items():
+                if wire.topic_matches(topic_filter, topic):
+                    granted = max(granted or 0, sub_qos)
+            if granted is not None:
+                self.deliver(session, topic, payload, min(qos, granted), False)
+
+    def send_retained(self, session, topic_filter, qos):
+        for topic, (payload, retained_qos) in list(self.retained.items()):
+            if wire.topic_matches(topic_filter, topic):
+                self.deliver(session, topic, payload, min(qos, retained_qos), True)
+
+    def deliver(self, session, topic, payload, qos, retain):
+        packet_id = session.packet_id() if qos else 0
+        try:
+            session.writer.write(wire.publish(topic, payload, qos, retain, packet_id))
+            self.messages_out += 1
+        except Exception:
+            pass
+
+
+class BrokerThread:
+    """Runs a LocalBroker on its own event loop thread for synchronous code"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.broker = LocalBroker(host, port)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="local-broker", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        future = asyncio.run_coroutine_threadsafe(self.broker.start(), self.loop)
+        return future.result(5)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.broker.stop(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+    @property
+    def port(self):
+        return self.broker.port
+
+
+async def serve(host, port):
+    broker = LocalBroker(host, port)
+    await broker.start()
+    print(f"✅ Local MQTT broker listening on {host}:{broker.port}")
+    print("Press Ctrl+C to stop")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local MQTT broker stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping local broker...")
+
+
+if __name__ == "__main__":
+    main()
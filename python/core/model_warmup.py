@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Model Warm-up
+The first inference on a freshly loaded detector pays for lazy allocation,
+weight transfer and graph setup and is far slower than steady state. Run a
+few synthetic frames at the capture resolution and batch size right after
+loading, so that cost is paid at startup instead of on the first real scan,
+and log the cold (first call) against warm (steady state) latency.
+"""
+
+import statistics
+import time
+
+import numpy as np
+
+WARMUP_RUNS = 3  # synthetic inferences after the cold one
+
+
+def synthetic_batch(width, height, batch_size=1, seed=0):
+    """batch_size random BGR frames shaped like camera frames (height, width, 3)"""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(batch_size)]
+
+
+def timed(infer, frames, clock=time.perf_counter):
+    """Milliseconds for one infer(frames) call; a single frame is passed unbatched"""
+    start = clock()
+    infer(frames[0] if len(frames) == 1 else frames)
+    return (clock() - start) * 1000
+
+
+def warm_up(infer, width, height, batch_size=1, runs=WARMUP_RUNS, clock=time.perf_counter):
+    """
+    Run one cold and `runs` warm inferences on synthetic frames.
+    Returns {"cold_ms", "warm_ms" (median of the warm runs), "runs"}
+    """
+    frames = synthetic_batch(width, height, batch_size)
+    cold_ms = timed(infer, frames, clock)
+    warm = [timed(infer, frames, clock) for _ in range(runs)]
+    return {"cold_ms": cold_ms, "warm_ms": statistics.median(warm) if warm else None, "runs": runs}
+
+
+def describe(result):
+    if result["warm_ms"] is None:
+        return f"cold {result['cold_ms']:.1f} ms"
+    return (f"cold {result['cold_ms']:.1f} ms, warm {result['warm_ms']:.1f} ms "
+            f"({result['cold_ms'] / max(result['warm_ms'], 1e-9):.1f}x)")
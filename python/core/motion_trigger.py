@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Motion Trigger State Machine
+Decides whether a PIR/IR sensor message should start a camera session.
+Applies debounce and a cooldown after each recognition, and drops repeat
+results for a person who was recognized a moment ago. The camera still
+runs for those triggers, so someone else walking in is never missed
+"""
+
+import threading
+import time
+
+IDLE = "idle"
+CAPTURING = "capturing"
+COOLDOWN = "cooldown"
+
+# Recognition results that do not identify a person
+UNKNOWN_NAMES = ("Unknown", "No Face Detected", None, "")
+
+
+class MotionTrigger:
+    def __init__(self, debounce=4.0, cooldown=15.0, recognized_window=60.0):
+        self.debounce = debounce                    # seconds of quiet before a new motion event
+        self.cooldown = cooldown                    # seconds to ignore motion after a recognition
+        self.recognized_window = recognized_window  # seconds to drop repeat results for the same person
+        self.lock = threading.Lock()
+        self.state = IDLE
+        self.last_motion = None
+        self.cooldown_until = 0.0
+        self.last_person = None
+        self.last_person_until = 0.0
+        self.received = 0
+        self.executed = 0
+        self.suppressed = {
+            "debounce": 0,
+            "busy": 0,
+            "cooldown": 0
+        }
+        self.repeat_results = 0
+
+    def configure(self, debounce=None, cooldown=None, recognized_window=None):
+        """Update the timing parameters"""
+        with self.lock:
+            if debounce is not None:
+                self.debounce = float(debounce)
+            if cooldown is not None:
+                self.cooldown = float(cooldown)
+            if recognized_window is not None:
+                self.recognized_window = float(recognized_window)
+
+    def on_motion(self, now=None):
+        """
+        Register a motion sample (PIR or IR == 1).
+        Returns (True, None) when a camera session should start, otherwise
+        (False, reason) with the suppression reason.
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.received += 1
+            previous_motion = self.last_motion
+            self.last_motion = now
+
+            if self.state == CAPTURING:
+                reason = "busy"
+            elif previous_motion is not None and now - previous_motion < self.debounce:
+                # Still the same motion event
+                reason = "debounce"
+            elif now < self.cooldown_until:
+                reason = "cooldown"
+            else:
+                self.state = CAPTURING
+                self.executed += 1
+                return True, None
+
+            self.suppressed[reason] += 1
+            return False, reason
+
+    def on_result(self, name=None, now=None):
+        """
+        Register the end of a camera session and start the cooldown.
+        Returns False when name was already recognized within
+        recognized_window seconds, so the repeat result need not be published.
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.state = COOLDOWN
+            self.cooldown_until = now + self.cooldown
+            if name in UNKNOWN_NAMES:
+                return True
+
+            repeat = name == self.last_person and now < self.last_person_until
+            self.last_person = name
+            self.last_person_until = now + self.recognized_window
+            if repeat:
+                self.repeat_results += 1
+            return not repeat
+
+    def on_cancel(self):
+        """
+        Undo an accepted trigger whose session could not be started, e.g.
+        because the dispatcher merged it into a capture already running
+        """
+        with self.lock:
+            if self.state == CAPTURING:
+                self.state = IDLE
+                self.executed -= 1
+                self.suppressed["busy"] += 1
+
+    def get_stats(self, now=None):
+        """Counters of triggers received, suppressed and executed"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            state = self.state
+            if state == COOLDOWN and now >= self.cooldown_until:
+                state = IDLE
+            return {
+                "state": state,
+                "received": self.received,
+                "executed": self.executed,
+                "suppressed": sum(self.suppressed.values()),
+                "suppressed_by_reason": dict(self.suppressed),
+                "repeat_results_suppressed": self.repeat_results,
+                "last_person": self.last_person,
+                "config": {
+                    "debounce": self.debounce,
+                    "cooldown": self.cooldown,
+                    "recognized_window": self.recognized_window
+                }
+            }
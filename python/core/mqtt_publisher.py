@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Persistent MQTT Publisher
+Keeps one connected paho client per broker for the whole process, with
+automatic reconnect and a bounded in-flight window.
+`single()` is a drop-in replacement for paho.mqtt.publish.single that
+skips the connect/handshake/disconnect round trip on every message
+"""
+
+import atexit
+import threading
+import paho.mqtt.client as mqtt
+
+CONNECT_TIMEOUT = 5     # seconds to wait for the first connection
+MAX_INFLIGHT = 20       # unacknowledged QoS 1/2 messages on the wire
+MAX_QUEUED = 1000       # messages buffered while reconnecting (0 = unlimited)
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 30
+
+
+class PersistentPublisher:
+    def __init__(self, hostname, port=1883, keepalive=60, client_id=""):
+        self.hostname = hostname
+        self.port = port
+        self.connected = threading.Event()
+        self.waited_for_connect = False
+        self.last_info = None
+        self.published = 0
+        self.failed = 0
+
+        self.client = mqtt.Client(client_id=client_id)
+        self.client.on_connect = self.on_connect
+        self.client.on_disconnect = self.on_disconnect
+        self.client.max_inflight_messages_set(MAX_INFLIGHT)
+        self.client.max_queued_messages_set(MAX_QUEUED)
+        self.client.reconnect_delay_set(RECONNECT_MIN_DELAY, RECONNECT_MAX_DELAY)
+        self.client.connect_async(hostname, port, keepalive)
+        self.client.loop_start()
+
+    def on_connect(self, client, userdata, flags, rc):
+        if rc == 0:
+            self.connected.set()
+            print(f"✅ Publisher connected to {self.hostname}:{self.port}")
+        else:
+            print(f"❌ Publisher failed to connect, return code: {rc}")
+
+    def on_disconnect(self, client, userdata, rc):
+        self.connected.clear()
+        if rc != 0:
+            print(f"🔌 Publisher lost connection to {self.hostname}, reconnecting...")
+
+    def wait_connected(self, timeout=CONNECT_TIMEOUT):
+        """Block until the client is connected or the timeout expires"""
+        return self.connected.wait(timeout)
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        """
+        Publish on the shared connection.
+        Only the first call waits for the initial connection; after that a
+        lost connection never blocks, since callers may be running inside a
+        paho network-loop callback. QoS 0 messages can't be queued by paho
+        while offline, so they raise like publish.single does when the
+        broker is unreachable.
+        """
+        if not self.waited_for_connect:
+            self.waited_for_connect = True
+            self.wait_connected()
+
+        if not self.connected.is_set() and qos == 0:
+            self.failed += 1
+            raise ConnectionError(f"Not connected to MQTT broker {self.hostname}:{self.port}")
+
+        info = self.client.publish(topic, payload, qos, retain)
+        # QoS 1/2 messages published while reconnecting are kept and resent
+        queued = info.rc == mqtt.MQTT_ERR_NO_CONN and qos > 0
+        if info.rc != mqtt.MQTT_ERR_SUCCESS and not queued:
+            self.failed += 1
+            raise ConnectionError(f"Publish to {topic} failed: {mqtt.error_string(info.rc)}")
+
+        self.published += 1
+        self.last_info = info
+        return info
+
+    def flush(self, timeout=2):
+        """Wait until the last published message has left the client"""
+        if self.last_info is not None and self.connected.is_set():
+            try:
+                self.last_info.wait_for_publish(timeout)
+            except (RuntimeError, ValueError):
+                pass
+
+    def close(self):
+        """Flush, disconnect and stop the network thread"""
+        self.flush()
+        self.client.disconnect()
+        self.client.loop_stop()
+
+
+_publishers = {}
+_lock = threading.Lock()
+
+
+def get_publisher(hostname="localhost", port=1883):
+    """Return the process-wide publisher for a broker, connecting on first use"""
+    key = (hostname, port)
+    with _lock:
+        publisher = _publishers.get(key)
+        if publisher is None:
+            publisher = PersistentPublisher(hostname, port)
+            _publishers[key] = publisher
+        return publisher
+
+
+def single(topic, payload=None, qos=0, retain=False, hostname="localhost", port=1883):
+    """Drop-in replacement for paho.mqtt.publish.single"""
+    return get_publisher(hostname, port).publish(topic, payload, qos, retain)
+
+
+def close_all():
+    """Flush and close every shared publisher"""
+    with _lock:
+        publishers = list(_publishers.values())
+        _publishers.clear()
+    for publisher in publishers:
+        publisher.close()
+
+
+atexit.register(close_all)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+MQTT 3.1.1 Wire Format
+Minimal packet encoding/decoding shared by the local broker stand-in and
+the asyncio load generator. Covers CONNECT, PUBLISH (QoS 0/1), SUBSCRIBE,
+UNSUBSCRIBE, PING and DISCONNECT - enough for paho clients and the
+simulators, not a general purpose MQTT library
+"""
+
+import struct
+
+CONNECT = 1
+CONNACK = 2
+PUBLISH = 3
+PUBACK = 4
+PUBREC = 5
+PUBREL = 6
+PUBCOMP = 7
+SUBSCRIBE = 8
+SUBACK = 9
+UNSUBSCRIBE = 10
+UNSUBACK = 11
+PINGREQ = 12
+PINGRESP = 13
+DISCONNECT = 14
+
+
+def encode_length(length):
+    """Encode the variable-length 'remaining length' field"""
+    out = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        if length:
+            byte |= 0x80
+        out.append(byte)
+        if not length:
+            return bytes(out)
+
+
+def encode_string(value):
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return struct.pack("!H", len(value)) + value
+
+
+def decode_string(data, offset):
+    length = struct.unpack_from("!H", data, offset)[0]
+    start = offset + 2
+    return data[start:start + length].decode('utf-8'), start + length
+
+
+def packet(packet_type, body=b"", flags=0):
+    return bytes([(packet_type << 4) | flags]) + encode_length(len(body)) + body
+
+
+async def read_packet(reader):
+    """Read one packet; returns (type, flags, body) or None at EOF"""
+    try:
+        header = await reader.readexactly(1)
+        multiplier = 1
+        length = 0
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) * multiplier
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+        body = await reader.readexactly(length) if length else b""
+    except Exception:
+        return None
+    return header[0] >> 4, header[0] & 0x0F, body
+
+
+# === Client -> broker ===
+def connect(client_id, keepalive=60, clean_session=True):
+    flags = 0x02 if clean_session else 0x00
+    body = encode_string("MQTT") + bytes([4, flags]) + struct.pack("!H", keepalive) + encode_string(client_id)
+    return packet(CONNECT, body)
+
+
+def publish(topic, payload, qos=0, retain=False, packet_id=0, dup=False):
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    flags = (qos << 1) | (0x01 if retain else 0) | (0x08 if dup else 0)
+    body = encode_string(topic)
+    if qos:
+        body += struct.pack("!H", packet_id)
+    return packet(PUBLISH, body + payload, flags)
+
+
+def subscribe(packet_id, topics):
+    """topics: list of (filter, qos)"""
+    body = struct.pack("!H", packet_id)
+    for topic, qos in topics:
+        body += encode_string(topic) + bytes([qos])
+    return packet(SUBSCRIBE, body, 0x02)
+
+
+def puback(packet_id):
+    return packet(PUBACK, struct.pack("!H", packet_id))
+
+
+def pingreq():
+    return packet(PINGREQ)
+
+
+def disconnect():
+    return packet(DISCONNECT)
+
+
+# === Broker -> client ===
+def connack(return_code=0, session_present=False):
+    return packet(CONNACK, bytes([1 if session_present else 0, return_code]))
+
+
+def suback(packet_id, granted):
+    return packet(SUBACK, struct.pack("!H", packet_id) + bytes(granted))
+
+
+def unsuback(packet_id):
+    return packet(UNSUBACK, struct.pack("!H", packet_id))
+
+
+def pingresp():
+    return packet(PINGRESP)
+
+
+# === Decoding ===
+def parse_connect(body):
+    """Returns (client_id, keepalive, clean_session)"""
+    _, offset = decode_string(body, 0)
+    flags = body[offset + 1]
+    keepalive = struct.unpack_from("!H", body, offset + 2)[0]
+    client_id, _ = decode_string(body, offset + 4)
+    return client_id, keepalive, bool(flags & 0x02)
+
+
+def parse_publish(flags, body):
+    """Returns (topic, payload, qos, retain, packet_id)"""
+    qos = (flags >> 1) & 0x03
+    retain = bool(flags & 0x01)
+    topic, offset = decode_string(body, 0)
+    packet_id = 0
+    if qos:
+        packet_id = struct.unpack_from("!H", body, offset)[0]
+        offset += 2
+    return topic, body[offset:], qos, retain, packet_id
+
+
+def parse_subscribe(body):
+    """Returns (packet_id, [(filter, qos), ...])"""
+    packet_id = struct.unpack_from("!H", body, 0)[0]
+    offset = 2
+    topics = []
+    while offset < len(body):
+        topic, offset = decode_string(body, offset)
+        topics.append((topic, body[offset]))
+        offset += 1
+    return packet_id, topics
+
+
+def parse_unsubscribe(body):
+    """Returns (packet_id, [filter, ...])"""
+    packet_id = struct.unpack_from("!H", body, 0)[0]
+    offset = 2
+    topics = []
+    while offset < len(body):
+        topic, offset = decode_string(body, offset)
+        topics.append(topic)
+    return packet_id, topics
+
+
+def parse_packet_id(body):
+    return struct.unpack_from("!H", body, 0)[0]
+
+
+def topic_matches(topic_filter, topic):
+    """MQTT topic filter matching with '+' and '#' wildcards"""
+    filter_parts = topic_filter.split('/')
+    topic_parts = topic.split('/')
+    for i, part in enumerate(filter_parts):
+        if part == '#':
+            return True
+        if i >= len(topic_parts):
+            return False
+        if part != '+' and part != topic_parts[i]:
+            return False
+    return len(filter_parts) == len(topic_parts)
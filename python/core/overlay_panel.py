@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Cached Overlay Panel
+Detector UIs drew their info box by copying the whole frame, blending the
+copy back over the whole frame with addWeighted and calling putText for
+every line, on every frame. OverlayPanel renders the text of a horizontal
+band once into a cached image and mask, re-renders only when the lines
+change, and per frame only darkens its own band and copies the text pixels
+in place. The result matches the old drawing: blended background, opaque
+text.
+"""
+
+import numpy as np
+
+
+class OverlayPanel:
+    def __init__(self, top, height, alpha=0.3):
+        """Band of `height` rows starting at `top` (negative: from the bottom); alpha darkens it"""
+        self.top = top
+        self.height = height
+        self.alpha = alpha
+        self.key = None
+        self.pixels = None
+        self.mask = None
+        self.stats = {"renders": 0, "frames": 0}
+
+    def rows(self, frame_height):
+        top = self.top if self.top >= 0 else frame_height + self.top
+        return max(0, top), min(frame_height, top + self.height)
+
+    def render(self, width, lines):
+        """
+        lines: [(text, (x, y) in band pixels, font scale, BGR colour, thickness)].
+        Redraws the cached text only when lines or width changed; returns True if it did.
+        """
+        import cv2
+
+        key = (width, tuple(lines))
+        if key == self.key:
+            return False
+        pixels = np.zeros((self.height, width, 3), dtype=np.uint8)
+        mask = np.zeros((self.height, width), dtype=np.uint8)
+        for text, origin, scale, color, thickness in lines:
+            cv2.putText(pixels, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+            cv2.putText(mask, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+        self.pixels, self.mask, self.key = pixels, mask.astype(bool), key
+        self.stats["renders"] += 1
+        return True
+
+    def apply(self, frame):
+        """Blend the band and stamp the cached text onto frame, in place"""
+        import cv2
+
+        top, bottom = self.rows(frame.shape[0])
+        band = frame[top:bottom]
+        if self.alpha:
+            cv2.convertScaleAbs(band, dst=band, alpha=1 - self.alpha)
+        if self.pixels is not None:
+            rows = bottom - top
+            np.copyto(band, self.pixels[:rows], where=self.mask[:rows, :, None])
+        self.stats["frames"] += 1
+        return frame
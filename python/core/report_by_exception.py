@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Report by Exception
+Decides whether a sensor sample is worth publishing: a sample goes out
+when a numeric field moved past its deadband since the last published
+sample, when a motion sensor (PIR/IR) changed state, or when nothing has
+been published for MAX_SILENCE seconds (heartbeat). Everything else is
+suppressed and counted, so the broker and the database only see changes.
+
+Deadbands compare against the last published value, not the previous
+sample, so a slow drift is still reported once it adds up. A sample only
+counts as published once the caller confirms it with published(), so a
+failed publish is retried with the next sample.
+"""
+
+import time
+
+DEADBANDS = {"temp": 0.3, "hum": 1.0, "ldr": 15}
+EDGE_FIELDS = ("pir", "ir")
+MAX_SILENCE = 30  # seconds between heartbeat publishes
+
+
+class ExceptionReporter:
+    def __init__(self, deadbands=None, edge_fields=EDGE_FIELDS, max_silence=MAX_SILENCE):
+        self.deadbands = dict(DEADBANDS if deadbands is None else deadbands)
+        self.edge_fields = tuple(edge_fields)
+        self.max_silence = max_silence
+        self.last_published = None
+        self.last_publish_time = None
+        self.stats = {"samples": 0, "published": 0, "suppressed": 0, "reasons": {}}
+
+    def reason_to_publish(self, sample, now):
+        if self.last_published is None:
+            return "first"
+        for field in self.edge_fields:
+            if sample.get(field) != self.last_published.get(field):
+                return f"edge:{field}"
+        for field, deadband in self.deadbands.items():
+            value, last = sample.get(field), self.last_published.get(field)
+            if value is None or last is None:
+                if value is not last:
+                    return f"deadband:{field}"
+            elif abs(value - last) >= deadband:
+                return f"deadband:{field}"
+        if now - self.last_publish_time >= self.max_silence:
+            return "heartbeat"
+        return None
+
+    def should_publish(self, sample, now=None):
+        """(publish, reason); call published() once the sample has actually gone out"""
+        now = time.time() if now is None else now
+        reason = self.reason_to_publish(sample, now)
+        self.stats["samples"] += 1
+        if reason is None:
+            self.stats["suppressed"] += 1
+            return False, None
+        return True, reason
+
+    def published(self, sample, reason, now=None):
+        """Record a successful publish; deadbands and the heartbeat are measured from it"""
+        self.stats["published"] += 1
+        self.stats["reasons"][reason] = self.stats["reasons"].get(reason, 0) + 1
+        self.last_published = dict(sample)
+        self.last_publish_time = time.time() if now is None else now
+
+    def suppression_ratio(self):
+        return self.stats["suppressed"] / self.stats["samples"] if self.stats["samples"] else 0.0
+
+    def summary(self):
+        return (f"{self.stats['published']}/{self.stats['samples']} samples published, "
+                f"{self.stats['suppressed']} suppressed ({self.suppression_ratio():.0%})")
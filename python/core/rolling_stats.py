@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Rolling Sensor Statistics
+Mean, variance, min and max of each sensor field over a sliding window,
+updated in O(1) per sample instead of re-reading the window from the
+database.
+
+The window is split into fixed buckets (24 x 1 hour by default). Each bucket
+keeps Welford running moments, and the window stats merge the live buckets
+with Chan's parallel formula, so the cost is bounded by the bucket count
+however many samples arrive. The oldest bucket expires as a whole, so the
+window covers between 23 and 24 hours. It is seeded once from the hourly
+rollup table, or from a grouped SQL query over the raw rows when the rollup
+is empty or the buckets aren't hourly.
+"""
+
+import math
+import threading
+import time
+
+import sensor_aggregates
+
+
+class Moments:
+    """Count, mean, sum of squared deviations, min and max of one field"""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, low=math.inf, high=-math.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = low
+        self.max = high
+
+    def add(self, value):
+        # Welford's online update
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        # Chan et al. pairwise combination
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def as_dict(self):
+        variance = self.m2 / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "variance": variance,
+            "stddev": math.sqrt(variance),
+            "min": self.min,
+            "max": self.max
+        }
+
+
+class RollingStats:
+    def __init__(self, fields=sensor_aggregates.FIELDS, window_hours=24, bucket_seconds=3600):
+        self.fields = tuple(fields)
+        self.bucket_seconds = bucket_seconds
+        self.window_buckets = max(1, int(window_hours * 3600 // bucket_seconds))
+        self.buckets = {}  # bucket index -> {field: Moments}
+        self.lock = threading.Lock()
+        self.samples_added = 0
+        self.seeded_rows = 0
+
+    def bucket_index(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+
+    def expire(self, now):
+        oldest = self.bucket_index(now) - self.window_buckets + 1
+        for index in [i for i in self.buckets if i < oldest]:
+            del self.buckets[index]
+
+    def seed_from_db(self, connection):
+        """Load per-bucket aggregates for the window in one query"""
+        window_hours = math.ceil(self.window_buckets * self.bucket_seconds / 3600)
+        cursor = connection.cursor()
+        try:
+            rows = []
+            if self.bucket_seconds == 3600:
+                cursor.execute(sensor_aggregates.rollup_buckets_query(self.fields), (window_hours,))
+                rows = cursor.fetchall()
+            if not rows:
+                cursor.execute(sensor_aggregates.bucketed_stats_query(self.fields),
+                               (self.bucket_seconds, window_hours))
+                rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        for row in rows:
+            self.seed_bucket(int(row[0]), sensor_aggregates.parse_stats(row[1:], self.fields))
+        return len(rows)
+
+    def seed_bucket(self, index, stats):
+        """Merge aggregate {field: {count, mean, variance, min, max}} into a bucket"""
+        with self.lock:
+            bucket = self.buckets.setdefault(index, {})
+            for field, values in stats.items():
+                seeded = Moments(values["count"], values["mean"], values["variance"] * values["count"],
+                                 values["min"], values["max"])
+                bucket.setdefault(field, Moments()).merge(seeded)
+            self.seeded_rows += 1
+
+    def add(self, sample, timestamp=None):
+        """Add one sensor payload; non-numeric or missing fields are skipped"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            bucket = self.buckets.setdefault(self.bucket_index(timestamp), {})
+            for field in self.fields:
+                value = sample.get(field)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    bucket.setdefault(field, Moments()).add(float(value))
+            self.samples_added += 1
+            self.expire(timestamp)
+
+    def stats(self, field, now=None):
+        """Window stats for a field, or None when there are no samples"""
+        now = time.time() if now is None else now
+        with self.lock:
+            self.expire(now)
+            total = Moments()
+            for bucket in self.buckets.values():
+                if field in bucket:
+                    total.merge(bucket[field])
+        return total.as_dict() if total.count else None
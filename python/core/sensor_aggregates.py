@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Sensor Aggregate Queries
+SQL for statistics over the esp/sensors rows of the sensors table, computed
+inside MySQL so only aggregate rows cross the wire instead of one JSON
+document per 2-second sample.
+
+Raw queries read the typed generated columns of sensors (backend/schema.sql).
+The rollup variants read sensor_rollup_minute / sensor_rollup_hour, kept
+current by sensor_rollup.py, and merge per-bucket count/mean/variance
+exactly; the fetch_* helpers fall back to the raw table when the rollups
+are empty.
+"""
+
+SENSOR_TOPIC = "esp/sensors"
+FIELDS = ("temp", "hum", "ldr")
+
+# Numeric value of a payload field: the typed generated column, NULL when the
+# payload doesn't carry a number, which AVG/MIN/MAX/COUNT/VAR_POP all skip
+FIELD_EXPRESSIONS = {field: field for field in FIELDS}
+
+# Rollup tables by granularity: (table, bucket seconds)
+ROLLUP_TABLES = {
+    "minute": ("sensor_rollup_minute", 60),
+    "hour": ("sensor_rollup_hour", 3600)
+}
+MINUTE_ROLLUP_MAX_HOURS = 48  # longer ranges read hourly buckets
+
+
+def stats_columns(fields=FIELDS):
+    """COUNT, AVG, VAR_POP, MIN, MAX per field, in that order"""
+    columns = []
+    for field in fields:
+        expression = FIELD_EXPRESSIONS[field]
+        columns += [f"COUNT({expression})", f"AVG({expression})", f"VAR_POP({expression})",
+                    f"MIN({expression})", f"MAX({expression})"]
+    return ",\n    ".join(columns)
+
+
+def bucketed_stats_query(fields=FIELDS):
+    """Per-bucket stats for the last N hours; params: (bucket_seconds, hours)"""
+    return f"""
+SELECT FLOOR(UNIX_TIMESTAMP(recorded_at) / %s) AS bucket,
+    {stats_columns(fields)}
+FROM sensors
+WHERE topic = '{SENSOR_TOPIC}'
+AND recorded_at >= NOW() - INTERVAL %s HOUR
+GROUP BY bucket
+"""
+
+
+def window_stats_query(fields=FIELDS):
+    """One row of stats over the last N hours; params: (hours,)"""
+    return f"""
+SELECT {stats_columns(fields)}
+FROM sensors
+WHERE topic = '{SENSOR_TOPIC}'
+AND recorded_at >= NOW() - INTERVAL %s HOUR
+"""
+
+
+def hour_of_day_stats_query(fields=FIELDS):
+    """Stats per hour of day (0-23) over the last N days; params: (days,)"""
+    return f"""
+SELECT HOUR(recorded_at) AS hour_of_day,
+    {stats_columns(fields)}
+FROM sensors
+WHERE topic = '{SENSOR_TOPIC}'
+AND recorded_at >= NOW() - INTERVAL %s DAY
+GROUP BY hour_of_day
+"""
+
+
+def parse_stats(values, fields=FIELDS):
+    """Split a row of stats_columns() values into {field: stats}"""
+    stats = {}
+    for i, field in enumerate(fields):
+        count, mean, variance, low, high = values[i * 5:i * 5 + 5]
+        if not count:
+            continue
+        stats[field] = {
+            "count": int(count),
+            "mean": float(mean),
+            "variance": float(variance or 0),
+            "stddev": float(variance or 0) ** 0.5,
+            "min": float(low),
+            "max": float(high)
+        }
+    return stats
+
+
+def rollup_for_hours(hours):
+    """Granularity that keeps a chart of `hours` at a few thousand points at most"""
+    return "minute" if hours <= MINUTE_ROLLUP_MAX_HOURS else "hour"
+
+
+def rollup_stats_columns(fields=FIELDS):
+    """Same columns as stats_columns(), merged from per-bucket rollup rows"""
+    columns = []
+    for field in fields:
+        count, avg, var = f"{field}_count", f"{field}_avg", f"{field}_var"
+        mean = f"SUM({avg} * {count}) / SUM({count})"
+        columns += [
+            f"SUM({count})",
+            mean,
+            # Population variance of the union: E[x^2] - mean^2
+            f"GREATEST(0, SUM({count} * ({var} + {avg} * {avg})) / SUM({count}) - POW({mean}, 2))",
+            f"MIN({field}_min)",
+            f"MAX({field}_max)"
+        ]
+    return ",\n    ".join(columns)
+
+
+def rollup_window_stats_query(fields=FIELDS):
+    """window_stats_query() over the hourly rollup; params: (hours,)"""
+    return f"""
+SELECT {rollup_stats_columns(fields)}
+FROM sensor_rollup_hour
+WHERE topic = '{SENSOR_TOPIC}'
+AND bucket_start >= NOW() - INTERVAL %s HOUR
+"""
+
+
+def rollup_hour_of_day_stats_query(fields=FIELDS):
+    """hour_of_day_stats_query() over the hourly rollup; params: (days,)"""
+    return f"""
+SELECT HOUR(bucket_start) AS hour_of_day,
+    {rollup_stats_columns(fields)}
+FROM sensor_rollup_hour
+WHERE topic = '{SENSOR_TOPIC}'
+AND bucket_start >= NOW() - INTERVAL %s DAY
+GROUP BY hour_of_day
+"""
+
+
+def rollup_buckets_query(fields=FIELDS):
+    """bucketed_stats_query() rows for 1 hour buckets, read straight from the rollup; params: (hours,)"""
+    columns = ", ".join(f"{field}_count, {field}_avg, {field}_var, {field}_min, {field}_max" for field in fields)
+    return f"""
+SELECT FLOOR(UNIX_TIMESTAMP(bucket_start) / 3600) AS bucket, {columns}
+FROM sensor_rollup_hour
+WHERE topic = '{SENSOR_TOPIC}'
+AND bucket_start >= NOW() - INTERVAL %s HOUR
+"""
+
+
+def rollup_history_query(granularity):
+    """Chart points from a rollup table; params: (topic, hours)"""
+    table, _ = ROLLUP_TABLES[granularity]
+    return f"""
+SELECT bucket_start, samples, temp_avg, hum_avg, ldr_avg, pir_events, ir_events
+FROM {table}
+WHERE topic = %s
+AND bucket_start >= NOW() - INTERVAL %s HOUR
+ORDER BY bucket_start ASC
+"""
+
+
+def fetch_window_stats(cursor, hours, fields=FIELDS):
+    """{field: stats} over the last `hours`, from the hourly rollup when it has data"""
+    cursor.execute(rollup_window_stats_query(fields), (hours,))
+    row = cursor.fetchone()
+    stats = parse_stats(row, fields) if row else {}
+    if not stats:
+        cursor.execute(window_stats_query(fields), (hours,))
+        row = cursor.fetchone()
+        stats = parse_stats(row, fields) if row else {}
+    return stats
+
+
+def fetch_hour_of_day_stats(cursor, days, fields=FIELDS):
+    """{hour of day: {field: stats}} over the last `days`, from the hourly rollup when it has data"""
+    cursor.execute(rollup_hour_of_day_stats_query(fields), (days,))
+    rows = cursor.fetchall()
+    if not rows:
+        cursor.execute(hour_of_day_stats_query(fields), (days,))
+        rows = cursor.fetchall()
+    return {int(row[0]): parse_stats(row[1:], fields) for row in rows}
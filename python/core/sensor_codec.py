@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Compact Sensor Codec
+Fixed-layout binary encoding of esp/sensors samples, published on the
+parallel topic esp/sensors/bin. A sample is 15 bytes (19 with a hardware
+IP) instead of the 80-200 bytes of the JSON document.
+
+Every message starts with a schema id byte so the layout can change
+without breaking consumers that still decode the older one. Schema 1:
+
+    offset size  field
+    0      1     schema id (1)
+    1      1     flags: 0x01 pir, 0x02 ir, 0x04 pattern_based, 0x08 temp,
+                 0x10 hum, 0x20 ldr, 0x40 hardware_ip present
+    2      1     source, index into SOURCES (0 = none)
+    3      4     timestamp, whole seconds (uint32)
+    7      2     timestamp milliseconds (uint16)
+    9      2     temp x 100 (int16)
+    11     2     hum x 100 (uint16)
+    13     2     ldr (uint16)
+    15     4     hardware_ip, IPv4 (only with flag 0x40)
+
+Only the fields above are carried; anything else in the JSON sample (e.g.
+a latency trace) is dropped. Samples the layout can't represent raise
+ValueError so the caller can publish them as JSON instead. Consumers that
+subscribe to both topics drop the second copy of a sample with
+DuplicateFilter.
+"""
+
+import ipaddress
+import json
+import struct
+from collections import deque
+
+TOPIC_SENSORS = "esp/sensors"
+TOPIC_SENSORS_BIN = "esp/sensors/bin"
+DEDUP_WINDOW = 64  # samples remembered per encoding for DuplicateFilter
+
+SCHEMA_V1 = 1
+V1 = struct.Struct("<BBBIHhHH")
+V1_IP = struct.Struct("<4s")
+
+# Known "source" values; append only, the index is on the wire
+SOURCES = (None, "simulated", "enhanced_simulation", "enhanced_database", "database_enhanced",
+           "hardware_machine")
+
+PIR, IR, PATTERN_BASED, HAS_TEMP, HAS_HUM, HAS_LDR, HAS_IP = (1 << bit for bit in range(7))
+
+
+def _scaled(value, scale, low, high, name):
+    scaled = round(float(value) * scale)
+    if not low <= scaled <= high:
+        raise ValueError(f"{name}={value} is outside the schema {SCHEMA_V1} range")
+    return scaled
+
+
+def encode(data):
+    """Sample dict -> schema 1 bytes; ValueError when the sample doesn't fit"""
+    flags = 0
+    if data.get("pir") == 1:
+        flags |= PIR
+    if data.get("ir") == 1:
+        flags |= IR
+    if data.get("pattern_based"):
+        flags |= PATTERN_BASED
+
+    temp = hum = ldr = 0
+    if data.get("temp") is not None:
+        flags |= HAS_TEMP
+        temp = _scaled(data["temp"], 100, -32768, 32767, "temp")
+    if data.get("hum") is not None:
+        flags |= HAS_HUM
+        hum = _scaled(data["hum"], 100, 0, 65535, "hum")
+    if data.get("ldr") is not None:
+        flags |= HAS_LDR
+        ldr = _scaled(data["ldr"], 1, 0, 65535, "ldr")
+
+    source = data.get("source")
+    if source not in SOURCES:
+        raise ValueError(f"source={source!r} has no schema {SCHEMA_V1} code")
+
+    packed_ip = b""
+    if data.get("hardware_ip"):
+        flags |= HAS_IP
+        try:
+            packed_ip = V1_IP.pack(ipaddress.IPv4Address(data["hardware_ip"]).packed)
+        except ValueError:
+            raise ValueError(f"hardware_ip={data['hardware_ip']!r} is not IPv4")
+
+    timestamp = float(data.get("timestamp", 0))
+    seconds = int(timestamp)
+    millis = min(999, round((timestamp - seconds) * 1000))
+
+    return V1.pack(SCHEMA_V1, flags, SOURCES.index(source), seconds, millis, temp, hum, ldr) + packed_ip
+
+
+def decode(payload):
+    """Schema-tagged bytes -> sample dict with the JSON field names"""
+    if not payload:
+        raise ValueError("empty sensor payload")
+    if payload[0] != SCHEMA_V1:
+        raise ValueError(f"unknown sensor schema id {payload[0]}")
+    if len(payload) < V1.size:
+        raise ValueError(f"schema {SCHEMA_V1} payload is {len(payload)} bytes, expected {V1.size}")
+
+    _, flags, source, seconds, millis, temp, hum, ldr = V1.unpack_from(payload)
+    if flags & HAS_IP and len(payload) < V1.size + V1_IP.size:
+        raise ValueError(f"schema {SCHEMA_V1} payload flags a hardware IP but is {len(payload)} bytes")
+    data = {
+        "pir": 1 if flags & PIR else 0,
+        "ir": 1 if flags & IR else 0,
+        "timestamp": seconds + millis / 1000
+    }
+    if flags & HAS_TEMP:
+        data["temp"] = temp / 100
+    if flags & HAS_HUM:
+        data["hum"] = hum / 100
+    if flags & HAS_LDR:
+        data["ldr"] = ldr
+    if 0 < source < len(SOURCES):
+        data["source"] = SOURCES[source]
+    if flags & HAS_IP:
+        data["hardware_ip"] = str(ipaddress.IPv4Address(V1_IP.unpack_from(payload, V1.size)[0]))
+    if flags & PATTERN_BASED:
+        data["pattern_based"] = True
+    return data
+
+
+def decode_message(topic, payload):
+    """(topic, payload) of either format -> (JSON topic, data); binary samples map to esp/sensors"""
+    if topic == TOPIC_SENSORS_BIN:
+        return TOPIC_SENSORS, decode(payload)
+    if isinstance(payload, (bytes, bytearray)):
+        payload = payload.decode()
+    return topic, json.loads(payload)
+
+
+def sample_key(data):
+    """Identity of a sample that survives the round trip: hardware IP and millisecond timestamp"""
+    timestamp = float(data.get("timestamp", 0))
+    seconds = int(timestamp)
+    return data.get("hardware_ip"), seconds, min(999, round((timestamp - seconds) * 1000))
+
+
+class DuplicateFilter:
+    """
+    With --encoding both every sample arrives on esp/sensors and on
+    esp/sensors/bin. duplicate() is True for the second copy: a sample whose
+    key was already seen on the other topic. Samples repeated on the same
+    topic, or without a timestamp, always pass.
+    """
+
+    def __init__(self, window=DEDUP_WINDOW):
+        self.recent = {TOPIC_SENSORS: deque(maxlen=window), TOPIC_SENSORS_BIN: deque(maxlen=window)}
+
+    def duplicate(self, topic, data):
+        """topic: the topic the message arrived on; data: the decoded sample"""
+        if topic not in self.recent or not isinstance(data, dict) or "timestamp" not in data:
+            return False
+        key = sample_key(data)
+        other = TOPIC_SENSORS_BIN if topic == TOPIC_SENSORS else TOPIC_SENSORS
+        if key in self.recent[other]:
+            self.recent[other].remove(key)
+            return True
+        self.recent[topic].append(key)
+        return False
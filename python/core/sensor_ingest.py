@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Batched Sensor Ingest Service
+Subscribes to the same topics as backend/server.js and writes the rows
+server.js would have written into the sensors table, in multi-row batches
+instead of one INSERT and commit per message. Messages server.js skips
+(debug and status topics, log lines, switch/button states, water motor and
+water level updates, external water-motor commands) and payloads that are
+not JSON objects, arrays or null are skipped here too. Compact
+esp/sensors/bin samples are the one addition: they are stored as the
+esp/sensors row they stand in for, once per sample when a device publishes
+both encodings.
+
+A writer thread flushes when BATCH_SIZE rows are buffered or FLUSH_INTERVAL
+seconds have passed, using executemany over a pooled connection. Rows keep
+their receive time in recorded_at, so batching doesn't shift timestamps.
+
+Delivery is at-least-once from the moment a message is received: a batch
+that fails to commit is appended to a local JSONL spill file and replayed
+ahead of the next batch once MySQL is back, and the buffer is flushed (or
+spilled) on shutdown. A batch that fails after a partial commit may be
+written twice. The MQTT session is persistent with QoS 1 subscriptions so
+the broker queues messages while the service is disconnected.
+
+Run with SENSOR_INGEST=python in the backend environment so server.js
+stops inserting the same messages.
+
+Usage: python python/core/sensor_ingest.py [--batch-size 500] [--flush-interval 1.0]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+
+import sensor_codec
+
+# Database configuration - Update these values to match your MySQL setup
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'your_mysql_password_here',  # Update this with your actual MySQL password
+    'database': 'smarthome'
+}
+
+# MQTT Configuration
+BROKER = "broker-cn.emqx.io"
+PORT = 1883
+CLIENT_ID = "sensor-ingest"
+
+# backend/server.js subscriptions and skip rules; keep them in step
+INGEST_TOPICS = ("esp/sensors", "esp/status", "esp/#", "esp/water_level", "fridge/inventory", "esp/cam",
+                 "home/sensors/water-motor", "home/control", "device/boot")
+SKIP_TOPIC_PARTS = ("/debug", "/status", "/switch/", "/button/")
+SKIP_PREFIXES = ("[D]", "[I]", "[W]", "[E]")
+HANDLED_TOPICS = ("home/sensors/water-motor", "esp/water_level", "home/sensors/water-level", "device/water/level")
+BATCH_SIZE = 500        # rows per executemany
+FLUSH_INTERVAL = 1.0    # seconds a row may wait in the buffer
+POOL_SIZE = 2
+SPILL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sensor_ingest_spill.jsonl")
+
+INSERT_QUERY = "INSERT INTO sensors (topic, value_json, recorded_at) VALUES (%s, %s, FROM_UNIXTIME(%s))"
+
+
+def skipped_by_backend(topic, raw):
+    """True for the messages server.js handles without inserting a sensors row"""
+    if any(part in topic for part in SKIP_TOPIC_PARTS) or raw.startswith(SKIP_PREFIXES):
+        return True
+    if topic in HANDLED_TOPICS:
+        return True
+    return topic == "home/control" and "water-motor" in raw.lower()
+
+
+def parse_payload(topic, payload):
+    """(topic, value_json) for the rows server.js stores (JSON objects, arrays
+    and null, typeof 'object' in JS) and compact esp/sensors/bin samples
+    (stored as esp/sensors); value_json is None for messages it doesn't store"""
+    if topic == sensor_codec.TOPIC_SENSORS_BIN:
+        try:
+            topic, data = sensor_codec.decode_message(topic, payload)
+        except ValueError:
+            return topic, None
+        return topic, json.dumps(data)
+    raw = payload.decode("utf-8", errors="replace") if isinstance(payload, (bytes, bytearray)) else payload
+    if skipped_by_backend(topic, raw):
+        return topic, None
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return topic, None
+    return topic, json.dumps(data) if data is None or isinstance(data, (dict, list)) else None
+
+
+class SpillFile:
+    """Append-only JSONL file of rows that could not be written yet"""
+
+    def __init__(self, path=SPILL_FILE):
+        self.path = path
+
+    def append(self, rows):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for topic, value_json, received_at in rows:
+                f.write(json.dumps([topic, value_json, received_at]) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        rows = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(tuple(json.loads(line)))
+                except ValueError:
+                    continue  # torn last line from a crash mid-write
+        return rows
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class SensorIngest:
+    def __init__(self, connect, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, spill=None):
+        """connect: callable returning a DB-API connection (a pooled one in main())"""
+        self.connect = connect
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill = spill or SpillFile()
+        self.buffer = []  # (topic, value_json, received_at)
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.duplicates = sensor_codec.DuplicateFilter()
+        self.stats = {"received": 0, "skipped": 0, "duplicates": 0, "rows_written": 0, "batches": 0,
+                      "spilled_rows": 0, "replayed_rows": 0, "failures": 0}
+
+    def submit(self, topic, payload, received_at=None):
+        """Buffer one MQTT message; called from the paho network thread"""
+        received_on = topic
+        topic, value_json = parse_payload(topic, payload)
+        if value_json is None:
+            self.stats["skipped"] += 1
+            return
+        if topic == sensor_codec.TOPIC_SENSORS and self.duplicates.duplicate(received_on, json.loads(value_json)):
+            self.stats["duplicates"] += 1  # same sample already received in the other encoding
+            return
+        row = (topic, value_json, time.time() if received_at is None else received_at)
+        with self.condition:
+            self.buffer.append(row)
+            self.stats["received"] += 1
+            if len(self.buffer) >= self.batch_size:
+                self.condition.notify()
+
+    def write(self, rows):
+        """executemany the rows in batch_size chunks, one commit per chunk"""
+        connection = self.connect()
+        try:
+            cursor = connection.cursor()
+            try:
+                for i in range(0, len(rows), self.batch_size):
+                    cursor.executemany(INSERT_QUERY, rows[i:i + self.batch_size])
+                    connection.commit()
+                    self.stats["batches"] += 1
+            finally:
+                cursor.close()
+        finally:
+            connection.close()  # returns a pooled connection to the pool
+
+    def flush(self):
+        """Write spilled rows and the buffer; spill the buffer if that fails. Returns rows written."""
+        with self.condition:
+            rows, self.buffer = self.buffer, []
+        with self.flush_lock:
+            spilled = self.spill.load()
+            if not rows and not spilled:
+                return 0
+            try:
+                self.write(spilled + rows)
+            except Exception as e:
+                self.stats["failures"] += 1
+                if rows:
+                    self.spill.append(rows)
+                    self.stats["spilled_rows"] += len(rows)
+                print(f"❌ Ingest write failed, {len(spilled) + len(rows)} rows in {self.spill.path}: {e}")
+                return 0
+            self.spill.clear()
+            self.stats["replayed_rows"] += len(spilled)
+            self.stats["rows_written"] += len(spilled) + len(rows)
+            return len(spilled) + len(rows)
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: len(self.buffer) >= self.batch_size or not self.running,
+                                        timeout=self.flush_interval)
+                running = self.running
+            self.flush()
+            if not running:
+                break
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="sensor-ingest-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the writer after a final flush"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread:
+            self.thread.join()
+
+
+def create_pool(size=POOL_SIZE):
+    from mysql.connector import pooling
+    return pooling.MySQLConnectionPool(pool_name="sensor_ingest", pool_size=size, **DB_CONFIG)
+
+
+def create_client(ingest, broker=BROKER, port=PORT, client_id=CLIENT_ID):
+    """Persistent-session subscriber feeding the ingest buffer"""
+    import paho.mqtt.client as mqtt
+
+    client = mqtt.Client(client_id=client_id, clean_session=False)
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            print(f"✅ Connected to MQTT broker {broker}:{port}")
+            client.subscribe([(topic, 1) for topic in INGEST_TOPICS])
+        else:
+            print(f"❌ MQTT connection failed with code {rc}")
+
+    def on_message(client, userdata, msg):
+        ingest.submit(msg.topic, msg.payload)
+
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.connect(broker, port, 60)
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched MQTT to MySQL sensor ingest")
+    parser.add_argument("--broker", default=BROKER)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL)
+    parser.add_argument("--spill-file", default=SPILL_FILE)
+    args = parser.parse_args()
+
+    pool = create_pool()
+    ingest = SensorIngest(pool.get_connection, args.batch_size, args.flush_interval, SpillFile(args.spill_file))
+    ingest.start()
+    client = create_client(ingest, args.broker, args.port)
+    print(f"📥 Ingesting {', '.join(INGEST_TOPICS)} in batches of {args.batch_size} / {args.flush_interval}s")
+
+    client.loop_start()
+    try:
+        while True:
+            time.sleep(10)
+            print(f"📊 {ingest.stats}")
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping sensor ingest...")
+    finally:
+        client.disconnect()
+        client.loop_stop()
+        ingest.stop()
+        print(f"📊 {ingest.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Sensor Rollup Job
+Keeps sensor_rollup_minute and sensor_rollup_hour current from the typed
+columns of the sensors table (see backend/schema.sql), so history readers
+load about 1,440 minute buckets for a 24 hour chart instead of 43,200 raw
+2-second rows.
+
+Every run re-aggregates the previous and the current bucket of each
+granularity and upserts them, so late rows and the partially filled
+current bucket are picked up on the next run.
+
+Usage: python python/core/sensor_rollup.py [--interval 60] [--once] [--backfill-hours 720]
+"""
+
+import argparse
+import time
+
+import sensor_aggregates
+
+# Database configuration - Update these values to match your MySQL setup
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'your_mysql_password_here',  # Update this with your actual MySQL password
+    'database': 'smarthome'
+}
+
+ROLLUP_TOPICS = ("esp/sensors",)
+BACKFILL_CHUNK_HOURS = 24  # hours aggregated per statement during a backfill
+
+ROLLUP_COLUMNS = ["samples"] + [
+    f"{field}_{stat}" for field in sensor_aggregates.FIELDS for stat in ("count", "avg", "var", "min", "max")
+] + ["pir_events", "ir_events"]
+
+
+def rollup_query(granularity, topic_count):
+    """INSERT ... SELECT upsert of all buckets in a time range; params: topics..., start, end (epoch seconds)"""
+    table, seconds = sensor_aggregates.ROLLUP_TABLES[granularity]
+    aggregates = ["COUNT(*)"]
+    for field in sensor_aggregates.FIELDS:
+        aggregates += [f"COUNT({field})", f"AVG({field})", f"VAR_POP({field})", f"MIN({field})", f"MAX({field})"]
+    aggregates += ["COALESCE(SUM(pir), 0)", "COALESCE(SUM(ir), 0)"]
+    placeholders = ", ".join(["%s"] * topic_count)
+    return f"""
+INSERT INTO {table} (topic, bucket_start, {", ".join(ROLLUP_COLUMNS)})
+SELECT topic, FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(recorded_at) / {seconds}) * {seconds}) AS bucket_start,
+    {", ".join(aggregates)}
+FROM sensors
+WHERE topic IN ({placeholders})
+AND recorded_at >= FROM_UNIXTIME(%s) AND recorded_at < FROM_UNIXTIME(%s)
+GROUP BY topic, bucket_start
+ON DUPLICATE KEY UPDATE {", ".join(f"{column} = VALUES({column})" for column in ROLLUP_COLUMNS)}
+"""
+
+
+def rollup_range(connection, granularity, start, end, topics=ROLLUP_TOPICS):
+    """Aggregate [start, end) into the rollup table; returns affected rows"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(rollup_query(granularity, len(topics)), (*topics, start, end))
+        affected = cursor.rowcount
+        connection.commit()
+    finally:
+        cursor.close()
+    return affected
+
+
+def refresh(connection, now=None):
+    """Re-aggregate the previous and current bucket of every granularity"""
+    now = time.time() if now is None else now
+    for granularity, (_, seconds) in sensor_aggregates.ROLLUP_TABLES.items():
+        start = (now // seconds - 1) * seconds
+        rollup_range(connection, granularity, start, now + 1)
+
+
+def backfill(connection, hours, now=None):
+    """Aggregate the last `hours` of history in day-sized chunks"""
+    now = time.time() if now is None else now
+    for granularity, (_, seconds) in sensor_aggregates.ROLLUP_TABLES.items():
+        start = (now - hours * 3600) // seconds * seconds
+        while start < now:
+            end = start + BACKFILL_CHUNK_HOURS * 3600
+            if end >= now:
+                end = now + 1  # include the current second, like refresh()
+            rollup_range(connection, granularity, start, end)
+            start = end
+        print(f"✅ Backfilled {granularity} rollup for the last {hours} hours")
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description="Maintain minute/hour sensor rollup tables")
+    parser.add_argument("--interval", type=float, default=60, help="seconds between refreshes")
+    parser.add_argument("--once", action="store_true", help="refresh once and exit")
+    parser.add_argument("--backfill-hours", type=int, default=0, help="aggregate this much history first")
+    args = parser.parse_args()
+
+    connection = mysql.connector.connect(**DB_CONFIG)
+    print("✅ Connected to MySQL database")
+    try:
+        if args.backfill_hours:
+            backfill(connection, args.backfill_hours)
+        while True:
+            started = time.monotonic()
+            refresh(connection)
+            print(f"📊 Rollups refreshed in {(time.monotonic() - started) * 1000:.0f} ms")
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping rollup job...")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
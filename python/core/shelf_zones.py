@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Shelf Zones
+Polygonal regions of interest for a fridge camera (door shelves, main
+shelves, crisper drawer, ...). Instead of running the detector on the whole
+frame, each zone's bounding rectangle is cropped, pixels outside the
+polygon are greyed out, and all crops go to the model as one batch. The
+model scales every crop up to its input size, so small items such as eggs
+get more effective pixels, and walls and the door frame are never seen.
+
+Zones are configured per camera in a JSON file with points as fractions of
+the frame size, so the same layout works at any resolution:
+
+    {"default": [{"name": "door", "points": [[0.75, 0], [1, 0], [1, 1], [0.75, 1]]}]}
+
+A zone with "tile": {"size": 320, "overlap": 0.25, "classes": ["egg"]} (or
+just "tile": true) is additionally cut into overlapping tiles that go into
+the same batch (tiled_inference.py), for small items the full crop misses.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from tiled_inference import Tiling
+
+MASK_VALUE = 114  # grey, the letterbox padding colour YOLO is trained with
+WHOLE_FRAME = "fridge"
+
+
+class Zone:
+    def __init__(self, name, points, tiling=None):
+        self.name = name
+        self.points = [(float(x), float(y)) for x, y in points]
+        self.tiling = tiling
+
+    def pixels(self, width, height):
+        return np.array([(x * width, y * height) for x, y in self.points])
+
+    def bounds(self, width, height):
+        """(x0, y0, x1, y1) pixel rectangle around the polygon, clipped to the frame"""
+        polygon = self.pixels(width, height)
+        x0, y0 = np.floor(polygon.min(axis=0)).astype(int)
+        x1, y1 = np.ceil(polygon.max(axis=0)).astype(int)
+        return max(0, x0), max(0, y0), min(width, x1), min(height, y1)
+
+    def contains(self, xs, ys, width, height):
+        """Even-odd point-in-polygon test for pixel coordinates (scalars or arrays)"""
+        xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+        polygon = self.pixels(width, height)
+        inside = np.zeros(np.broadcast(xs, ys).shape, dtype=bool)
+        for (ax, ay), (bx, by) in zip(polygon, np.roll(polygon, -1, axis=0)):
+            if ay == by:
+                continue
+            crosses = (ay > ys) != (by > ys)
+            x_cross = ax + (ys - ay) * (bx - ax) / (by - ay)
+            inside ^= crosses & (xs < x_cross)
+        return inside
+
+    def crop(self, frame):
+        """(crop, (x0, y0)): the zone's rectangle with pixels outside the polygon greyed out"""
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self.bounds(width, height)
+        crop = frame[y0:y1, x0:x1].copy()
+        ys, xs = np.mgrid[y0:y1, x0:x1]
+        crop[~self.contains(xs + 0.5, ys + 0.5, width, height)] = MASK_VALUE
+        return crop, (x0, y0)
+
+
+def load_zones(path, camera="default"):
+    """Zones for `camera` from a JSON file; the whole frame as one zone if there is none"""
+    if not path or not os.path.exists(path):
+        return [Zone(WHOLE_FRAME, [(0, 0), (1, 0), (1, 1), (0, 1)])]
+    with open(path) as f:
+        config = json.load(f)
+    return [Zone(zone["name"], zone["points"], Tiling.from_config(zone.get("tile"))) for zone in config[camera]]
+
+
+def detect_in_zones(frame, zones, infer):
+    """
+    Run `infer` once on the batch of zone crops and the tiles of tiled zones.
+    infer(images) returns, per image, a list of (label, confidence, (x1, y1, x2, y2))
+    in image pixels. Returns {zone name: [(label, confidence, box in frame pixels)]},
+    keeping detections whose centre lies inside the zone polygon.
+    """
+    height, width = frame.shape[:2]
+    crops = [zone.crop(frame) for zone in zones]
+    tiles = [zone.tiling.tiles(crop) if zone.tiling else [] for zone, (crop, _) in zip(zones, crops)]
+    images = [crop for crop, _ in crops] + [tile for zone_tiles in tiles for _, tile in zone_tiles]
+    results = iter(infer(images))
+    batches = [next(results) for _ in crops]
+    found = {}
+    for zone, (_, (ox, oy)), detections, zone_tiles in zip(zones, crops, batches, tiles):
+        if zone_tiles:
+            per_tile = [next(results) for _ in zone_tiles]
+            detections = zone.tiling.merge(detections, per_tile, [origin for origin, _ in zone_tiles])
+        found[zone.name] = []
+        for label, confidence, (x1, y1, x2, y2) in detections:
+            box = (x1 + ox, y1 + oy, x2 + ox, y2 + oy)
+            if zone.contains((box[0] + box[2]) / 2, (box[1] + box[3]) / 2, width, height):
+                found[zone.name].append((label, confidence, box))
+    return found
+
+
+def count_by_zone(found):
+    """{zone: {label: count}} from detect_in_zones output"""
+    counts = {}
+    for zone, detections in found.items():
+        for label, _, _ in detections:
+            counts.setdefault(zone, {})
+            counts[zone][label] = counts[zone].get(label, 0) + 1
+    return counts
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tiled (Slicing-Aided) Inference
+Small objects such as eggs in a carton cover only a few pixels once a
+640x480 frame is scaled to the model input. Cutting an image into
+overlapping tiles and running the detector on each (in the same batch as
+the full image) gives them several times the pixels; the per-tile boxes are
+shifted back into image coordinates and merged with the full-image boxes
+by class-wise non-maximum suppression.
+
+Overlap makes sure an object cut by one tile edge is whole in a neighbour;
+the fragment left in the other tile is dropped because most of it lies
+inside the whole box (intersection over the smaller box).
+"""
+
+TILE_SIZE = 320        # pixels, square tiles
+TILE_OVERLAP = 0.25    # fraction of the tile shared with its neighbour
+IOU_THRESHOLD = 0.5
+CONTAINMENT_THRESHOLD = 0.8  # intersection over the smaller box that marks a fragment
+
+
+def tile_boxes(width, height, size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """(x0, y0, x1, y1) tiles of at most size x size covering the image with the given overlap"""
+    def starts(length):
+        if length <= size:
+            return [0]
+        step = max(1, int(size * (1 - overlap)))
+        positions = list(range(0, length - size, step))
+        return positions + [length - size]  # last tile flush with the edge
+    return [(x, y, min(width, x + size), min(height, y + size))
+            for y in starts(height) for x in starts(width)]
+
+
+def area(box):
+    return max(0.0, box[2] - box[0]) * max(0.0, box[3] - box[1])
+
+
+def overlap_ratios(a, b):
+    """(intersection over union, intersection over the smaller box)"""
+    inter = area((max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])))
+    if not inter:
+        return 0.0, 0.0
+    return inter / (area(a) + area(b) - inter), inter / min(area(a), area(b))
+
+
+def nms(detections, iou_threshold=IOU_THRESHOLD, containment_threshold=CONTAINMENT_THRESHOLD):
+    """Class-wise greedy NMS over (label, confidence, box) tuples, highest confidence first"""
+    kept = []
+    for detection in sorted(detections, key=lambda d: -d[1]):
+        label, _, box = detection
+        duplicate = False
+        for other_label, _, other_box in kept:
+            if other_label != label:
+                continue
+            iou, containment = overlap_ratios(box, other_box)
+            if iou >= iou_threshold or containment >= containment_threshold:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(detection)
+    return kept
+
+
+class Tiling:
+    """Tiling settings for one zone: tile size, overlap and the classes tiles may add"""
+
+    def __init__(self, size=TILE_SIZE, overlap=TILE_OVERLAP, classes=None):
+        self.size = size
+        self.overlap = overlap
+        self.classes = set(classes) if classes else None  # None: every class
+
+    @classmethod
+    def from_config(cls, config):
+        if not config:
+            return None
+        if config is True:
+            return cls()
+        return cls(config.get("size", TILE_SIZE), config.get("overlap", TILE_OVERLAP), config.get("classes"))
+
+    def tiles(self, image):
+        """[((x0, y0), tile view)]; empty when one tile would be the whole image"""
+        height, width = image.shape[:2]
+        boxes = tile_boxes(width, height, self.size, self.overlap)
+        if boxes == [(0, 0, width, height)]:
+            return []
+        return [((x0, y0), image[y0:y1, x0:x1]) for x0, y0, x1, y1 in boxes]
+
+    def merge(self, full, per_tile, origins):
+        """Full-image detections plus tile detections (shifted by their origins), deduplicated"""
+        detections = list(full)
+        for (ox, oy), tile_detections in zip(origins, per_tile):
+            for label, confidence, (x1, y1, x2, y2) in tile_detections:
+                if self.classes is None or label in self.classes:
+                    detections.append((label, confidence, (x1 + ox, y1 + oy, x2 + ox, y2 + oy)))
+        return nms(detections)
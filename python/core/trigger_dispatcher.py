@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Trigger Dispatcher
+Runs camera captures and recognition jobs on a worker pool so that MQTT
+callbacks only parse and enqueue, and never block the paho network loop
+"""
+
+import queue
+import threading
+import time
+
+
+class TriggerDispatcher:
+    def __init__(self, workers=1, name="dispatcher"):
+        self.workers = workers
+        self.name = name
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = {}  # key -> job that is queued or running
+        self.threads = []
+        self.submitted = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.last_wait = 0.0
+
+    def start(self):
+        """Start the worker threads"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        print(f"🧵 {self.name}: started {self.workers} worker(s)")
+
+    def stop(self, timeout=None):
+        """Stop the workers after the queued jobs have drained"""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def submit(self, key, func, *args, **kwargs):
+        """
+        Enqueue func(*args, **kwargs) under key.
+        Returns False when a job with the same key is already queued or in
+        flight; the trigger is then coalesced into that job and recorded so
+        the running job can answer it with pop_merged().
+        """
+        with self.lock:
+            job = self.pending.get(key)
+            if job is not None and not job['closed']:
+                job['merged'].append({'func': func, 'args': args, 'kwargs': kwargs})
+                self.coalesced += 1
+                return False
+
+            job = {
+                'key': key,
+                'func': func,
+                'args': args,
+                'kwargs': kwargs,
+                'enqueued_at': time.monotonic(),
+                'merged': [],
+                'closed': False
+            }
+            self.pending[key] = job
+            self.submitted += 1
+
+        self.queue.put(job)
+        return True
+
+    def pop_merged(self, key):
+        """
+        Called by a running job when its result is ready. Returns the
+        triggers coalesced into it as dicts with func/args/kwargs; triggers
+        submitted after this call start a new job instead of merging.
+        """
+        with self.lock:
+            job = self.pending.get(key)
+            if job is None:
+                return []
+            job['closed'] = True
+            merged = job['merged']
+            job['merged'] = []
+            return merged
+
+    def is_busy(self, key):
+        """Check whether a job for key is queued or running"""
+        with self.lock:
+            return key in self.pending
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                self.queue.task_done()
+                break
+
+            wait = time.monotonic() - job['enqueued_at']
+            with self.lock:
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+                self.last_wait = wait
+
+            try:
+                job['func'](*job['args'], **job['kwargs'])
+                with self.lock:
+                    self.executed += 1
+            except Exception as e:
+                with self.lock:
+                    self.failed += 1
+                print(f"❌ {self.name}: job '{job['key']}' failed: {e}")
+            finally:
+                with self.lock:
+                    if self.pending.get(job['key']) is job:
+                        del self.pending[job['key']]
+                self.queue.task_done()
+
+    def get_metrics(self):
+        """Queue depth, coalescing and wait-time metrics"""
+        with self.lock:
+            started = self.executed + self.failed
+            return {
+                "queue_depth": self.queue.qsize(),
+                "pending": len(self.pending),
+                "submitted": self.submitted,
+                "executed": self.executed,
+                "failed": self.failed,
+                "coalesced": self.coalesced,
+                "wait_avg_ms": round(self.wait_total / started * 1000, 1) if started else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 1),
+                "wait_last_ms": round(self.last_wait * 1000, 1)
+            }
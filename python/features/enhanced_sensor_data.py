@@ -5,13 +5,20 @@ Uses real ESP32 sensor data from database with historical patterns
 For dashboard-only setup with hardware on separate machine
 """
 
+import argparse
 import json
 import time
-import paho.mqtt.publish as publish
 import mysql.connector
 import random
+import sys
+import os
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+import mqtt_publisher
+import sensor_aggregates
+from report_by_exception import ExceptionReporter
+
 # Database configuration - Update these values to match your MySQL setup
 DB_CONFIG = {
     'host': 'localhost',
@@ -24,10 +31,38 @@ DB_CONFIG = {
 BROKER = "broker-cn.emqx.io"
 TOPIC = "esp/sensors"
 
+# Historical pattern windows
+PATTERN_HOURS = 24          # overall averages and ranges
+DIURNAL_PATTERNS = True     # follow per-hour-of-day averages when available
+DIURNAL_DAYS = 7            # history used for the hour-of-day buckets
+
+STATS_EVERY = 30  # samples between report-by-exception summaries (1 minute)
+
+# Defaults when the history has no value for a field: (avg, min, max)
+PATTERN_DEFAULTS = {
+    'temp': (25, 20, 30),
+    'hum': (60, 40, 80),
+    'ldr': (300, 200, 400)
+}
+
+def patterns_from_stats(stats):
+    """Flatten aggregate stats into the historical_patterns layout"""
+    patterns = {}
+    for field, (avg, low, high) in PATTERN_DEFAULTS.items():
+        field_stats = stats.get(field)
+        patterns[f'{field}_avg'] = field_stats['mean'] if field_stats else avg
+        patterns[f'{field}_min'] = field_stats['min'] if field_stats else low
+        patterns[f'{field}_max'] = field_stats['max'] if field_stats else high
+        patterns[f'{field}_std'] = field_stats['stddev'] if field_stats else 0
+    return patterns
+
 class EnhancedSensorData:
-    def __init__(self):
+    def __init__(self, report_by_exception=False):
         self.db_connection = None
         self.historical_patterns = {}
+        self.hourly_patterns = {}  # hour of day -> historical_patterns layout
+        # Deadband/edge/heartbeat filter in front of the publish, when enabled
+        self.reporter = ExceptionReporter() if report_by_exception else None
         self.connect_database()
     
     def connect_database(self):
@@ -49,50 +84,26 @@ class EnhancedSensorData:
         try:
             cursor = self.db_connection.cursor()
             
-            # Get last 24 hours of data
-            query = """
-            SELECT value_json, recorded_at 
-            FROM sensors 
-            WHERE topic = 'esp/sensors' 
-            AND recorded_at >= NOW() - INTERVAL 24 HOUR
-            ORDER BY recorded_at ASC
-            """
-            cursor.execute(query)
-            results = cursor.fetchall()
+            # Averages, ranges and spread of the last 24 hours, computed by MySQL
+            # from the hourly rollup (or the raw rows before the rollup is filled)
+            stats = sensor_aggregates.fetch_window_stats(cursor, PATTERN_HOURS)
             
-            if results:
-                # Analyze temperature patterns
-                temps = []
-                hums = []
-                ldr_values = []
-                
-                for row in results:
-                    data = json.loads(row[0])
-                    if 'temp' in data:
-                        temps.append(data['temp'])
-                    if 'hum' in data:
-                        hums.append(data['hum'])
-                    if 'ldr' in data:
-                        ldr_values.append(data['ldr'])
-                
-                # Calculate patterns
-                self.historical_patterns = {
-                    'temp_avg': sum(temps) / len(temps) if temps else 25,
-                    'temp_min': min(temps) if temps else 20,
-                    'temp_max': max(temps) if temps else 30,
-                    'hum_avg': sum(hums) / len(hums) if hums else 60,
-                    'hum_min': min(hums) if hums else 40,
-                    'hum_max': max(hums) if hums else 80,
-                    'ldr_avg': sum(ldr_values) / len(ldr_values) if ldr_values else 300,
-                    'ldr_min': min(ldr_values) if ldr_values else 200,
-                    'ldr_max': max(ldr_values) if ldr_values else 400
-                }
+            if stats:
+                self.historical_patterns = patterns_from_stats(stats)
                 
                 print("📊 Historical patterns analyzed:")
                 print(f"   Temperature: {self.historical_patterns['temp_avg']:.1f}°C (range: {self.historical_patterns['temp_min']:.1f}-{self.historical_patterns['temp_max']:.1f})")
                 print(f"   Humidity: {self.historical_patterns['hum_avg']:.1f}% (range: {self.historical_patterns['hum_min']:.1f}-{self.historical_patterns['hum_max']:.1f})")
                 print(f"   Light: {self.historical_patterns['ldr_avg']:.0f} (range: {self.historical_patterns['ldr_min']:.0f}-{self.historical_patterns['ldr_max']:.0f})")
             
+            if stats and DIURNAL_PATTERNS:
+                # One row per hour of day so generated data follows the daily cycle
+                hourly_stats = sensor_aggregates.fetch_hour_of_day_stats(cursor, DIURNAL_DAYS)
+                self.hourly_patterns = {
+                    hour: patterns_from_stats(hour_stats) for hour, hour_stats in hourly_stats.items()
+                }
+                print(f"   Hour-of-day patterns: {len(self.hourly_patterns)}/24 hours from the last {DIURNAL_DAYS} days")
+            
             cursor.close()
             
         except Exception as e:
@@ -104,18 +115,20 @@ class EnhancedSensorData:
             # Fallback to basic simulation
             return self.generate_basic_sensor_data()
         
-        # Generate data based on historical patterns
-        temp_avg = self.historical_patterns['temp_avg']
-        temp_min = self.historical_patterns['temp_min']
-        temp_max = self.historical_patterns['temp_max']
+        # Generate data based on historical patterns, for this hour of day when known
+        patterns = self.hourly_patterns.get(datetime.now().hour, self.historical_patterns)
+        
+        temp_avg = patterns['temp_avg']
+        temp_min = patterns['temp_min']
+        temp_max = patterns['temp_max']
         
-        hum_avg = self.historical_patterns['hum_avg']
-        hum_min = self.historical_patterns['hum_min']
-        hum_max = self.historical_patterns['hum_max']
+        hum_avg = patterns['hum_avg']
+        hum_min = patterns['hum_min']
+        hum_max = patterns['hum_max']
         
-        ldr_avg = self.historical_patterns['ldr_avg']
-        ldr_min = self.historical_patterns['ldr_min']
-        ldr_max = self.historical_patterns['ldr_max']
+        ldr_avg = patterns['ldr_avg']
+        ldr_min = patterns['ldr_min']
+        ldr_max = patterns['ldr_max']
         
         # Generate realistic values within historical ranges
         temp = temp_avg + random.uniform(-1, 1)
@@ -162,11 +175,15 @@ class EnhancedSensorData:
         }
     
     def send_enhanced_sensor_data(self):
-        """Send enhanced sensor data based on database patterns"""
+        """Send enhanced sensor data based on database patterns; returns whether it was published"""
         sensor_data = self.generate_enhanced_sensor_data()
+        if self.reporter:
+            publish, reason = self.reporter.should_publish(sensor_data)
+            if not publish:
+                return False
         
         try:
-            publish.single(TOPIC, json.dumps(sensor_data), hostname=BROKER)
+            mqtt_publisher.single(TOPIC, json.dumps(sensor_data), hostname=BROKER)
             source = sensor_data['source']
             pattern_based = sensor_data.get('pattern_based', False)
             
@@ -175,6 +192,10 @@ class EnhancedSensorData:
             
         except Exception as e:
             print(f"❌ Error sending data: {e}")
+            return False
+        if self.reporter:
+            self.reporter.published(sensor_data, reason)
+        return True
     
     def start(self):
         """Start the enhanced sensor data system"""
@@ -192,15 +213,23 @@ class EnhancedSensorData:
         try:
             while True:
                 self.send_enhanced_sensor_data()
+                if self.reporter and self.reporter.stats["samples"] % STATS_EVERY == 0:
+                    print(f"📊 Report by exception: {self.reporter.summary()}")
                 time.sleep(2)  # Send data every 2 seconds
         except KeyboardInterrupt:
             print("\n🛑 Stopping enhanced sensor data system...")
         except Exception as e:
             print(f"❌ Error: {e}")
         finally:
+            if self.reporter:
+                print(f"📊 Report by exception: {self.reporter.summary()}")
             if self.db_connection:
                 self.db_connection.close()
 
 if __name__ == "__main__":
-    system = EnhancedSensorData()
+    parser = argparse.ArgumentParser(description="Enhanced sensor data from historical patterns")
+    parser.add_argument("--report-by-exception", action="store_true",
+                        help="publish only on deadband changes, PIR/IR edges and heartbeats")
+    args = parser.parse_args()
+    system = EnhancedSensorData(report_by_exception=args.report_by_exception)
     system.start()
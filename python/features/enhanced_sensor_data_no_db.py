@@ -7,8 +7,12 @@ For dashboard-only setup with hardware on separate machine
 
 import json
 import time
-import paho.mqtt.publish as publish
 import random
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+import mqtt_publisher
 
 # MQTT Configuration
 BROKER = "broker-cn.emqx.io"
@@ -87,7 +91,7 @@ class EnhancedSensorDataNoDB:
         sensor_data = self.generate_realistic_sensor_data()
         
         try:
-            publish.single(TOPIC, json.dumps(sensor_data), hostname=BROKER)
+            mqtt_publisher.single(TOPIC, json.dumps(sensor_data), hostname=BROKER)
             
             print(f"📡 Enhanced Sensor Data: Temp={sensor_data['temp']}°C, Hum={sensor_data['hum']}%, LDR={sensor_data['ldr']}, PIR={sensor_data['pir']}, IR={sensor_data['ir']}")
             print(f"🔧 Source: {sensor_data['source']}, Pattern-based: {sensor_data['pattern_based']}, Hour: {sensor_data['hour']}")
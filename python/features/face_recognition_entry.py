@@ -1,30 +1,48 @@
-import cv2
-import face_recognition
 import pickle
 import time
 import os
+import sys
 import json
 import paho.mqtt.client as mqtt
 
-# === Load Face Encodings ===
-print("[INFO] Loading face encodings...")
-data = pickle.load(open(r"E:\face_encodings.pkl", "rb"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from trigger_dispatcher import TriggerDispatcher
+from motion_trigger import MotionTrigger
 
 # === MQTT Config ===
 BROKER = "broker-cn.emqx.io"
 PORT = 1883
 TOPIC_SENSORS = "esp/sensors"   # ESP publishes PIR, IR, etc.
 TOPIC_RESULT = "esp/cam"        # Python publishes recognition result
+TOPIC_TRIGGER_STATS = "face-recognition/trigger-stats"  # Python publishes trigger counters
+
+# Debounce, cooldown and repeat-result windows in seconds
+DEBOUNCE = 4
+COOLDOWN = 15
+RECOGNIZED_WINDOW = 60
+STATS_INTERVAL = 10  # seconds between trigger counter publishes
 
 SAVE_FOLDER = r"E:\\"
-if not os.path.exists(SAVE_FOLDER):
-    os.makedirs(SAVE_FOLDER)
+ENCODINGS_FILE = r"E:\face_encodings.pkl"
+
+# Recognition runs on a single camera worker; the MQTT callback only enqueues
+CAMERA_JOB = "camera"
+dispatcher = TriggerDispatcher(workers=1, name="face-recognition")
+motion_trigger = MotionTrigger(DEBOUNCE, COOLDOWN, RECOGNIZED_WINDOW)
+last_stats_publish = 0
+
+# Loaded in main(); importing this module loads no models and opens no connections
+data = None
 
 
 # === Face Recognition Function ===
 def open_camera_and_recognize():
+    import cv2
+    import face_recognition
+    from frame_bus import open_camera
+
     print("[INFO] Opening camera for recognition...")
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+    cap = open_camera(0, cv2.CAP_DSHOW)
     start_time = time.time()
     recognized_name = "Unknown"
 
@@ -93,23 +111,76 @@ def on_message(client, userdata, msg):
 
         # === Trigger camera when PIR or IR == 1 ===
         if pir == 1 or ir == 1:
-            print("[TRIGGER] PIR/IR detected → Starting recognition")
-            result = open_camera_and_recognize()
-            feedback = f"RESULT:{result}"
-            client.publish(TOPIC_RESULT, feedback)
-            print(f"[INFO] Published result -> {feedback}")
+            fire, reason = motion_trigger.on_motion()
+            if not fire:
+                print(f"[TRIGGER] PIR/IR detected → Suppressed ({reason})")
+            elif dispatcher.submit(CAMERA_JOB, run_recognition, client):
+                print("[TRIGGER] PIR/IR detected → Recognition queued")
+            else:
+                motion_trigger.on_cancel()
+                print("[TRIGGER] PIR/IR detected → Recognition already in progress, trigger coalesced")
+            publish_trigger_stats(client)
 
     except Exception as e:
         print("⚠ Error parsing message:", e)
 
 
-# === Setup MQTT ===
-mqtt_client = mqtt.Client()
-mqtt_client.on_connect = on_connect
-mqtt_client.on_message = on_message
+def run_recognition(client):
+    """Worker job: recognize and publish the result of a PIR/IR trigger"""
+    result = "Unknown"
+    is_new_result = True
+    try:
+        result = open_camera_and_recognize()
+    finally:
+        is_new_result = motion_trigger.on_result(result)
+    if is_new_result:
+        feedback = f"RESULT:{result}"
+        client.publish(TOPIC_RESULT, feedback)
+        print(f"[INFO] Published result -> {feedback}")
+    else:
+        print(f"[INFO] {result} was recognized in the last {RECOGNIZED_WINDOW}s, result not republished")
+    print(f"[INFO] Dispatcher: {dispatcher.get_metrics()}")
+    publish_trigger_stats(client, force=True)
+
+
+def publish_trigger_stats(client, force=False):
+    """Publish trigger counters, at most once per STATS_INTERVAL unless forced"""
+    global last_stats_publish
+    now = time.monotonic()
+    if not force and now - last_stats_publish < STATS_INTERVAL:
+        return
+    last_stats_publish = now
+
+    stats = motion_trigger.get_stats()
+    stats.update({
+        "timestamp": time.time(),
+        "system": "face_recognition"
+    })
+    client.publish(TOPIC_TRIGGER_STATS, json.dumps(stats))
+    print(f"[STATS] Triggers: received={stats['received']}, executed={stats['executed']}, suppressed={stats['suppressed']}")
+
+
+def main():
+    global data
+    # === Load Face Encodings ===
+    print("[INFO] Loading face encodings...")
+    with open(ENCODINGS_FILE, "rb") as f:
+        data = pickle.load(f)
+    os.makedirs(SAVE_FOLDER, exist_ok=True)
+
+    # === Setup MQTT ===
+    mqtt_client = mqtt.Client()
+    mqtt_client.on_connect = on_connect
+    mqtt_client.on_message = on_message
+
+    dispatcher.start()
+
+    print("🔗 Connecting to broker...")
+    mqtt_client.connect(BROKER, PORT, 60)
+
+    # Loop forever
+    mqtt_client.loop_forever()
 
-print("🔗 Connecting to broker...")
-mqtt_client.connect(BROKER, PORT, 60)
 
-# Loop forever
-mqtt_client.loop_forever()
+if __name__ == "__main__":
+    main()
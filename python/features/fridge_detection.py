@@ -1,19 +1,26 @@
-import cv2
-from ultralytics import YOLO
 from collections import defaultdict
-import mysql.connector
 from datetime import datetime
 import paho.mqtt.client as mqtt
 import json
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from frame_skip import AdaptiveFrameSkip
+
 # ---------------- MQTT Configuration ----------------
 MQTT_BROKER = "broker-cn.emqx.io"
 MQTT_PORT = 1883
 MQTT_TOPIC = "fridge/inventory"
+MQTT_STATS_TOPIC = "fridge/detection-stats"
+DETECTION_RATE = 3.0  # target detections per second (10th frame of a 30 fps camera)
+STATS_INTERVAL = 10  # seconds between frame-skip metrics
 
 # ---------------- Database Connection ----------------
 def connect_to_database():
+    import mysql.connector
+
     try:
         db = mysql.connector.connect(
             host="localhost",
@@ -36,20 +43,43 @@ def on_connect(client, userdata, flags, rc):
 def on_disconnect(client, userdata, rc):
     print("🔌 Disconnected from MQTT Broker")
 
-# Initialize MQTT client
-mqtt_client = mqtt.Client()
-mqtt_client.on_connect = on_connect
-mqtt_client.on_disconnect = on_disconnect
+# MQTT client and YOLO model are created in main(), so importing this module
+# stays cheap: no cv2/torch import and no network connection
+mqtt_client = None
+
+def connect_mqtt():
+    client = mqtt.Client()
+    client.on_connect = on_connect
+    client.on_disconnect = on_disconnect
 
-try:
-    mqtt_client.connect(MQTT_BROKER, MQTT_PORT, 60)
-    mqtt_client.loop_start()
-except Exception as e:
-    print(f"❌ MQTT connection failed: {e}")
+    try:
+        client.connect(MQTT_BROKER, MQTT_PORT, 60)
+        client.loop_start()
+    except Exception as e:
+        print(f"❌ MQTT connection failed: {e}")
+    return client
 
 # ---------------- Load YOLO Model ----------------
-print("🤖 Loading YOLO model...")
-model = YOLO("yolov9c.pt")
+MODEL_PATH = "yolov9c.pt"
+model = None
+
+def load_model(path=MODEL_PATH):
+    from ultralytics import YOLO
+
+    print("🤖 Loading YOLO model...")
+    yolo = YOLO(path)
+    warm_up_model(yolo)
+    return yolo
+
+def warm_up_model(yolo, width=640, height=480):
+    """Pay the slow first inference on synthetic frames before the detection loop"""
+    from model_warmup import warm_up, describe
+
+    print("🔥 Warming up YOLO model...")
+    result = warm_up(lambda frame: yolo(frame, verbose=False), width, height)
+    print(f"⏱️ YOLO latency: {describe(result)}")
+    return result
+
 grocery_list = ["egg", "eggs", "apple", "banana", "orange", "bread", "bottle", "wine glass", "cup", "bowl"]
 
 # ---------------- Inventory Counts ----------------
@@ -57,9 +87,19 @@ grocery_counts = defaultdict(int)
 last_update_time = time.time()
 update_interval = 5  # Update every 5 seconds
 
+# ---------------- Frame-Skip Metrics ----------------
+def publish_detection_stats(frame_skip):
+    """Publish the adaptive frame-skip stride and achieved detection rate"""
+    stats = dict(frame_skip.metrics(), timestamp=datetime.now().isoformat())
+    mqtt_client.publish(MQTT_STATS_TOPIC, json.dumps(stats))
+    print(f"📈 Detection cadence: {frame_skip.summary()}")
+    return stats
+
 # ---------------- Database Functions ----------------
 def update_inventory(item_name, quantity_change):
     """Update inventory in database and send MQTT message"""
+    import mysql.connector
+
     db = connect_to_database()
     if not db:
         return
@@ -106,6 +146,8 @@ def update_inventory(item_name, quantity_change):
 
 def get_current_inventory():
     """Get current inventory from database"""
+    import mysql.connector
+
     db = connect_to_database()
     if not db:
         return {}
@@ -124,7 +166,20 @@ def get_current_inventory():
 
 # ---------------- Main Detection Loop ----------------
 def main():
+    global mqtt_client, model
+    import argparse
+    import cv2
+    import mysql.connector
+    from frame_bus import open_camera
+
+    parser = argparse.ArgumentParser(description="Smart fridge grocery detection")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window or keyboard; stop with Ctrl+C")
+    args = parser.parse_args()
+
     print("🚀 Starting Smart Fridge Object Detection...")
+    mqtt_client = connect_mqtt()
+    model = load_model()
     
     # Initialize database table if it doesn't exist
     db = connect_to_database()
@@ -149,84 +204,98 @@ def main():
             db.close()
     
     # Open webcam
-    cap = cv2.VideoCapture(0)
+    cap = open_camera(0)
     if not cap.isOpened():
         print("❌ Error: Could not open webcam")
         return
     
     print("📹 Webcam opened successfully")
     print("🎯 Detecting groceries: " + ", ".join(grocery_list))
-    print("💡 Press 'q' to quit, 'r' to reset counts, 's' to save current state")
+    if args.headless:
+        print("💡 Headless mode: no window, press Ctrl+C to quit")
+    else:
+        print("💡 Press 'q' to quit, 'r' to reset counts, 's' to save current state")
     
-    frame_count = 0
-    detection_threshold = 10  # Process every 10th frame for performance
+    frame_skip = AdaptiveFrameSkip(target_rate=DETECTION_RATE)
+    last_stats_time = time.time()
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("❌ Error: Could not read from webcam")
-            break
-        
-        frame_count += 1
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                print("❌ Error: Could not read from webcam")
+                break
         
-        # Process every nth frame for better performance
-        if frame_count % detection_threshold == 0:
-            results = model(frame, verbose=False)
+            # Detect on every stride-th frame; the stride follows inference time and load
+            if frame_skip.tick():
+                started = time.perf_counter()
+                results = model(frame, verbose=False)
+                frame_skip.record(time.perf_counter() - started)
             
-            # Reset counts for this frame
-            current_frame_detections = defaultdict(int)
+                # Reset counts for this frame
+                current_frame_detections = defaultdict(int)
             
-            for r in results:
-                for box in r.boxes:
-                    confidence = float(box.conf[0])
-                    if confidence > 0.5:  # Only process high-confidence detections
-                        class_id = int(box.cls[0])
-                        class_name = model.names[class_id]
+                for r in results:
+                    for box in r.boxes:
+                        confidence = float(box.conf[0])
+                        if confidence > 0.5:  # Only process high-confidence detections
+                            class_id = int(box.cls[0])
+                            class_name = model.names[class_id]
                         
-                        if class_name in grocery_list:
-                            current_frame_detections[class_name] += 1
+                            if class_name in grocery_list:
+                                current_frame_detections[class_name] += 1
             
-            # Update inventory for detected items
-            for item, count in current_frame_detections.items():
-                if count > 0:
-                    update_inventory(item, count)
-                    grocery_counts[item] += count
-        
-        # Display current counts on frame
-        y_offset = 30
-        cv2.putText(frame, "Smart Fridge Detection", (10, y_offset), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                # Update inventory for detected items
+                for item, count in current_frame_detections.items():
+                    if count > 0:
+                        update_inventory(item, count)
+                        grocery_counts[item] += count
         
-        for item, count in grocery_counts.items():
-            y_offset += 25
-            cv2.putText(frame, f"{item}: {count}", (10, y_offset), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            if time.time() - last_stats_time >= STATS_INTERVAL:
+                publish_detection_stats(frame_skip)
+                last_stats_time = time.time()
         
-        # Show instructions
-        cv2.putText(frame, "Press 'q' to quit, 'r' to reset, 's' to save", (10, frame.shape[0] - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+            if args.headless:
+                continue  # nothing to draw or poll
         
-        # Display frame
-        cv2.imshow("Smart Fridge Grocery Detection", frame)
+            # Display current counts on frame
+            y_offset = 30
+            cv2.putText(frame, "Smart Fridge Detection", (10, y_offset), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         
-        # Handle key presses
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('r'):
-            # Reset counts
-            grocery_counts.clear()
-            print("🔄 Counts reset")
-        elif key == ord('s'):
-            # Save current state to database
-            print("💾 Saving current state...")
             for item, count in grocery_counts.items():
-                update_inventory(item, 0)  # Update with current count
-            print("✅ State saved")
+                y_offset += 25
+                cv2.putText(frame, f"{item}: {count}", (10, y_offset), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        
+            # Show instructions
+            cv2.putText(frame, "Press 'q' to quit, 'r' to reset, 's' to save", (10, frame.shape[0] - 20), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        
+            # Display frame
+            cv2.imshow("Smart Fridge Grocery Detection", frame)
+        
+            # Handle key presses
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('r'):
+                # Reset counts
+                grocery_counts.clear()
+                print("🔄 Counts reset")
+            elif key == ord('s'):
+                # Save current state to database
+                print("💾 Saving current state...")
+                for item, count in grocery_counts.items():
+                    update_inventory(item, 0)  # Update with current count
+                print("✅ State saved")
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted by user")
     
     # Cleanup
     cap.release()
-    cv2.destroyAllWindows()
+    if not args.headless:
+        cv2.destroyAllWindows()
     mqtt_client.loop_stop()
     mqtt_client.disconnect()
     print("👋 Fridge detection stopped")
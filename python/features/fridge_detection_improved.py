@@ -1,27 +1,39 @@
-import cv2
-from ultralytics import YOLO
 from collections import defaultdict
-import mysql.connector
 from datetime import datetime
 import paho.mqtt.client as mqtt
 import json
 import time
 import os
+import sys
 import base64
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from frame_skip import AdaptiveFrameSkip
+from count_smoother import CountSmoother
+from fridge_scanner import DoorScanner, TOPIC_DOOR
+from shelf_zones import load_zones, detect_in_zones, count_by_zone
+
 # ============= CONFIGURATION =============
 MQTT_BROKER = "broker-cn.emqx.io"
 MQTT_PORT = 1883
 MQTT_TOPIC = "fridge/inventory"
+MQTT_STATS_TOPIC = "fridge/detection-stats"
+DETECTION_RATE = 6.0  # target detections per second (5th frame of a 30 fps camera)
+STATS_INTERVAL = 10  # seconds between frame-skip metrics
+
+# Shelf zones: inference runs on these crops only, counts are kept per zone
+ZONES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fridge_zones.json')
+CAMERA_NAME = os.environ.get("FRIDGE_CAMERA", "default")
 
 # Create images directory for detected items
+# (created in main(), so importing this module has no side effects)
 IMAGES_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'uploads', 'fridge')
-os.makedirs(IMAGES_DIR, exist_ok=True)
-print(f"📁 Images will be saved to: {IMAGES_DIR}")
 
 # ============= DATABASE CONNECTION =============
 def connect_to_database():
+    import mysql.connector
+
     try:
         db = mysql.connector.connect(
             host="localhost",
@@ -38,25 +50,56 @@ def connect_to_database():
 def on_connect(client, userdata, flags, rc):
     if rc == 0:
         print("✅ Connected to MQTT Broker for Fridge Detection")
+        for topic in userdata["topics"]:
+            client.subscribe(topic, 1)
+            print(f"📡 Subscribed to {topic}")
     else:
         print(f"❌ Failed to connect to MQTT, return code: {rc}")
 
 def on_disconnect(client, userdata, rc):
     print("🔌 Disconnected from MQTT Broker")
 
-mqtt_client = mqtt.Client()
-mqtt_client.on_connect = on_connect
-mqtt_client.on_disconnect = on_disconnect
+# Created in main(): no broker connection at import time
+mqtt_client = None
 
-try:
-    mqtt_client.connect(MQTT_BROKER, MQTT_PORT, 60)
-    mqtt_client.loop_start()
-except Exception as e:
-    print(f"❌ MQTT connection failed: {e}")
+def connect_mqtt(on_message=None, topics=()):
+    client = mqtt.Client(userdata={"topics": list(topics)})
+    client.on_connect = on_connect
+    client.on_disconnect = on_disconnect
+    if on_message:
+        client.on_message = on_message
+
+    try:
+        client.connect(MQTT_BROKER, MQTT_PORT, 60)
+        client.loop_start()
+    except Exception as e:
+        print(f"❌ MQTT connection failed: {e}")
+    return client
 
 # ============= LOAD YOLO MODEL =============
-print("🤖 Loading YOLO model...")
-model = YOLO("yolov9c.pt")
+MODEL_PATH = "yolov9c.pt"
+model = None  # loaded in main(); ultralytics pulls in torch
+
+def load_model(path=MODEL_PATH):
+    from ultralytics import YOLO
+
+    print("🤖 Loading YOLO model...")
+    yolo = YOLO(path)
+    # Print available YOLO classes for debugging
+    print(f"🎯 YOLO Model Classes: {len(yolo.names)} total")
+    print(f"📋 Monitoring for: {', '.join(grocery_list)}")
+    warm_up_model(yolo)
+    return yolo
+
+def warm_up_model(yolo, width=640, height=480):
+    """Pay the slow first inference on synthetic frames before the detection loop"""
+    from model_warmup import warm_up, describe
+
+    print("🔥 Warming up YOLO model...")
+    result = warm_up(lambda frame: yolo(frame, verbose=False), width, height)
+    print(f"⏱️ YOLO latency: {describe(result)}")
+    return result
+
 # YOLO COCO dataset class names - actual detectable items
 # Using exact YOLO class names for reliable detection
 grocery_list = [
@@ -70,10 +113,6 @@ grocery_list = [
     "bread", "cheese", "bottle", "cup", "bowl"
 ]
 
-# Print available YOLO classes for debugging
-print(f"🎯 YOLO Model Classes: {len(model.names)} total")
-print(f"📋 Monitoring for: {', '.join(grocery_list)}")
-
 # ============= INVENTORY TRACKING =============
 grocery_counts = defaultdict(int)
 detected_items = {}  # Track detected items with their images
@@ -86,9 +125,11 @@ def save_detected_image(frame, item_name, box, confidence):
     Extract and save the detected item image from the frame
     Returns the filename if successful
     """
+    import cv2
+
     try:
-        # Get bounding box coordinates
-        x1, y1, x2, y2 = map(int, box.xyxy[0])
+        # Get bounding box coordinates (frame pixels)
+        x1, y1, x2, y2 = map(int, box)
         
         # Add padding to capture context
         padding = 10
@@ -117,9 +158,25 @@ def save_detected_image(frame, item_name, box, confidence):
         print(f"❌ Error saving image: {e}")
         return None
 
+# ============= FRAME-SKIP METRICS =============
+def publish_detection_stats(frame_skip, smoother):
+    """Publish the adaptive frame-skip stride, achieved detection rate and suppressed writes"""
+    stats = dict(frame_skip.metrics(), inventory_writes=smoother.stats["reported"],
+                 writes_suppressed=smoother.suppressed(), timestamp=datetime.now().isoformat())
+    mqtt_client.publish(MQTT_STATS_TOPIC, json.dumps(stats))
+    print(f"📈 Detection cadence: {frame_skip.summary()}")
+    print(f"🧮 Count smoothing: {smoother.summary()}")
+    return stats
+
+
 # ============= UPDATE INVENTORY WITH IMAGE =============
-def update_inventory(item_name, quantity_change, image_filename=None):
-    """Update inventory in database and send MQTT message with image"""
+def update_inventory(item_name, quantity_change, image_filename=None, zones=None):
+    """Update inventory in database and send MQTT message with image
+
+    zones: {zone name: count} for this item; the zones are stored as its location
+    """
+    import mysql.connector
+
     db = connect_to_database()
     if not db:
         return False
@@ -133,21 +190,24 @@ def update_inventory(item_name, quantity_change, image_filename=None):
         
         new_quantity = 0
         is_new_item = False
+        location = ",".join(sorted(zones, key=lambda z: -zones[z])) if zones else None
         
         if row:
-            # Update existing item
+            # Update existing item; keep the stored image and location when this update has none
+            # (e.g. a smoothed drop to 0 for an item that is no longer in the frame)
             new_quantity = max(0, row[0] + quantity_change)
             cursor.execute(
-                "UPDATE fridge_items SET quantity = %s, image_path = %s, updated_at = NOW() WHERE item = %s",
-                (new_quantity, image_filename, item_name)
+                "UPDATE fridge_items SET quantity = %s, image_path = COALESCE(%s, image_path), "
+                "location = COALESCE(%s, location), updated_at = NOW() WHERE item = %s",
+                (new_quantity, image_filename, location, item_name)
             )
         else:
             # Insert new item
             is_new_item = True
             new_quantity = max(0, quantity_change)
             cursor.execute(
-                "INSERT INTO fridge_items (item, quantity, status, image_path, updated_at) VALUES (%s, %s, %s, %s, NOW())",
-                (item_name, new_quantity, "detected", image_filename)
+                "INSERT INTO fridge_items (item, quantity, status, image_path, location, updated_at) VALUES (%s, %s, %s, %s, %s, NOW())",
+                (item_name, new_quantity, "detected", image_filename, location)
             )
         
         db.commit()
@@ -159,6 +219,8 @@ def update_inventory(item_name, quantity_change, image_filename=None):
             "quantity": new_quantity,
             "image_path": image_filename,
             "is_new": is_new_item,
+            "location": location,
+            "zones": zones or {},
             "timestamp": datetime.now().isoformat(),
             "action": "detected"
         }
@@ -181,6 +243,8 @@ def update_inventory(item_name, quantity_change, image_filename=None):
 # ============= GET CURRENT INVENTORY =============
 def get_current_inventory():
     """Get current inventory from database"""
+    import mysql.connector
+
     db = connect_to_database()
     if not db:
         return {}
@@ -200,6 +264,8 @@ def get_current_inventory():
 # ============= INITIALIZE DATABASE TABLE =============
 def initialize_database():
     """Initialize fridge_items table if it doesn't exist"""
+    import mysql.connector
+
     db = connect_to_database()
     if not db:
         return
@@ -214,10 +280,17 @@ def initialize_database():
                 status VARCHAR(50) NOT NULL DEFAULT 'ok',
                 image_path VARCHAR(255),
                 image_url VARCHAR(255),
+                location VARCHAR(100),
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 UNIQUE KEY unique_item (item)
             )
         """)
+        # Tables created before shelf zones have no location column
+        cursor.execute(
+            "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = 'fridge_items' AND COLUMN_NAME = 'location'"
+        )
+        if not cursor.fetchall():
+            cursor.execute("ALTER TABLE fridge_items ADD COLUMN location VARCHAR(100) AFTER image_url")
         db.commit()
         cursor.close()
         print("✅ Database table initialized")
@@ -226,114 +299,214 @@ def initialize_database():
     finally:
         db.close()
 
+# ============= ZONE INFERENCE =============
+def match_grocery(class_name):
+    """Grocery list entry for a YOLO class name (case-insensitive), or None"""
+    for grocery_item in grocery_list:
+        if class_name == grocery_item.lower() or grocery_item.lower() in class_name:
+            return grocery_item
+    return None
+
+def infer_crops(crops):
+    """One batched YOLO call over the zone crops; per crop [(item, confidence, box)]"""
+    batches = []
+    for r in model(crops, verbose=False):
+        detections = []
+        for box in r.boxes:
+            confidence = float(box.conf[0])
+            if confidence > 0.5:  # Only process high-confidence detections
+                class_name = model.names[int(box.cls[0])].lower()  # Convert to lowercase
+                matched_item = match_grocery(class_name)
+                if matched_item:
+                    detections.append((matched_item, confidence, tuple(map(float, box.xyxy[0]))))
+                    print(f"✅ Detected: {matched_item} (YOLO: {class_name}, conf: {confidence:.2f})")
+        batches.append(detections)
+    return batches
+
+# ============= DOOR-TRIGGERED SCANNING =============
+def run_door_scanner():
+    """Idle until the door closes, then scan a short burst of frames (see fridge_scanner.py)"""
+    global mqtt_client
+    from frame_bus import open_camera
+
+    zones = load_zones(ZONES_FILE, CAMERA_NAME)
+
+    def capture(count):
+        # The camera is only open for the burst
+        cap = open_camera(0)
+        if not cap.isOpened():
+            print("❌ Error: Could not open webcam")
+            return []
+        frames = []
+        for _ in range(count):
+            ret, frame = cap.read()
+            if ret:
+                frames.append(frame)
+        cap.release()
+        return frames
+
+    def detect(frame):
+        counts = defaultdict(int)
+        for detections in detect_in_zones(frame, zones, infer_crops).values():
+            for item, _, _ in detections:
+                counts[item] += 1
+        return counts
+
+    def on_change(item, count, delta):
+        update_inventory(item, delta)
+        grocery_counts[item] = count
+
+    scanner = DoorScanner(capture, detect, on_change)
+    scanner.start()
+    mqtt_client = connect_mqtt(scanner.on_message, [TOPIC_DOOR])
+    print(f"🚪 Waiting for the door to close ({TOPIC_DOOR})...")
+    try:
+        while True:
+            time.sleep(STATS_INTERVAL)
+            stats = dict(scanner.stats, dispatcher=scanner.dispatcher.get_metrics(),
+                         timestamp=datetime.now().isoformat())
+            mqtt_client.publish(MQTT_STATS_TOPIC, json.dumps(stats))
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping door-triggered scanning")
+    finally:
+        scanner.stop(timeout=5)
+        mqtt_client.loop_stop()
+        mqtt_client.disconnect()
+
 # ============= MAIN DETECTION LOOP =============
 def main():
     """Main fridge detection loop"""
+    global mqtt_client, model
+    import argparse
+    import cv2
+    from frame_bus import open_camera
+
+    parser = argparse.ArgumentParser(description="Smart fridge grocery detection")
+    parser.add_argument("--door", action="store_true",
+                        help=f"scan a burst when the door closes ({TOPIC_DOOR}) instead of continuously")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window or keyboard; stop with Ctrl+C")
+    args = parser.parse_args()
+
     print("🚀 Starting Smart Fridge Object Detection...")
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    print(f"📁 Images will be saved to: {IMAGES_DIR}")
+    model = load_model()
     
     # Initialize database
     initialize_database()
     
+    if args.door:
+        run_door_scanner()
+        return
+    
+    mqtt_client = connect_mqtt()
+    
     # Open webcam
-    cap = cv2.VideoCapture(0)
+    cap = open_camera(0)
     if not cap.isOpened():
         print("❌ Error: Could not open webcam")
         return
     
     print("📹 Webcam opened successfully")
     print("🎯 Detecting groceries: " + ", ".join(grocery_list))
-    print("💡 Press 'q' to quit, 'r' to reset counts, 's' to save current state")
+    if args.headless:
+        print("💡 Headless mode: no window, press Ctrl+C to quit")
+    else:
+        print("💡 Press 'q' to quit, 'r' to reset counts, 's' to save current state")
     
-    frame_count = 0
-    detection_threshold = 5  # Process every 5th frame for performance
+    zones = load_zones(ZONES_FILE, CAMERA_NAME)
+    print(f"🗺️ Zones: {', '.join(zone.name for zone in zones)}")
+    frame_skip = AdaptiveFrameSkip(target_rate=DETECTION_RATE)
+    smoother = CountSmoother()
+    last_stats_time = time.time()
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("❌ Error: Could not read from webcam")
-            break
-        
-        frame_count += 1
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                print("❌ Error: Could not read from webcam")
+                break
         
-        # Process every nth frame for better performance
-        if frame_count % detection_threshold == 0:
-            results = model(frame, verbose=False)
+            # Detect on every stride-th frame; the stride follows inference time and load
+            if frame_skip.tick():
+                started = time.perf_counter()
+                found = detect_in_zones(frame, zones, infer_crops)
+                frame_skip.record(time.perf_counter() - started)
             
-            # Reset counts for this frame
-            current_frame_detections = defaultdict(list)
+                # Group this frame's detections by item, keeping per-zone counts
+                current_frame_detections = defaultdict(list)
+                for detections in found.values():
+                    for item, confidence, box in detections:
+                        current_frame_detections[item].append({'box': box, 'confidence': confidence})
+                zone_counts = count_by_zone(found)
             
-            for r in results:
-                for box in r.boxes:
-                    confidence = float(box.conf[0])
-                    if confidence > 0.5:  # Only process high-confidence detections
-                        class_id = int(box.cls[0])
-                        class_name = model.names[class_id].lower()  # Convert to lowercase
-                        
-                        # Check if detected class matches any in grocery list (case-insensitive)
-                        matched_item = None
-                        for grocery_item in grocery_list:
-                            if class_name == grocery_item.lower() or grocery_item.lower() in class_name:
-                                matched_item = grocery_item
-                                break
-                        
-                        if matched_item:
-                            current_frame_detections[matched_item].append({
-                                'box': box,
-                                'confidence': confidence
-                            })
-                            print(f"✅ Detected: {matched_item} (YOLO: {class_name}, conf: {confidence:.2f})")
-            
-            # Update inventory for detected items
-            for item, detections in current_frame_detections.items():
-                if detections:
-                    # Save image of the first (best) detection
-                    best_detection = max(detections, key=lambda x: x['confidence'])
-                    image_filename = save_detected_image(
-                        frame, 
-                        item, 
-                        best_detection['box'],
-                        best_detection['confidence']
-                    )
-                    
-                    # Update inventory with image
-                    update_inventory(item, len(detections), image_filename)
-                    grocery_counts[item] += len(detections)
-        
-        # Display current counts on frame
-        y_offset = 30
-        cv2.putText(frame, "Smart Fridge Detection", (10, y_offset), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                # Update inventory only for items whose smoothed count changed and held
+                reported = dict(smoother.reported)
+                changes = smoother.observe({item: len(detections) for item, detections in current_frame_detections.items()})
+                for item, count in changes.items():
+                    detections = current_frame_detections.get(item)
+                    image_filename = None
+                    if detections:
+                        # Save image of the first (best) detection
+                        best_detection = max(detections, key=lambda x: x['confidence'])
+                        image_filename = save_detected_image(
+                            frame, 
+                            item, 
+                            best_detection['box'],
+                            best_detection['confidence']
+                        )
+                
+                    # Update inventory with image and the zones it was seen in
+                    item_zones = {zone: counts[item] for zone, counts in zone_counts.items() if item in counts}
+                    update_inventory(item, count - reported.get(item, 0), image_filename, item_zones)
+                    grocery_counts[item] = count
         
-        for item, count in grocery_counts.items():
-            y_offset += 25
-            cv2.putText(frame, f"{item}: {count}", (10, y_offset), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            if time.time() - last_stats_time >= STATS_INTERVAL:
+                publish_detection_stats(frame_skip, smoother)
+                last_stats_time = time.time()
         
-        # Show instructions
-        cv2.putText(frame, "Press 'q' to quit, 'r' to reset, 's' to save", (10, frame.shape[0] - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+            if args.headless:
+                continue  # nothing to draw or poll
         
-        # Display frame
-        cv2.imshow("Smart Fridge Grocery Detection", frame)
+            # Display current counts on frame
+            y_offset = 30
+            cv2.putText(frame, "Smart Fridge Detection", (10, y_offset), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         
-        # Handle key presses
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('r'):
-            # Reset counts
-            grocery_counts.clear()
-            print("🔄 Counts reset")
-        elif key == ord('s'):
-            # Save current state to database
-            print("💾 Saving current state...")
             for item, count in grocery_counts.items():
-                update_inventory(item, 0)
-            print("✅ State saved")
+                y_offset += 25
+                cv2.putText(frame, f"{item}: {count}", (10, y_offset), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        
+            # Show instructions
+            cv2.putText(frame, "Press 'q' to quit, 'r' to reset, 's' to save", (10, frame.shape[0] - 20), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        
+            # Display frame
+            cv2.imshow("Smart Fridge Grocery Detection", frame)
+        
+            # Handle key presses
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('r'):
+                # Reset counts
+                grocery_counts.clear()
+                print("🔄 Counts reset")
+            elif key == ord('s'):
+                # Save current state to database
+                print("💾 Saving current state...")
+                for item, count in grocery_counts.items():
+                    update_inventory(item, 0)
+                print("✅ State saved")
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted by user")
     
     # Cleanup
     cap.release()
-    cv2.destroyAllWindows()
+    if not args.headless:
+        cv2.destroyAllWindows()
     mqtt_client.loop_stop()
     mqtt_client.disconnect()
     print("👋 Fridge detection stopped")
@@ -5,11 +5,20 @@ import paho.mqtt.client as mqtt
 import json
 import time
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from frame_skip import AdaptiveFrameSkip
+from count_smoother import CountSmoother
 
 # ---------------- MQTT Configuration ----------------
 MQTT_BROKER = "broker-cn.emqx.io"
 MQTT_PORT = 1883
 MQTT_TOPIC = "fridge/inventory"
+MQTT_STATS_TOPIC = "fridge/detection-stats"
+DETECTION_RATE = 1.0  # target detections per second (30th frame of a 30 fps camera)
+STATS_INTERVAL = 10  # seconds between frame-skip metrics
 
 # ---------------- Database Connection ----------------
 def connect_to_database():
@@ -94,6 +103,16 @@ def detect_objects_by_color(frame):
     
     return detected_items
 
+# ---------------- Frame-Skip Metrics ----------------
+def publish_detection_stats(frame_skip, smoother):
+    """Publish the adaptive frame-skip stride, achieved detection rate and suppressed writes"""
+    stats = dict(frame_skip.metrics(), inventory_writes=smoother.stats["reported"],
+                 writes_suppressed=smoother.suppressed(), timestamp=datetime.now().isoformat())
+    mqtt_client.publish(MQTT_STATS_TOPIC, json.dumps(stats))
+    print(f"📈 Detection cadence: {frame_skip.summary()}")
+    print(f"🧮 Count smoothing: {smoother.summary()}")
+    return stats
+
 # ---------------- Database Functions ----------------
 def update_inventory(item_name, quantity_change):
     """Update inventory in database and send MQTT message"""
@@ -143,6 +162,13 @@ def update_inventory(item_name, quantity_change):
 
 # ---------------- Main Detection Loop ----------------
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simple color-based fridge detection")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window or keyboard; stop with Ctrl+C")
+    args = parser.parse_args()
+
     print("🚀 Starting Simple Smart Fridge Detection...")
     print("🎯 Using color-based detection (no AI model required)")
     
@@ -177,57 +203,67 @@ def main():
     
     print("📹 Webcam opened successfully")
     print("🎯 Detecting: apple (red), banana (yellow), orange, milk (white)")
-    print("💡 Press 'q' to quit, 'r' to reset counts, 's' to save current state")
+    if args.headless:
+        print("💡 Headless mode: no window, press Ctrl+C to quit")
+    else:
+        print("💡 Press 'q' to quit, 'r' to reset counts, 's' to save current state")
     
-    frame_count = 0
-    detection_threshold = 30  # Process every 30th frame for performance
-    last_detection_time = time.time()
-    detection_cooldown = 2  # Minimum 2 seconds between detections
+    frame_skip = AdaptiveFrameSkip(target_rate=DETECTION_RATE)
+    smoother = CountSmoother()
+    last_stats_time = time.time()
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("❌ Error: Could not read from webcam")
-            break
-        
-        frame_count += 1
-        
-        # Process every nth frame for better performance
-        if frame_count % detection_threshold == 0:
-            current_time = time.time()
-            if current_time - last_detection_time >= detection_cooldown:
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                print("❌ Error: Could not read from webcam")
+                break
+        
+            # Detect on every stride-th frame; the stride follows inference time and load
+            if frame_skip.tick():
+                started = time.perf_counter()
                 detected_items = detect_objects_by_color(frame)
-                
-                # Update inventory for detected items
-                for item_name, count in detected_items:
-                    if count > 0:
-                        update_inventory(item_name, count)
-                        last_detection_time = current_time
-        
-        # Display current frame with detection info
-        cv2.putText(frame, "Simple Fridge Detection", (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
-        # Show instructions
-        cv2.putText(frame, "Press 'q' to quit, 'r' to reset, 's' to save", (10, frame.shape[0] - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-        
-        # Display frame
-        cv2.imshow("Simple Smart Fridge Detection", frame)
-        
-        # Handle key presses
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('r'):
-            print("🔄 Counts reset")
-        elif key == ord('s'):
-            print("💾 Saving current state...")
-            print("✅ State saved")
+                frame_skip.record(time.perf_counter() - started)
+            
+                # Update inventory only when a smoothed count changed and held
+                reported = dict(smoother.reported)
+                for item_name, count in smoother.observe(dict(detected_items)).items():
+                    update_inventory(item_name, count - reported.get(item_name, 0))
+        
+            if time.time() - last_stats_time >= STATS_INTERVAL:
+                publish_detection_stats(frame_skip, smoother)
+                last_stats_time = time.time()
+        
+            if args.headless:
+                continue  # nothing to draw or poll
+        
+            # Display current frame with detection info
+            cv2.putText(frame, "Simple Fridge Detection", (10, 30), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        
+            # Show instructions
+            cv2.putText(frame, "Press 'q' to quit, 'r' to reset, 's' to save", (10, frame.shape[0] - 20), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        
+            # Display frame
+            cv2.imshow("Simple Smart Fridge Detection", frame)
+        
+            # Handle key presses
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('r'):
+                print("🔄 Counts reset")
+            elif key == ord('s'):
+                print("💾 Saving current state...")
+                print("✅ State saved")
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted by user")
     
     # Cleanup
     cap.release()
-    cv2.destroyAllWindows()
+    if not args.headless:
+        cv2.destroyAllWindows()
     mqtt_client.loop_stop()
     mqtt_client.disconnect()
     print("👋 Simple fridge detection stopped")
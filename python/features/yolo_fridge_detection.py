@@ -4,25 +4,32 @@ Uses YOLOv8 for accurate object detection with backend API integration
 Much more accurate than color-based detection
 """
 
-import cv2
+import argparse
+import importlib.util
 import numpy as np
-import requests
+import os
+import sys
 import time
 from datetime import datetime
 import json
 
-# Try to import YOLO, fallback to color detection if not available
-try:
-    from ultralytics import YOLO
-    YOLO_AVAILABLE = True
-    print("✅ YOLO available - using AI detection")
-except ImportError:
-    YOLO_AVAILABLE = False
-    print("⚠️ YOLO not available - install with: pip install ultralytics")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from model_warmup import warm_up, describe
+from count_smoother import CountSmoother
+from overlay_panel import OverlayPanel
+
+# cv2, requests and ultralytics (torch) are imported where they are used, so
+# importing this module stays cheap; only check that YOLO is installed
+YOLO_AVAILABLE = importlib.util.find_spec("ultralytics") is not None
 
 # Configuration
 BACKEND_URL = "http://localhost:3000"
 CAMERA_INDEX = 0
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+BATCH_SIZE = 1  # frames per inference; warm-up runs at this size
+WARMUP_RUNS = 3
+SCAN_FRAMES = 5  # frames per scan; counts are the per-item median over them
 DETECTION_INTERVAL = 5  # seconds between detections
 CONFIDENCE_THRESHOLD = 0.3  # Lowered from 0.5 for better detection
 
@@ -51,14 +58,22 @@ FOOD_ITEMS = [
 ]
 
 class YOLOFridgeDetector:
-    def __init__(self):
+    def __init__(self, headless=False):
+        self.headless = headless
+        self.panel = OverlayPanel(0, 150, alpha=0.3)
+        self.footer = OverlayPanel(-40, 40, alpha=0)
         self.camera = None
         self.model = None
+        self.warmup = None
         self.detected_items = {}
         self.last_detection_time = 0
         
         print("🧊 YOLO Fridge Detection System Starting...")
         print("=" * 60)
+        if YOLO_AVAILABLE:
+            print("✅ YOLO available - using AI detection")
+        else:
+            print("⚠️ YOLO not available - install with: pip install ultralytics")
         
     def initialize_yolo(self):
         """Initialize YOLO model"""
@@ -68,27 +83,43 @@ class YOLOFridgeDetector:
             return False
         
         try:
+            from ultralytics import YOLO
+
             print("🤖 Loading YOLO model...")
             # YOLOv8n is fastest, yolov8s is more accurate
             self.model = YOLO("yolov8n.pt")  # Will auto-download if not present
             print("✅ YOLO model loaded successfully")
+            self.warm_up()
             return True
         except Exception as e:
             print(f"❌ Error loading YOLO model: {e}")
             return False
     
+    def infer(self, frames):
+        return self.model(frames, verbose=False, conf=CONFIDENCE_THRESHOLD, iou=0.45)
+
+    def warm_up(self, runs=WARMUP_RUNS):
+        """Pay the first-inference cost on synthetic frames instead of the first scan"""
+        print(f"🔥 Warming up YOLO ({runs} runs at {CAMERA_WIDTH}x{CAMERA_HEIGHT}, batch {BATCH_SIZE})...")
+        self.warmup = warm_up(self.infer, CAMERA_WIDTH, CAMERA_HEIGHT, BATCH_SIZE, runs)
+        print(f"⏱️ YOLO latency: {describe(self.warmup)}")
+        return self.warmup
+
     def initialize_camera(self):
         """Initialize webcam"""
+        import cv2
+        from frame_bus import open_camera
+
         print("📷 Initializing camera...")
-        self.camera = cv2.VideoCapture(CAMERA_INDEX)
+        self.camera = open_camera(CAMERA_INDEX)
         
         if not self.camera.isOpened():
             print("❌ Error: Could not open camera")
             return False
             
         # Set camera properties
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
         
         print("✅ Camera initialized successfully")
         return True
@@ -98,13 +129,15 @@ class YOLOFridgeDetector:
         Detect items using YOLO
         Returns dictionary of detected items and their counts
         """
+        import cv2
+
         if not self.model:
             return {}
         
         detected = {}
         
         # Run YOLO detection with lower confidence threshold
-        results = self.model(frame, verbose=False, conf=CONFIDENCE_THRESHOLD, iou=0.45)
+        results = self.infer(frame)
         
         # Process results
         all_detections = []  # For debugging
@@ -141,8 +174,26 @@ class YOLOFridgeDetector:
         
         return detected
     
+    def scan_items(self, frame=None, frames=SCAN_FRAMES):
+        """
+        Median per-item counts over `frames` consecutive frames, so one
+        occluded or badly lit frame does not decide what the scan reports.
+        Without a frame, all of them are read from the camera.
+        """
+        smoother = CountSmoother(window=frames, hold=0)
+        for i in range(frames):
+            if i or frame is None:
+                ret, frame = self.camera.read()
+                if not ret:
+                    break
+            smoother.observe(self.detect_items_yolo(frame))
+        print(f"🧮 Count smoothing: {smoother.summary()}")
+        return {item: count for item, count in smoother.reported.items() if count}
+
     def get_current_quantity(self, item):
         """Get current quantity from backend"""
+        import requests
+
         try:
             url = f"{BACKEND_URL}/api/fridge/inventory"
             response = requests.get(url, timeout=2)
@@ -161,19 +212,25 @@ class YOLOFridgeDetector:
             print(f"⚠️ Backend might not be running at {BACKEND_URL}")
             return 0
     
-    def update_backend(self, item, quantity):
-        """Update backend with detected item - increments quantity"""
+    def update_backend(self, item, quantity, absolute=False):
+        """Update backend with detected item - increments quantity, or sets it when absolute"""
+        import requests
+
         try:
             # Capitalize item name
             item_capitalized = item.capitalize()
             
             print(f"\n🔄 Updating {item_capitalized}...")
             
-            # Get current quantity first
-            current_qty = self.get_current_quantity(item_capitalized)
-            new_qty = current_qty + quantity
-            
-            print(f"➕ Adding {quantity} to existing {current_qty} = {new_qty}")
+            if absolute:
+                new_qty = quantity
+                print(f"🟰 Setting quantity to {new_qty}")
+            else:
+                # Get current quantity first
+                current_qty = self.get_current_quantity(item_capitalized)
+                new_qty = current_qty + quantity
+                
+                print(f"➕ Adding {quantity} to existing {current_qty} = {new_qty}")
             
             url = f"{BACKEND_URL}/api/fridge/update"
             data = {
@@ -212,49 +269,78 @@ class YOLOFridgeDetector:
         
         return alerts
     
-    def display_frame(self, frame, detected_items):
-        """Display frame with detection info"""
-        # Add semi-transparent overlay for text background
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (frame.shape[1], 150), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
-        
-        # Add text overlay
-        y_offset = 30
-        cv2.putText(frame, "🧊 YOLO Fridge Detection", (10, y_offset), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
-        y_offset += 30
-        cv2.putText(frame, f"Time: {datetime.now().strftime('%H:%M:%S')}", 
-                   (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        y_offset += 30
-        cv2.putText(frame, "Detected Items:", (10, y_offset), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-        
-        y_offset += 30
+    def overlay_lines(self, detected_items):
+        """Text of the info panel; the clock has second resolution so the panel re-renders at most once a second"""
+        lines = [("🧊 YOLO Fridge Detection", (10, 30), 0.7, (0, 255, 0), 2),
+                 (f"Time: {datetime.now().strftime('%H:%M:%S')}", (10, 60), 0.5, (255, 255, 255), 1),
+                 ("Detected Items:", (10, 90), 0.6, (0, 255, 255), 2)]
+        y_offset = 120
         if detected_items:
             for item, quantity in detected_items.items():
                 threshold = THRESHOLDS.get(item, 1)
                 color = (0, 0, 255) if quantity <= threshold else (0, 255, 0)
-                text = f"{item.capitalize()}: {quantity}"
-                cv2.putText(frame, text, (10, y_offset), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+                lines.append((f"{item.capitalize()}: {quantity}", (10, y_offset), 0.5, color, 1))
                 y_offset += 25
         else:
-            cv2.putText(frame, "No items detected", (10, y_offset), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (128, 128, 128), 1)
-        
-        # Instructions at bottom
-        instructions = "Press 'q' to quit | Press 's' to scan"
-        cv2.putText(frame, instructions, 
-                   (10, frame.shape[0] - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-        
+            lines.append(("No items detected", (10, y_offset), 0.5, (128, 128, 128), 1))
+        return lines
+
+    def display_frame(self, frame, detected_items):
+        """Draw the cached info panels onto frame in place and show it"""
+        import cv2
+
+        self.panel.render(frame.shape[1], self.overlay_lines(detected_items))
+        self.panel.apply(frame)
+        self.footer.render(frame.shape[1], [("Press 'q' to quit | Press 's' to scan", (10, 20), 0.5, (255, 255, 0), 1)])
+        self.footer.apply(frame)
         cv2.imshow("YOLO Fridge Detection", frame)
-    
+
+    def scan_and_report(self, frame=None, absolute=False):
+        """
+        Scan, push the counts to the backend and print threshold alerts.
+        A manual scan adds what is in front of the camera to the backend
+        quantities; an absolute scan (the periodic headless one) sets the
+        quantities of the items whose count changed since the previous scan,
+        so repeating it does not add the same items again.
+        """
+        print("\n🔍 Scanning for items with YOLO...")
+        print(f"⚙️ Using confidence threshold: {CONFIDENCE_THRESHOLD}")
+        detected = self.scan_items(frame)
+        self.last_detection_time = time.time()
+
+        if absolute:
+            previous, self.detected_items = self.detected_items, detected
+            for item in sorted(set(previous) | set(detected)):
+                if detected.get(item, 0) != previous.get(item, 0):
+                    self.update_backend(item, detected.get(item, 0), absolute=True)
+
+        if detected:
+            print(f"📦 Detected: {detected}")
+            if not absolute:
+                self.detected_items = detected
+
+                # Update backend
+                for item, quantity in detected.items():
+                    self.update_backend(item, quantity)
+
+            # Check thresholds
+            alerts = self.check_thresholds(detected)
+
+            if alerts:
+                print("\n🚨 ALERTS:")
+                for alert in alerts:
+                    print(f"  {alert}")
+
+            print("\n✅ Scan complete!")
+        else:
+            print("❌ No food items detected. Try again.")
+
+        print()
+
     def run(self):
         """Main detection loop"""
+        import cv2
+
         if not self.initialize_yolo():
             print("❌ Cannot start without YOLO model")
             return
@@ -264,24 +350,33 @@ class YOLOFridgeDetector:
         
         print("\n📸 Camera is ready!")
         print("=" * 60)
-        print("Instructions:")
-        print("1. Show items to the camera")
-        print("2. Press 's' to scan and detect items")
-        print("3. Press 'q' to quit")
+        if self.headless:
+            print(f"Headless mode: scanning every {DETECTION_INTERVAL} seconds and setting the "
+                  f"backend quantities of changed items, Ctrl+C to quit")
+        else:
+            print("Instructions:")
+            print("1. Show items to the camera")
+            print("2. Press 's' to scan and detect items")
+            print("3. Press 'q' to quit")
         print("=" * 60)
         print(f"\n🎯 Can detect: {', '.join(FOOD_ITEMS)}")
         print()
         
         try:
             while True:
+                if self.headless:
+                    # No window to feed: only read frames when a scan is due
+                    time.sleep(max(0.0, self.last_detection_time + DETECTION_INTERVAL - time.time()))
+                    self.scan_and_report(absolute=True)
+                    continue
+
                 ret, frame = self.camera.read()
                 if not ret:
                     print("❌ Error reading frame")
                     break
                 
-                # Display current frame
-                display_frame = frame.copy()
-                self.display_frame(display_frame, self.detected_items)
+                # The overlay is drawn on the frame itself; a scan reads fresh frames
+                self.display_frame(frame, self.detected_items)
                 
                 # Handle keyboard input
                 key = cv2.waitKey(1) & 0xFF
@@ -291,31 +386,7 @@ class YOLOFridgeDetector:
                     break
                 
                 elif key == ord('s'):
-                    print("\n🔍 Scanning for items with YOLO...")
-                    print(f"⚙️ Using confidence threshold: {CONFIDENCE_THRESHOLD}")
-                    detected = self.detect_items_yolo(frame)
-                    
-                    if detected:
-                        print(f"📦 Detected: {detected}")
-                        self.detected_items = detected
-                        
-                        # Update backend
-                        for item, quantity in detected.items():
-                            self.update_backend(item, quantity)
-                        
-                        # Check thresholds
-                        alerts = self.check_thresholds(detected)
-                        
-                        if alerts:
-                            print("\n🚨 ALERTS:")
-                            for alert in alerts:
-                                print(f"  {alert}")
-                        
-                        print("\n✅ Scan complete!")
-                    else:
-                        print("❌ No food items detected. Try again.")
-                    
-                    print()
+                    self.scan_and_report()
                 
         except KeyboardInterrupt:
             print("\n\n⚠️ Interrupted by user")
@@ -325,9 +396,12 @@ class YOLOFridgeDetector:
     
     def cleanup(self):
         """Clean up resources"""
+        import cv2
+
         if self.camera:
             self.camera.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
         print("\n✅ Camera released")
         print("👋 YOLO Fridge Detection System stopped")
 
@@ -341,7 +415,13 @@ def main():
     print("╚════════════════════════════════════════════════════════════╝")
     print()
     
-    detector = YOLOFridgeDetector()
+    parser = argparse.ArgumentParser(description="YOLO fridge detection")
+    parser.add_argument("--headless", action="store_true",
+                        help=f"no window or keyboard: scan every {DETECTION_INTERVAL} seconds "
+                             f"and set (not add to) the backend quantities")
+    args = parser.parse_args()
+
+    detector = YOLOFridgeDetector(headless=args.headless)
     detector.run()
 
 if __name__ == "__main__":
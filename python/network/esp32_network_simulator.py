@@ -4,7 +4,7 @@ Continuous ESP32 Network Sensor Data Simulator
 For hardware connected to separate PC - sends sensor data to development machine
 """
 
-import paho.mqtt.publish as publish
+import argparse
 import json
 import time
 import random
@@ -12,6 +12,11 @@ import signal
 import sys
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+import mqtt_publisher
+import latency_trace
+from report_by_exception import ExceptionReporter, MAX_SILENCE
+
 # Load network configuration
 def load_network_config():
     """Load network configuration from file"""
@@ -25,7 +30,9 @@ def load_network_config():
 # Load configuration
 config = load_network_config()
 BROKER = config['development_machine']['mqtt_broker']
+PORT = config['development_machine']['mqtt_port']
 TOPIC = "esp/sensors"
+STATS_EVERY = 30  # samples between report-by-exception summaries (1 minute)
 
 def signal_handler(sig, frame):
     print('\n🛑 Stopping ESP32 network simulator...')
@@ -33,8 +40,12 @@ def signal_handler(sig, frame):
 
 signal.signal(signal.SIGINT, signal_handler)
 
-def send_sensor_data():
-    """Send realistic ESP32 sensor data from hardware machine"""
+def send_sensor_data(reporter=None):
+    """Send realistic ESP32 sensor data from hardware machine
+    
+    With a reporter (report-by-exception mode) samples within the deadbands
+    are suppressed; returns whether the sample was published.
+    """
     # Generate realistic sensor data with some variation
     temp = 25 + random.uniform(-2, 3)  # Temperature between 23-28°C
     hum = 60 + random.uniform(-5, 10)   # Humidity between 55-70%
@@ -58,17 +69,34 @@ def send_sensor_data():
         "ir": ir,
         "timestamp": time.time(),
         "hardware_ip": config['hardware_machine']['ip'],
-        "source": "hardware_machine"
+        "source": "hardware_machine",
+        "trace": latency_trace.start()
     }
+    if reporter:
+        publish, reason = reporter.should_publish(data)
+        if not publish:
+            return False
     
     try:
-        publish.single(TOPIC, json.dumps(data), hostname=BROKER)
+        mqtt_publisher.single(TOPIC, json.dumps(data), hostname=BROKER, port=PORT)
         print(f"📡 ESP32 Network Data: Temp={data['temp']}°C, Hum={data['hum']}%, LDR={data['ldr']}, PIR={data['pir']}, IR={data['ir']}")
         print(f"🌐 From: {config['hardware_machine']['ip']} -> {config['development_machine']['ip']}")
     except Exception as e:
         print(f"❌ Error sending data: {e}")
+        return False
+    if reporter:
+        reporter.published(data, reason)
+    return True
 
 def main():
+    parser = argparse.ArgumentParser(description="ESP32 network sensor data simulator")
+    parser.add_argument("--report-by-exception", action="store_true",
+                        help="publish only on deadband changes, PIR/IR edges and heartbeats")
+    parser.add_argument("--max-silence", type=float, default=MAX_SILENCE,
+                        help="heartbeat interval in report-by-exception mode (seconds)")
+    args = parser.parse_args()
+    reporter = ExceptionReporter(max_silence=args.max_silence) if args.report_by_exception else None
+    
     print("🚀 ESP32 Network Sensor Data Simulator")
     print("=" * 60)
     print(f"🌐 Hardware Machine: {config['hardware_machine']['ip']}")
@@ -76,15 +104,22 @@ def main():
     print(f"📡 Publishing to: {TOPIC}")
     print(f"🔗 Broker: {BROKER}")
     print("📊 Sending data every 2 seconds...")
+    if reporter:
+        print(f"📉 Report by exception: deadbands {reporter.deadbands}, heartbeat every {reporter.max_silence:g}s")
     print("Press Ctrl+C to stop")
     print()
     
     try:
         while True:
-            send_sensor_data()
+            send_sensor_data(reporter)
+            if reporter and reporter.stats["samples"] % STATS_EVERY == 0:
+                print(f"📊 Report by exception: {reporter.summary()}")
             time.sleep(2)
     except KeyboardInterrupt:
         print('\n🛑 Stopping ESP32 network simulator...')
+    finally:
+        if reporter:
+            print(f"📊 Report by exception: {reporter.summary()}")
 
 if __name__ == "__main__":
     main()
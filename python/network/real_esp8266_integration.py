@@ -4,39 +4,69 @@ Real ESP8266 Integration System
 Works with your actual ESP8266 hardware and face recognition
 """
 
-import cv2
-import face_recognition
 import pickle
 import time
 import os
+import sys
 import json
 import paho.mqtt.client as mqtt
 
-# === Load Face Encodings ===
-print("[INFO] Loading face encodings...")
-try:
-    data = pickle.load(open("face_encodings.pkl", "rb"))
-    print("✅ Face encodings loaded successfully")
-except FileNotFoundError:
-    print("⚠️ Face encodings file not found. Using dummy recognition.")
-    data = {"encodings": [], "names": []}
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from trigger_dispatcher import TriggerDispatcher
+from motion_trigger import MotionTrigger
+import latency_trace
+import sensor_codec
 
 # === MQTT Config ===
 BROKER = "broker-cn.emqx.io"
 PORT = 1883
 TOPIC_SENSORS = "esp/sensors"   # ESP8266 publishes sensor data
+TOPIC_SENSORS_BIN = sensor_codec.TOPIC_SENSORS_BIN  # Same samples, compact binary encoding
 TOPIC_RESULT = "esp/cam"        # Python publishes recognition result
 TOPIC_COMMANDS = "home/control" # Server sends device commands
 TOPIC_STATUS = "esp/status"     # ESP8266 publishes status
+TOPIC_TRIGGER_STATS = "face-recognition/trigger-stats"  # Python publishes trigger counters
+
+# === Trigger Config ===
+DEBOUNCE = 4             # seconds of quiet before motion counts as a new event
+COOLDOWN = 15            # seconds to ignore motion after a recognition
+RECOGNIZED_WINDOW = 60   # seconds to drop repeat results for the same person
+STATS_INTERVAL = 10      # seconds between trigger counter publishes
 
 SAVE_FOLDER = "captured_faces"
-if not os.path.exists(SAVE_FOLDER):
-    os.makedirs(SAVE_FOLDER)
+ENCODINGS_FILE = "face_encodings.pkl"
+
+# Recognition runs on a single camera worker; the MQTT callback only enqueues
+CAMERA_JOB = "camera"
+dispatcher = TriggerDispatcher(workers=1, name="face-recognition")
+motion_trigger = MotionTrigger(DEBOUNCE, COOLDOWN, RECOGNIZED_WINDOW)
+duplicates = sensor_codec.DuplicateFilter()  # --encoding both sends each sample twice
+last_stats_publish = 0
+
+# Set up in main(); importing this module loads no models and opens no connections
+known_faces = {"encodings": [], "names": []}
+client = None
+
+# === Load Face Encodings ===
+def load_encodings(path=ENCODINGS_FILE):
+    print("[INFO] Loading face encodings...")
+    try:
+        with open(path, "rb") as f:
+            encodings = pickle.load(f)
+        print("✅ Face encodings loaded successfully")
+        return encodings
+    except FileNotFoundError:
+        print("⚠️ Face encodings file not found. Using dummy recognition.")
+        return {"encodings": [], "names": []}
 
 # === Face Recognition Function ===
-def open_camera_and_recognize():
+def open_camera_and_recognize(trace=None):
+    import cv2
+    import face_recognition
+    from frame_bus import open_camera
+    
     print("[INFO] Opening camera for recognition...")
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+    cap = open_camera(0, cv2.CAP_DSHOW)
     start_time = time.time()
     recognized_name = "Unknown"
 
@@ -65,6 +95,7 @@ def open_camera_and_recognize():
 
     # Process last frame
     if ret:
+        latency_trace.mark(trace, "captured")
         # Save the captured frame
         timestamp = int(time.time())
         frame_path = os.path.join(SAVE_FOLDER, f"capture_{timestamp}.jpg")
@@ -76,15 +107,15 @@ def open_camera_and_recognize():
         boxes = face_recognition.face_locations(rgb_frame)
         encodings = face_recognition.face_encodings(rgb_frame, boxes)
 
-        if len(encodings) > 0 and len(data["encodings"]) > 0:
+        if len(encodings) > 0 and len(known_faces["encodings"]) > 0:
             for encoding in encodings:
-                matches = face_recognition.compare_faces(data["encodings"], encoding)
+                matches = face_recognition.compare_faces(known_faces["encodings"], encoding)
                 name = "Unknown"
                 if True in matches:
                     matchedIdxs = [i for (i, b) in enumerate(matches) if b]
                     counts = {}
                     for i in matchedIdxs:
-                        name = data["names"][i]
+                        name = known_faces["names"][i]
                         counts[name] = counts.get(name, 0) + 1
                     name = max(counts, key=counts.get)
                 recognized_name = name
@@ -92,6 +123,7 @@ def open_camera_and_recognize():
         else:
             print("[RESULT] No faces detected or no encodings available")
             recognized_name = "No Face Detected"
+        latency_trace.mark(trace, "detected")
 
     cap.release()
     cv2.destroyAllWindows()
@@ -103,7 +135,8 @@ def on_connect(client, userdata, flags, rc):
         print("✅ Connected to MQTT Broker!")
         # Subscribe to sensor data from ESP8266
         client.subscribe(TOPIC_SENSORS)
-        print(f"📡 Subscribed to: {TOPIC_SENSORS}")
+        client.subscribe(TOPIC_SENSORS_BIN)
+        print(f"📡 Subscribed to: {TOPIC_SENSORS}, {TOPIC_SENSORS_BIN}")
         
         # Publish initial status
         publish_status()
@@ -112,9 +145,10 @@ def on_connect(client, userdata, flags, rc):
 
 def on_message(client, userdata, msg):
     try:
-        topic = msg.topic
-        payload = msg.payload.decode()
-        data = json.loads(payload)  # parse JSON
+        # JSON, or the compact encoding on esp/sensors/bin (reported as esp/sensors)
+        topic, data = sensor_codec.decode_message(msg.topic, msg.payload)
+        if duplicates.duplicate(msg.topic, data):
+            return  # second copy of a sample sent in both encodings
         
         print(f"📥 Received from {topic}: {data}")
 
@@ -138,30 +172,55 @@ def handle_sensor_data(data):
 
     # === Trigger camera when PIR or IR == 1 ===
     if pir == 1 or ir == 1:
-        print("[TRIGGER] PIR/IR detected → Starting face recognition")
-        
-        # Publish status update
-        publish_status("processing")
-        
-        # Start face recognition
-        result = open_camera_and_recognize()
-        
-        # Publish result
-        result_data = {
-            "timestamp": int(time.time()),
-            "face_detected": result != "Unknown" and result != "No Face Detected",
-            "recognized_name": result,
-            "status": "face_recognized" if result != "Unknown" else "no_face",
-            "trigger_reason": "motion_detection",
-            "pir": pir,
-            "ir": ir
-        }
-        
-        client.publish(TOPIC_RESULT, json.dumps(result_data))
-        print(f"[INFO] Published result: {result_data}")
-        
-        # Publish status back to ready
+        fire, reason = motion_trigger.on_motion()
+        trace = latency_trace.from_payload(data)
+        if not fire:
+            print(f"[TRIGGER] PIR/IR detected → Suppressed ({reason})")
+        elif dispatcher.submit(CAMERA_JOB, run_recognition, pir, ir, trace):
+            print("[TRIGGER] PIR/IR detected → Face recognition queued")
+        else:
+            motion_trigger.on_cancel()
+            print("[TRIGGER] PIR/IR detected → Recognition already in progress, trigger coalesced")
+        publish_trigger_stats()
+
+def run_recognition(pir, ir, trace=None):
+    """Worker job: recognize and publish the result of a PIR/IR trigger"""
+    latency_trace.mark(trace, "started")
+    # Publish status update
+    publish_status("processing")
+    
+    # Start face recognition
+    result = "Unknown"
+    is_new_result = True
+    try:
+        result = open_camera_and_recognize(trace)
+    finally:
+        is_new_result = motion_trigger.on_result(result)
+    
+    if not is_new_result:
+        print(f"[INFO] {result} was recognized in the last {RECOGNIZED_WINDOW}s, result not republished")
         publish_status("ready")
+        publish_trigger_stats(force=True)
+        return
+    
+    # Publish result
+    result_data = {
+        "timestamp": int(time.time()),
+        "face_detected": result != "Unknown" and result != "No Face Detected",
+        "recognized_name": result,
+        "status": "face_recognized" if result != "Unknown" else "no_face",
+        "trigger_reason": "motion_detection",
+        "pir": pir,
+        "ir": ir,
+        "trace": latency_trace.mark(trace, "result_published")
+    }
+    
+    client.publish(TOPIC_RESULT, json.dumps(result_data))
+    print(f"[INFO] Published result: {result_data}")
+    
+    # Publish status back to ready
+    publish_status("ready")
+    publish_trigger_stats(force=True)
 
 def publish_status(status="ready"):
     """Publish system status"""
@@ -169,29 +228,57 @@ def publish_status(status="ready"):
         "timestamp": time.time(),
         "status": status,
         "system": "face_recognition",
-        "version": "1.0"
+        "version": "1.0",
+        "dispatcher": dispatcher.get_metrics(),
+        "trigger": motion_trigger.get_stats()
     }
     
     client.publish(TOPIC_STATUS, json.dumps(status_data))
     print(f"[STATUS] Published status: {status}")
 
-# === Setup MQTT ===
-client = mqtt.Client()
-client.on_connect = on_connect
-client.on_message = on_message
-
-print("🔗 Connecting to MQTT broker...")
-try:
-    client.connect(BROKER, PORT, 60)
-    print("✅ Connected to MQTT broker!")
-    print("📡 Waiting for ESP8266 sensor data...")
-    print("Press Ctrl+C to stop")
+def publish_trigger_stats(force=False):
+    """Publish trigger counters, at most once per STATS_INTERVAL unless forced"""
+    global last_stats_publish
+    now = time.monotonic()
+    if not force and now - last_stats_publish < STATS_INTERVAL:
+        return
+    last_stats_publish = now
     
-    # Loop forever
-    client.loop_forever()
-except KeyboardInterrupt:
-    print("\n🛑 Stopping face recognition system...")
-    client.disconnect()
-except Exception as e:
-    print(f"❌ Error connecting to MQTT: {e}")
+    stats = motion_trigger.get_stats()
+    stats.update({
+        "timestamp": time.time(),
+        "system": "face_recognition"
+    })
+    client.publish(TOPIC_TRIGGER_STATS, json.dumps(stats))
+    print(f"[STATS] Triggers: received={stats['received']}, executed={stats['executed']}, suppressed={stats['suppressed']}")
+
+def main():
+    global client, known_faces
+    known_faces = load_encodings()
+    os.makedirs(SAVE_FOLDER, exist_ok=True)
+    
+    # === Setup MQTT ===
+    client = mqtt.Client()
+    client.on_connect = on_connect
+    client.on_message = on_message
+    
+    dispatcher.start()
+    
+    print("🔗 Connecting to MQTT broker...")
+    try:
+        client.connect(BROKER, PORT, 60)
+        print("✅ Connected to MQTT broker!")
+        print("📡 Waiting for ESP8266 sensor data...")
+        print("Press Ctrl+C to stop")
+        
+        # Loop forever
+        client.loop_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping face recognition system...")
+        client.disconnect()
+        dispatcher.stop(timeout=1)
+    except Exception as e:
+        print(f"❌ Error connecting to MQTT: {e}")
 
+if __name__ == "__main__":
+    main()
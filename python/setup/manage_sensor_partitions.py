@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Sensor Table Partition & Retention Manager
+Keeps the sensors table bounded: monthly RANGE partitions on recorded_at,
+future partitions created ahead of time, and partitions past the retention
+horizon rolled up into sensor_rollup_minute / sensor_rollup_hour (for the
+sensor_rollup.ROLLUP_TOPICS), optionally archived to their own table, then
+dropped. Dropping a partition is a metadata
+operation, unlike DELETE over millions of rows.
+
+Reports table size, row count and estimated B-tree depth per index before
+and after every change.
+
+Usage:
+  python python/setup/manage_sensor_partitions.py report
+  python python/setup/manage_sensor_partitions.py setup
+  python python/setup/manage_sensor_partitions.py maintain --retention-months 3 [--archive] [--dry-run]
+"""
+
+import argparse
+import math
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+import sensor_aggregates
+import sensor_rollup
+
+# Database configuration - Update these values to match your MySQL setup
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'your_mysql_password_here',  # Update this with your actual MySQL password
+    'database': 'smarthome'
+}
+
+TABLE = "sensors"
+MONTHS_AHEAD = 2          # empty partitions kept ready for future months
+RETENTION_MONTHS = 3      # raw rows kept; older months live on in the rollups
+CATCH_ALL = "pmax"
+
+
+# === Month arithmetic ===
+def add_months(day, months):
+    """First day of the month `months` after the month of `day`"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month_start):
+    return f"p{month_start.year:04d}{month_start.month:02d}"
+
+
+def partition_months(first, today, ahead=MONTHS_AHEAD):
+    """Month starts from the month of `first` through `ahead` months past today"""
+    months = []
+    month = add_months(first, 0)
+    last = add_months(today, ahead)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partition_clause(month_start):
+    """Partition holding the rows of one month (upper bound = next month start)"""
+    upper = add_months(month_start, 1)
+    return f"PARTITION {partition_name(month_start)} VALUES LESS THAN (UNIX_TIMESTAMP('{upper.isoformat()}'))"
+
+
+def expired(partitions, cutoff_epoch):
+    """Partitions whose upper bound is at or before the cutoff; partitions: [(name, upper_epoch)]"""
+    return [(name, upper) for name, upper in partitions
+            if name != CATCH_ALL and upper is not None and upper <= cutoff_epoch]
+
+
+def month_of(name):
+    """Month start of a partition name ('p202511' -> 2025-11-01)"""
+    return date(int(name[1:5]), int(name[5:7]), 1)
+
+
+def rollup_chunks(first, lower, upper):
+    """
+    (granularity, start, end) ranges covering a retired partition, a day at a time.
+    first: oldest row; lower/upper: partition bounds. The bounds are local month
+    starts, which need not fall on a bucket edge (e.g. at +05:30). The bucket
+    straddling `upper` is rebuilt whole, since the next partition's rows are still
+    there; the one straddling `lower` is skipped, as the previous partition's
+    retirement (or the live rollup job) already built it from rows now dropped.
+    """
+    chunk = sensor_rollup.BACKFILL_CHUNK_HOURS * 3600
+    for granularity, (_, seconds) in sensor_aggregates.ROLLUP_TABLES.items():
+        start = max(first // seconds, -(-lower // seconds)) * seconds
+        stop = -(-upper // seconds) * seconds
+        while start < stop:
+            end = min(start + chunk, stop)
+            yield granularity, start, end
+            start = end
+
+
+def estimated_depth(size_pages, leaf_pages):
+    """B-tree levels from InnoDB page counts: leaves plus the internal levels above them"""
+    if not leaf_pages or leaf_pages <= 1:
+        return 1
+    # Internal pages ~ leaves / (fanout - 1) summed over the levels above the leaves
+    internal = max(1, size_pages - leaf_pages)
+    fanout = max(2.0, leaf_pages / internal + 1)
+    return 1 + math.ceil(math.log(leaf_pages) / math.log(fanout) - 1e-9)
+
+
+# === Database helpers ===
+def query(connection, sql, params=()):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall() if cursor.with_rows else []
+    finally:
+        cursor.close()
+
+
+def execute(connection, sql, dry_run=False):
+    print(f"   SQL: {' '.join(sql.split())[:160]}")
+    if not dry_run:
+        query(connection, sql)
+
+
+def current_partitions(connection):
+    """[(name, upper_epoch or None for MAXVALUE)] in order; [] when not partitioned"""
+    rows = query(connection, """
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (TABLE,))
+    return [(name, None if description == "MAXVALUE" else int(description)) for name, description in rows]
+
+
+def report(connection, title):
+    """Print table size and per-index estimated depth"""
+    query(connection, f"ANALYZE TABLE {TABLE}")
+    rows, data_bytes, index_bytes = query(connection, """
+        SELECT TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (TABLE,))[0]
+    partitions = current_partitions(connection)
+
+    print(f"📊 {title}")
+    print(f"   Rows (estimate): {rows or 0:,}")
+    print(f"   Data: {(data_bytes or 0) / 1048576:.1f} MB, indexes: {(index_bytes or 0) / 1048576:.1f} MB")
+    print(f"   Partitions: {len(partitions) if partitions else 'not partitioned'}")
+
+    # Partitioned tables have one B-tree per index per partition ('sensors#p#p202511')
+    stats = query(connection, """
+        SELECT index_name, table_name, stat_name, stat_value
+        FROM mysql.innodb_index_stats
+        WHERE database_name = DATABASE() AND (table_name = %s OR table_name LIKE %s)
+        AND stat_name IN ('size', 'n_leaf_pages')
+    """, (TABLE, f"{TABLE}#p#%"))
+    trees = {}
+    for index_name, table_name, stat_name, value in stats:
+        trees.setdefault((index_name, table_name), {})[stat_name] = value
+    depths = {}
+    for (index_name, _), pages in trees.items():
+        depth = estimated_depth(pages.get('size', 0), pages.get('n_leaf_pages', 0))
+        depths[index_name] = max(depths.get(index_name, 0), depth)
+    for index_name, depth in sorted(depths.items()):
+        print(f"   Index {index_name}: estimated depth {depth}")
+    return {"rows": rows, "data_bytes": data_bytes, "index_bytes": index_bytes, "depths": depths}
+
+
+def setup(connection, dry_run=False):
+    """Convert sensors to monthly RANGE partitions on recorded_at"""
+    if current_partitions(connection):
+        print("✅ sensors is already partitioned")
+        return
+    oldest = query(connection, f"SELECT MIN(recorded_at) FROM {TABLE}")[0][0]
+    today = date.today()
+    months = partition_months(oldest.date() if oldest else today, today)
+
+    print(f"🔧 Partitioning {TABLE} into {len(months)} monthly partitions")
+    # MySQL requires the partitioning column in every unique key
+    execute(connection, f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id, recorded_at)", dry_run)
+    clauses = ",\n  ".join([partition_clause(month) for month in months] +
+                           [f"PARTITION {CATCH_ALL} VALUES LESS THAN MAXVALUE"])
+    execute(connection, f"ALTER TABLE {TABLE} PARTITION BY RANGE (UNIX_TIMESTAMP(recorded_at)) (\n  {clauses}\n)", dry_run)
+
+
+def add_future_partitions(connection, dry_run=False):
+    """Split the catch-all partition so the next MONTHS_AHEAD months have their own"""
+    existing = {name for name, _ in current_partitions(connection)}
+    missing = [month for month in partition_months(date.today(), date.today()) if partition_name(month) not in existing]
+    if not missing:
+        return
+    print(f"🔧 Adding partitions: {', '.join(partition_name(month) for month in missing)}")
+    clauses = ", ".join([partition_clause(month) for month in missing] +
+                        [f"PARTITION {CATCH_ALL} VALUES LESS THAN MAXVALUE"])
+    execute(connection, f"ALTER TABLE {TABLE} REORGANIZE PARTITION {CATCH_ALL} INTO ({clauses})", dry_run)
+
+
+def retire_partition(connection, name, upper, archive=False, dry_run=False):
+    """Roll a partition's rows up, optionally archive them, then drop the partition"""
+    first = query(connection, f"SELECT UNIX_TIMESTAMP(MIN(recorded_at)) FROM {TABLE} PARTITION ({name})")[0][0]
+    if first is not None:
+        # Lower bound = the previous month's VALUES LESS THAN, see partition_clause()
+        lower = query(connection, "SELECT UNIX_TIMESTAMP(%s)", (month_of(name).isoformat(),))[0][0]
+        print(f"📉 Rolling up {name} into {', '.join(table for table, _ in sensor_aggregates.ROLLUP_TABLES.values())}")
+        if not dry_run:
+            for granularity, start, end in rollup_chunks(int(first), int(lower), upper):
+                sensor_rollup.rollup_range(connection, granularity, start, end)
+
+    if archive:
+        # Swap the partition's rows into a plain table of the same shape; instant, no row copy
+        archive_table = f"{TABLE}_archive_{name[1:]}"
+        print(f"📦 Archiving {name} to {archive_table}")
+        execute(connection, f"CREATE TABLE IF NOT EXISTS {archive_table} LIKE {TABLE}", dry_run)
+        execute(connection, f"ALTER TABLE {archive_table} REMOVE PARTITIONING", dry_run)
+        execute(connection, f"ALTER TABLE {TABLE} EXCHANGE PARTITION {name} WITH TABLE {archive_table}", dry_run)
+
+    print(f"🗑️ Dropping {name}")
+    execute(connection, f"ALTER TABLE {TABLE} DROP PARTITION {name}", dry_run)
+
+
+def maintain(connection, retention_months=RETENTION_MONTHS, archive=False, dry_run=False):
+    partitions = current_partitions(connection)
+    if not partitions:
+        print("❌ sensors is not partitioned yet, run 'setup' first")
+        return
+    add_future_partitions(connection, dry_run)
+
+    cutoff_day = add_months(date.today(), -retention_months)
+    cutoff_epoch = query(connection, "SELECT UNIX_TIMESTAMP(%s)", (cutoff_day.isoformat(),))[0][0]
+    retired = expired(partitions, int(cutoff_epoch))
+    print(f"🗓️ Retention: keeping raw rows since {cutoff_day}, {len(retired)} partition(s) expired")
+    for name, upper in retired:
+        retire_partition(connection, name, upper, archive, dry_run)
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description="Partition and retention management for the sensors table")
+    parser.add_argument("command", choices=["report", "setup", "maintain"])
+    parser.add_argument("--retention-months", type=int, default=RETENTION_MONTHS)
+    parser.add_argument("--archive", action="store_true", help="keep expired partitions as sensors_archive_YYYYMM tables")
+    parser.add_argument("--dry-run", action="store_true", help="print the DDL without running it")
+    args = parser.parse_args()
+
+    connection = mysql.connector.connect(**DB_CONFIG)
+    connection.autocommit = True
+    try:
+        report(connection, "Before")
+        if args.command == "setup":
+            setup(connection, args.dry_run)
+        elif args.command == "maintain":
+            maintain(connection, args.retention_months, args.archive, args.dry_run)
+        if args.command != "report" and not args.dry_run:
+            report(connection, "After")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -53,7 +53,10 @@ def setup_database_config():
         # Save to multiple files
         files_to_update = [
             'enhanced_sensor_data.py',
-            'dashboard_only_system.py'
+            'dashboard_only_system.py',
+            'sensor_rollup.py',
+            'sensor_ingest.py',
+            'manage_sensor_partitions.py'
         ]
         
         for filename in files_to_update:
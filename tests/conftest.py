@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures
+Tests talk to the in-process broker stand-in (python/core/local_broker.py)
+on an ephemeral port instead of a public broker, and wait on received
+messages instead of sleeping.
+"""
+
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+from local_broker import BrokerThread
+
+WAIT_TIMEOUT = 2  # seconds; messages on the loopback broker arrive in milliseconds
+
+
+class MessageListener:
+    """paho subscriber that collects messages and lets tests wait for them"""
+
+    def __init__(self, host, port, topics):
+        import paho.mqtt.client as mqtt
+
+        self.messages = []  # (topic, payload) in arrival order
+        self.condition = threading.Condition()
+        self.subscribed = threading.Event()
+        self.client = mqtt.Client()
+        self.client.on_connect = lambda client, userdata, flags, rc: client.subscribe([(t, 1) for t in topics])
+        self.client.on_subscribe = lambda client, userdata, mid, granted: self.subscribed.set()
+        self.client.on_message = self.on_message
+        self.client.connect(host, port, 60)
+        self.client.loop_start()
+        if not self.subscribed.wait(WAIT_TIMEOUT):
+            raise TimeoutError(f"Subscription to {topics} not acknowledged")
+
+    def on_message(self, client, userdata, msg):
+        payload = msg.payload.decode()
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            pass
+        with self.condition:
+            self.messages.append((msg.topic, payload))
+            self.condition.notify_all()
+
+    def received(self, topic=None):
+        with self.condition:
+            return [payload for t, payload in self.messages if topic is None or t == topic]
+
+    def wait_for(self, topic=None, count=1, timeout=WAIT_TIMEOUT):
+        """Block until `count` messages arrived (on `topic`), return them"""
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.received(topic)) >= count, timeout)
+            messages = self.received(topic)
+        assert len(messages) >= count, f"expected {count} message(s) on {topic or 'any topic'}, got {len(messages)}"
+        return messages
+
+    def close(self):
+        # Disconnect first so the network loop exits without waiting out its select timeout
+        self.client.disconnect()
+        self.client.loop_stop()
+
+
+@pytest.fixture(scope="session")
+def mqtt_broker():
+    """Local MQTT broker on an ephemeral port for the whole test session"""
+    broker = BrokerThread()
+    broker.start()
+    yield broker
+    broker.stop()
+
+
+@pytest.fixture
+def local_broker(mqtt_broker, request, monkeypatch):
+    """Point the test module's BROKER/PORT at the local broker; yields (host, port)"""
+    host, port = "127.0.0.1", mqtt_broker.port
+    if hasattr(request.module, "BROKER"):
+        monkeypatch.setattr(request.module, "BROKER", host)
+    if hasattr(request.module, "PORT"):
+        monkeypatch.setattr(request.module, "PORT", port)
+    # Retained messages from an earlier test must not leak into this one
+    mqtt_broker.broker.retained.clear()
+    return host, port
+
+
+@pytest.fixture
+def mqtt_listener(local_broker):
+    """Factory: mqtt_listener('esp/#', ...) -> MessageListener subscribed to the topics"""
+    listeners = []
+
+    def listen(*topics):
+        listener = MessageListener(*local_broker, topics)
+        listeners.append(listener)
+        return listener
+
+    yield listen
+    for listener in listeners:
+        listener.close()
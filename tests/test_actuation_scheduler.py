@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for non-blocking command actuation
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import esp32_command_receiver as receiver
+from actuation_scheduler import ActuationScheduler
+
+
+def test_actuation_delays_overlap():
+    scheduler = ActuationScheduler()
+    scheduler.start()
+    done = []
+    start = time.monotonic()
+    for i in range(10):
+        scheduler.schedule(0.1, done.append, i)
+    assert scheduler.wait_idle(timeout=2)
+    elapsed = time.monotonic() - start
+    scheduler.stop()
+
+    assert sorted(done) == list(range(10))
+    assert elapsed < 0.5  # ten sequential sleeps would take 1 s
+
+
+def test_command_burst_is_acknowledged_without_blocking(local_broker, mqtt_listener, monkeypatch):
+    host, port = local_broker
+    monkeypatch.setattr(receiver, "BROKER", host)
+    monkeypatch.setattr(receiver, "PORT", port)
+    monkeypatch.setattr(receiver, "ACTUATION_DELAY", 0.2)
+
+    esp32 = receiver.ESP32Simulator()
+    subscribed = threading.Event()
+    esp32.client.on_subscribe = lambda client, userdata, mid, granted: subscribed.set()
+    esp32.scheduler.start()
+    esp32.client.connect(host, port, 60)
+    esp32.client.loop_start()
+    acks = mqtt_listener("esp/ack/+")
+    try:
+        assert subscribed.wait(2)
+        start = time.monotonic()
+        for device in ("fan", "light", "ac", "washing-machine"):
+            receiver.mqtt_publisher.single(f"home/control/{device}", "on", qos=1, hostname=host, port=port)
+        receiver.mqtt_publisher.single("home/control/fan", "on", qos=1, hostname=host, port=port)
+
+        messages = acks.wait_for(count=5)
+        assert time.monotonic() - start < 0.8  # five commands sleeping 0.2 s each would take 1 s
+        assert sorted((ack["device"], ack["changed"]) for ack in messages) == [
+            ("ac", True), ("fan", False), ("fan", True), ("light", True), ("washing-machine", True)
+        ]
+    finally:
+        esp32.client.disconnect()
+        esp32.client.loop_stop()
+        esp32.scheduler.stop()
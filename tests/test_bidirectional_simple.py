@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
 """
 Simple test for bidirectional MQTT communication
+Runs against the local broker stand-in (see conftest.py)
 """
 
 import json
+import os
+import sys
 import time
-import paho.mqtt.publish as publish
-import paho.mqtt.client as mqtt
 
-# MQTT Configuration
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import mqtt_publisher
+
+# MQTT Configuration (pointed at the local broker by the local_broker fixture)
 BROKER = "broker-cn.emqx.io"
 PORT = 1883
 TOPIC_SENSORS = "esp/sensors"
@@ -16,12 +22,10 @@ TOPIC_COMMANDS = "face-detection/commands"
 TOPIC_RESULT = "esp/cam"
 TOPIC_STATUS = "face-detection/status"
 
-def test_communication():
-    print("🧪 Testing Bidirectional MQTT Communication")
-    print("=" * 50)
-    
+def test_communication(mqtt_listener):
+    listener = mqtt_listener(TOPIC_SENSORS, TOPIC_COMMANDS, TOPIC_RESULT, TOPIC_STATUS)
+
     # Test 1: Send sensor data with motion
-    print("📤 1. Sending sensor data with motion...")
     sensor_data = {
         "temp": 26.5,
         "hum": 65.0,
@@ -29,12 +33,10 @@ def test_communication():
         "pir": 1,  # Motion detected
         "ir": 1    # IR triggered
     }
-    publish.single(TOPIC_SENSORS, json.dumps(sensor_data), hostname=BROKER)
-    print(f"✅ Sent sensor data: {sensor_data}")
-    time.sleep(2)
+    mqtt_publisher.single(TOPIC_SENSORS, json.dumps(sensor_data), hostname=BROKER, port=PORT)
+    assert listener.wait_for(TOPIC_SENSORS) == [sensor_data]
     
     # Test 2: Send face detection result
-    print("\n📤 2. Sending face detection result...")
     detection_result = {
         "timestamp": int(time.time()),
         "face_detected": True,
@@ -46,24 +48,20 @@ def test_communication():
         "ir": 1,
         "trigger_time": time.strftime("%Y-%m-%dT%H:%M:%S")
     }
-    publish.single(TOPIC_RESULT, json.dumps(detection_result), hostname=BROKER)
-    print(f"✅ Sent detection result: {detection_result}")
-    time.sleep(2)
+    mqtt_publisher.single(TOPIC_RESULT, json.dumps(detection_result), hostname=BROKER, port=PORT)
+    assert listener.wait_for(TOPIC_RESULT) == [detection_result]
     
     # Test 3: Send server command
-    print("\n📤 3. Sending server command...")
     trigger_command = {
         "action": "trigger_camera",
         "reason": "test_trigger",
         "priority": "high",
         "timestamp": time.time()
     }
-    publish.single(TOPIC_COMMANDS, json.dumps(trigger_command), hostname=BROKER)
-    print(f"✅ Sent command: {trigger_command}")
-    time.sleep(2)
+    mqtt_publisher.single(TOPIC_COMMANDS, json.dumps(trigger_command), hostname=BROKER, port=PORT)
+    assert listener.wait_for(TOPIC_COMMANDS) == [trigger_command]
     
     # Test 4: Send status update
-    print("\n📤 4. Sending status update...")
     status_update = {
         "timestamp": time.time(),
         "status": "ready",
@@ -75,14 +73,11 @@ def test_communication():
         "system": "face_detection",
         "version": "1.0"
     }
-    publish.single(TOPIC_STATUS, json.dumps(status_update), hostname=BROKER)
-    print(f"✅ Sent status: {status_update}")
-    
-    print("\n✅ All MQTT messages sent successfully!")
-    print("\n📊 Check the following for results:")
-    print("• Backend server logs for MQTT message reception")
-    print("• Face detection system logs for command processing")
-    print("• Frontend dashboard for real-time updates")
+    mqtt_publisher.single(TOPIC_STATUS, json.dumps(status_update), hostname=BROKER, port=PORT)
+    assert listener.wait_for(TOPIC_STATUS) == [status_update]
+
+    # Each message was delivered once, in publish order
+    assert [topic for topic, _ in listener.messages] == [TOPIC_SENSORS, TOPIC_RESULT, TOPIC_COMMANDS, TOPIC_STATUS]
 
 if __name__ == "__main__":
-    test_communication()
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -1,66 +1,49 @@
 #!/usr/bin/env python3
 """
 Simple Full Duplex Communication Test
-Tests MQTT command flow without HTTP dependencies
+Tests MQTT command flow without HTTP dependencies, against the local broker
+stand-in (see conftest.py)
 """
 
 import json
+import os
+import sys
 import time
-import paho.mqtt.publish as publish
 
-# MQTT Configuration
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import mqtt_publisher
+
+# MQTT Configuration (pointed at the local broker by the local_broker fixture)
 BROKER = "broker-cn.emqx.io"
+PORT = 1883
 
-def test_device_commands():
-    """Test device control commands via MQTT"""
-    print("🔧 Testing Device Control Commands...")
-    print("=" * 50)
-    
+
+def test_device_commands(mqtt_listener):
+    """Device control commands reach home/control/<device> subscribers in order"""
+    receiver = mqtt_listener("home/control/#")
     devices = ['fan', 'light', 'ac', 'washing-machine']
-    
+
     for device in devices:
-        print(f"\n📤 Testing {device} control...")
-        
-        # Test ON command
-        try:
-            publish.single(f"home/control/{device}", "on", hostname=BROKER)
-            print(f"✅ {device} ON command sent")
-        except Exception as e:
-            print(f"❌ {device} ON command error: {e}")
-        
-        time.sleep(1)
-        
-        # Test OFF command
-        try:
-            publish.single(f"home/control/{device}", "off", hostname=BROKER)
-            print(f"✅ {device} OFF command sent")
-        except Exception as e:
-            print(f"❌ {device} OFF command error: {e}")
-        
-        time.sleep(1)
-
-def test_face_detection_commands():
-    """Test face detection commands via MQTT"""
-    print("\n📷 Testing Face Detection Commands...")
-    print("=" * 50)
-    
-    # Test trigger command
+        mqtt_publisher.single(f"home/control/{device}", "on", hostname=BROKER, port=PORT)
+        mqtt_publisher.single(f"home/control/{device}", "off", hostname=BROKER, port=PORT)
+
+    receiver.wait_for(count=len(devices) * 2)
+    expected = [(f"home/control/{device}", action) for device in devices for action in ("on", "off")]
+    assert receiver.messages == expected
+
+
+def test_face_detection_commands(mqtt_listener):
+    """Face detection commands arrive intact"""
+    face_detection = mqtt_listener("face-detection/commands")
+
     trigger_command = {
         "action": "trigger_camera",
         "reason": "test_trigger",
         "priority": "high",
         "timestamp": time.time()
     }
-    
-    try:
-        publish.single("face-detection/commands", json.dumps(trigger_command), hostname=BROKER)
-        print("✅ Face detection trigger command sent")
-    except Exception as e:
-        print(f"❌ Face detection trigger error: {e}")
-    
-    time.sleep(1)
-    
-    # Test configuration command
     config_command = {
         "action": "configure",
         "timeout": 15,
@@ -68,18 +51,17 @@ def test_face_detection_commands():
         "mode": "manual",
         "timestamp": time.time()
     }
-    
-    try:
-        publish.single("face-detection/commands", json.dumps(config_command), hostname=BROKER)
-        print("✅ Face detection config command sent")
-    except Exception as e:
-        print(f"❌ Face detection config error: {e}")
-
-def test_sensor_data():
-    """Test sensor data publishing"""
-    print("\n📡 Testing Sensor Data Publishing...")
-    print("=" * 50)
-    
+    mqtt_publisher.single("face-detection/commands", json.dumps(trigger_command), hostname=BROKER, port=PORT)
+    mqtt_publisher.single("face-detection/commands", json.dumps(config_command), hostname=BROKER, port=PORT)
+
+    assert face_detection.wait_for(count=2) == [trigger_command, config_command]
+
+
+def test_sensor_data(mqtt_listener):
+    """Sensor data reaches both esp/sensors and esp/# subscribers"""
+    exact = mqtt_listener("esp/sensors")
+    wildcard = mqtt_listener("esp/#")
+
     sensor_data = {
         "temp": 26.5,
         "hum": 65.0,
@@ -88,39 +70,11 @@ def test_sensor_data():
         "ir": 1,
         "timestamp": time.time()
     }
-    
-    try:
-        publish.single("esp/sensors", json.dumps(sensor_data), hostname=BROKER)
-        print(f"✅ Sensor data sent: {sensor_data}")
-    except Exception as e:
-        print(f"❌ Sensor data error: {e}")
-
-def main():
-    print("🔧 Full Duplex MQTT Communication Test")
-    print("=" * 60)
-    print("This test demonstrates the complete MQTT communication flow:")
-    print("1. ESP32 → Backend (sensor data)")
-    print("2. Backend → ESP32 (device control)")
-    print("3. Backend → Face Detection (commands)")
-    print()
-    
-    # Test 1: Sensor data
-    test_sensor_data()
-    time.sleep(2)
-    
-    # Test 2: Device commands
-    test_device_commands()
-    
-    # Test 3: Face detection commands
-    test_face_detection_commands()
-    
-    print("\n✅ Full Duplex Communication Test Complete!")
-    print("\n📊 Check the following for results:")
-    print("• ESP32 command receiver logs for command reception")
-    print("• Face detection system logs for command processing")
-    print("• Backend server logs for MQTT message processing")
-    print("• Frontend dashboard for real-time updates")
+    mqtt_publisher.single("esp/sensors", json.dumps(sensor_data), hostname=BROKER, port=PORT)
+
+    assert exact.wait_for("esp/sensors") == [sensor_data]
+    assert wildcard.wait_for("esp/sensors") == [sensor_data]
 
-if __name__ == "__main__":
-    main()
 
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
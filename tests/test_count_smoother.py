@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for temporal inventory count smoothing
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+from count_smoother import CountSmoother
+
+
+def feed(smoother, frames, start=0.0, interval=1.0):
+    changes = []
+    for i, counts in enumerate(frames):
+        changed = smoother.observe(counts, now=start + i * interval)
+        if changed:
+            changes.append((start + i * interval, changed))
+    return changes
+
+
+def test_flapping_counts_are_written_once():
+    smoother = CountSmoother(window=5, hold=2)
+    frames = [{"apple": 3}, {"apple": 2}, {"apple": 3}, {"apple": 3}, {}, {"apple": 3}, {"apple": 4}, {"apple": 3}]
+    changes = feed(smoother, frames)
+
+    assert changes == [(4.0, {"apple": 3})]
+    assert smoother.stats["raw_changes"] == 7
+    assert smoother.suppressed() == 6
+
+
+def test_real_change_is_reported_after_hold():
+    smoother = CountSmoother(window=3, hold=2)
+    feed(smoother, [{"egg": 6}] * 4)
+    assert smoother.value("egg") == 6
+
+    changes = feed(smoother, [{"egg": 4}] * 5, start=10)
+    assert changes == [(13.0, {"egg": 4})]  # median flips at t=11, held for 2 s
+
+
+def test_brief_change_that_reverts_is_never_written():
+    smoother = CountSmoother(window=3, hold=5)
+    feed(smoother, [{"milk": 1}] * 8)
+    changes = feed(smoother, [{}, {}, {}, {"milk": 1}, {"milk": 1}, {"milk": 1}], start=10)
+    assert changes == [] and smoother.value("milk") == 1
+
+
+def test_mode_statistic():
+    smoother = CountSmoother(window=5, hold=0, statistic="mode")
+    feed(smoother, [{"cup": 1}, {"cup": 5}, {"cup": 1}])
+    assert smoother.value("cup") == 1
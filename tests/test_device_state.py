@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for delta device state publishing
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import mqtt_publisher
+from device_state import DeviceStatePublisher
+
+
+def recording_publisher(devices):
+    sent = []
+    publisher = DeviceStatePublisher(devices, lambda topic, payload, retain: sent.append((topic, json.loads(payload), retain)),
+                                     "test_system", extra_fields={"hardware_ip": "10.0.0.2"})
+    return publisher, sent
+
+
+def test_only_changed_devices_are_published():
+    publisher, sent = recording_publisher({"fan": "off", "light": "off"})
+    assert publisher.set("fan", "on")
+    assert not publisher.set("fan", "on")
+
+    assert [(topic, payload["state"], retain) for topic, payload, retain in sent] == [("home/sensors/fan", "on", True)]
+    assert publisher.stats == {"deltas": 1, "unchanged": 1, "snapshots": 0}
+
+
+def test_snapshot_carries_every_device_and_extra_fields():
+    publisher, sent = recording_publisher({"fan": "off", "light": "on"})
+    publisher.publish_all()
+
+    topics = [topic for topic, _, _ in sent]
+    assert topics == ["home/sensors/fan", "home/sensors/light", "esp/status"]
+    snapshot = sent[-1][1]
+    assert snapshot["devices"] == {"fan": "off", "light": "on"}
+    assert snapshot["snapshot"] is True and snapshot["hardware_ip"] == "10.0.0.2"
+    assert all(retain for _, _, retain in sent)
+
+
+def test_late_subscriber_gets_retained_device_state(local_broker, mqtt_listener):
+    host, port = local_broker
+    publisher = DeviceStatePublisher({"fan": "off"}, lambda topic, payload, retain: mqtt_publisher.single(
+        topic, payload, qos=1, retain=retain, hostname=host, port=port), "test_system")
+    publisher.set("fan", "on")
+    mqtt_publisher.get_publisher(host, port).flush()
+
+    listener = mqtt_listener("home/sensors/fan")
+    assert listener.wait_for("home/sensors/fan")[0]["state"] == "on"
@@ -1,18 +1,34 @@
 #!/usr/bin/env python3
 """
 Test script to verify the face detection system is working
+Sends sensor samples through the local broker stand-in (see conftest.py)
+and checks what the face detection subscriber receives
 """
 
 import json
-import time
-import paho.mqtt.publish as publish
+import os
+import sys
 
-def test_face_detection_trigger():
-    """Send test data to trigger face detection"""
-    print("🧪 Testing Face Detection System")
-    print("=" * 40)
-    
-    # Test data with motion detection
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import mqtt_publisher
+from motion_trigger import MotionTrigger
+
+# MQTT Configuration (pointed at the local broker by the local_broker fixture)
+BROKER = "broker-cn.emqx.io"
+PORT = 1883
+TOPIC_SENSORS = "esp/sensors"
+
+
+def is_motion(data):
+    """Same rule as handle_sensor_data in face_recognition_simple.py"""
+    return data.get("pir", 0) == 1 or data.get("ir", 0) == 1
+
+
+def test_face_detection_trigger(mqtt_listener):
+    """Sensor data with motion reaches face detection and fires the trigger"""
+    face_detection = mqtt_listener(TOPIC_SENSORS)
     test_data = {
         "temp": 25.5,
         "hum": 60.0,
@@ -20,25 +36,17 @@ def test_face_detection_trigger():
         "pir": 1,  # Motion detected
         "ir": 1    # IR sensor triggered
     }
-    
-    print("📡 Sending test data with motion detection...")
-    print(f"Data: {test_data}")
-    
-    try:
-        # Send to MQTT broker
-        publish.single("esp/sensors", json.dumps(test_data), hostname="broker-cn.emqx.io")
-        print("✅ Test data sent successfully!")
-        print("📷 Face detection should trigger now...")
-        print("💡 Check the face detection console for camera activation")
-        
-    except Exception as e:
-        print(f"❌ Error sending test data: {e}")
+    mqtt_publisher.single(TOPIC_SENSORS, json.dumps(test_data), hostname=BROKER, port=PORT)
 
-def test_no_motion():
-    """Send test data without motion"""
-    print("\n🧪 Testing No Motion Scenario")
-    print("=" * 40)
-    
+    received = face_detection.wait_for(TOPIC_SENSORS)
+    assert received == [test_data]
+    assert is_motion(received[0])
+    assert MotionTrigger().on_motion(now=0) == (True, None)
+
+
+def test_no_motion(mqtt_listener):
+    """Sensor data without motion is delivered but does not trigger"""
+    face_detection = mqtt_listener(TOPIC_SENSORS)
     test_data = {
         "temp": 24.0,
         "hum": 58.0,
@@ -46,37 +54,12 @@ def test_no_motion():
         "pir": 0,  # No motion
         "ir": 0    # No IR trigger
     }
-    
-    print("📡 Sending test data without motion...")
-    print(f"Data: {test_data}")
-    
-    try:
-        publish.single("esp/sensors", json.dumps(test_data), hostname="broker-cn.emqx.io")
-        print("✅ Test data sent successfully!")
-        print("📷 Face detection should NOT trigger (no motion)")
-        
-    except Exception as e:
-        print(f"❌ Error sending test data: {e}")
-
-if __name__ == "__main__":
-    print("🔧 Face Detection System Test")
-    print("Make sure the following are running:")
-    print("1. Backend server: cd backend && node server.js")
-    print("2. Face detection: python face_recognition_simple.py")
-    print("3. Frontend: cd frontend && npm start")
-    print()
-    
-    # Test with motion
-    test_face_detection_trigger()
-    
-    # Wait a bit
-    time.sleep(3)
-    
-    # Test without motion
-    test_no_motion()
-    
-    print("\n✅ Test completed!")
-    print("Check your face detection console and dashboard for results.")
+    mqtt_publisher.single(TOPIC_SENSORS, json.dumps(test_data), hostname=BROKER, port=PORT)
 
+    received = face_detection.wait_for(TOPIC_SENSORS)
+    assert received == [test_data]
+    assert not is_motion(received[0])
 
 
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared-memory frame bus
+"""
+
+import os
+import subprocess
+import sys
+import uuid
+
+import numpy as np
+import pytest
+
+CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core')
+sys.path.insert(0, CORE_DIR)
+import frame_bus
+
+
+@pytest.fixture
+def ring():
+    ring = frame_bus.FrameRing.create(f"test_frames_{uuid.uuid4().hex[:8]}", width=8, height=4, slots=3)
+    yield ring
+    ring.close()
+
+
+def frame(value):
+    return np.full((4, 8, 3), value, dtype=np.uint8)
+
+
+def test_reader_sees_latest_frame_as_read_only_view(ring):
+    assert ring.read() is None
+    ring.write(frame(1), timestamp=10.0)
+    ring.write(frame(2), timestamp=11.0)
+
+    reader = frame_bus.FrameRing.attach(ring.shm.name)
+    number, timestamp, view = reader.read()
+    assert (number, timestamp, int(view[0, 0, 0])) == (1, 11.0, 2)
+    assert not view.flags.writeable
+    del view
+    reader.close()
+
+
+def test_view_invalid_once_writer_laps_the_ring(ring):
+    ring.write(frame(1))
+    number, _, view = ring.read()
+    for value in range(2, 4):
+        ring.write(frame(value))
+    assert ring.valid(number)
+
+    ring.write(frame(4))  # fourth write into three slots overwrites frame `number`
+    assert not ring.valid(number)
+    assert ring.read(number) is None
+    del view
+
+
+def test_camera_reads_each_new_frame_once_as_a_copy(ring):
+    camera = frame_bus.FrameBusCamera(ring.shm.name, timeout=0.05)
+    assert camera.read() == (False, None)
+
+    ring.write(frame(7))
+    ok, image = camera.read()
+    assert ok and image.flags.writeable and int(image[0, 0, 0]) == 7
+    assert camera.read() == (False, None)
+    camera.release()
+
+
+def test_frames_cross_process_boundary(ring):
+    ring.write(frame(42))
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); import frame_bus\n"
+            "ring = frame_bus.FrameRing.attach(sys.argv[2])\n"
+            "number, _, view = ring.read(copy=True)\n"
+            "print(number, int(view.sum()))\n"
+            "ring.close()\n")
+    result = subprocess.run([sys.executable, "-c", code, CORE_DIR, ring.shm.name],
+                            capture_output=True, text=True, timeout=30)
+    assert result.stdout.split() == ["0", str(42 * 4 * 8 * 3)], result.stderr
+    assert "leaked" not in result.stderr
+    assert ring.read()[0] == 0  # consumer exit left the block alone
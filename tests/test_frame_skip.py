@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the adaptive frame-skip controller
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+from frame_skip import AdaptiveFrameSkip
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(controller, clock, frames, inference, fps=30):
+    """Feed `frames` camera frames; each detection takes `inference` seconds"""
+    detections = 0
+    for _ in range(frames):
+        clock.now += 1 / fps
+        if controller.tick():
+            detections += 1
+            controller.record(inference)
+    return detections
+
+
+def test_fast_inference_hits_target_rate():
+    clock = FakeClock()
+    controller = AdaptiveFrameSkip(target_rate=3.0, cpu_budget=0.5, load=None, clock=clock)
+    run(controller, clock, 300, inference=0.01)
+
+    assert controller.stride == 10
+    assert abs(controller.achieved_rate() - 3.0) < 0.1
+
+
+def test_slow_inference_backs_off_to_cpu_budget_and_recovers():
+    clock = FakeClock()
+    controller = AdaptiveFrameSkip(target_rate=6.0, cpu_budget=0.5, load=None, clock=clock)
+    run(controller, clock, 300, inference=0.4)
+    assert controller.stride == 24  # 0.4 s / 0.5 budget = one detection per 0.8 s
+    assert controller.metrics()["cpu_share"] <= 0.5
+
+    run(controller, clock, 600, inference=0.01)
+    assert controller.stride == 5
+
+
+def test_system_load_stretches_the_stride():
+    clock = FakeClock()
+    load = [0.5]
+    controller = AdaptiveFrameSkip(target_rate=3.0, load=lambda: load[0], clock=clock)
+    run(controller, clock, 60, inference=0.01)
+    assert controller.stride == 10
+
+    load[0] = 2.0
+    run(controller, clock, 60, inference=0.01)
+    assert controller.stride == 20
+    assert controller.metrics()["skipped"] == controller.metrics()["frames"] - controller.metrics()["detections"]
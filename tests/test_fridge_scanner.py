@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the door-triggered fridge scanner
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import paho.mqtt.client as mqtt
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import fridge_scanner
+import mqtt_publisher
+from fridge_scanner import DoorScanner
+
+BROKER = "broker-cn.emqx.io"
+PORT = 1883
+
+
+@pytest.mark.parametrize("payload, state", [
+    (b"open", "open"), (b"CLOSED", "closed"), (b"1", "open"), (b'{"door": "closed"}', "closed"),
+    (b'{"ir": 1, "pir": 0}', "open"), (b'{"temp": 21}', None), (b"\xff", None),
+])
+def test_parse_door_state(payload, state):
+    assert fridge_scanner.parse_door_state(payload) == state
+
+
+def test_best_frames_prefers_sharp_frames_in_capture_order():
+    rng = np.random.default_rng(0)
+    blurred = [np.full((20, 20, 3), 128, np.uint8) for _ in range(3)]
+    sharp = [rng.integers(0, 256, (20, 20, 3), dtype=np.uint8) for _ in range(2)]
+    frames = [blurred[0], sharp[0], blurred[1], sharp[1], blurred[2]]
+    chosen = fridge_scanner.best_frames(frames, 2)
+    assert chosen[0] is sharp[0] and chosen[1] is sharp[1]
+
+
+class FakeFridge:
+    """capture/detect stand-ins: each burst yields frames tagged with per-frame counts"""
+
+    def __init__(self, bursts):
+        self.bursts = list(bursts)
+        self.changes = []
+
+    def capture(self, count):
+        return [np.full((4, 4, 3), i, np.uint8) for i in range(len(self.bursts[0]))]
+
+    def detect(self, frame):
+        return self.bursts[0][int(frame[0, 0, 0])]
+
+    def on_change(self, item, count, delta):
+        self.changes.append((item, count, delta))
+
+
+def test_scan_reports_median_counts_that_changed(monkeypatch):
+    monkeypatch.setattr(fridge_scanner, "best_frames", lambda frames, count: frames)
+    fridge = FakeFridge([[{"egg": 6, "milk": 1}, {"egg": 4, "milk": 1}, {"egg": 6}]])
+    scanner = DoorScanner(fridge.capture, fridge.detect, fridge.on_change, settle=0)
+    assert scanner.scan() == {"egg": 6, "milk": 1}
+    assert sorted(fridge.changes) == [("egg", 6, 6), ("milk", 1, 1)]
+
+    fridge.bursts = [[{"egg": 5}, {"egg": 5}, {"egg": 6}]]
+    fridge.changes.clear()
+    assert scanner.scan() == {"egg": 5, "milk": 0}
+    assert sorted(fridge.changes) == [("egg", 5, -1), ("milk", 0, -1)]
+    assert scanner.stats["scans"] == 2
+
+
+def test_only_door_close_queues_a_scan(monkeypatch, local_broker):
+    monkeypatch.setattr(fridge_scanner, "best_frames", lambda frames, count: frames)
+    fridge = FakeFridge([[{"apple": 2}]])
+    scanned = threading.Event()
+    scanner = DoorScanner(fridge.capture, fridge.detect, fridge.on_change, settle=0)
+    scan = scanner.scan
+    scanner.scan = lambda: (scan(), scanned.set())
+    scanner.start()
+
+    subscribed = threading.Event()
+    client = mqtt.Client()
+    client.on_connect = lambda c, userdata, flags, rc: c.subscribe(fridge_scanner.TOPIC_DOOR, 1)
+    client.on_subscribe = lambda c, userdata, mid, granted: subscribed.set()
+    client.on_message = scanner.on_message
+    client.connect(BROKER, PORT, 60)
+    client.loop_start()
+    try:
+        assert subscribed.wait(2)
+        for state in ("closed", "open", "open", "closed"):
+            mqtt_publisher.single(fridge_scanner.TOPIC_DOOR, state, qos=1, hostname=BROKER, port=PORT)
+        assert scanned.wait(2)
+        scanner.stop(timeout=2)
+    finally:
+        client.disconnect()
+        client.loop_stop()
+
+    assert scanner.stats["door_events"] == 4 and scanner.stats["closes"] == 1 and scanner.stats["scans"] == 1
+    assert fridge.changes == [("apple", 2, 2)]
@@ -1,14 +1,22 @@
 #!/usr/bin/env python3
 """
 Test script for full duplex MQTT communication
+Runs against the local broker stand-in (see conftest.py): one listener plays
+the backend server (esp/#, face-detection/status), another plays the face
+detection system (esp/sensors, face-detection/commands)
 """
 
 import json
+import os
+import sys
 import time
-import paho.mqtt.publish as publish
-import paho.mqtt.client as mqtt
 
-# MQTT Configuration
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import mqtt_publisher
+
+# MQTT Configuration (pointed at the local broker by the local_broker fixture)
 BROKER = "broker-cn.emqx.io"
 PORT = 1883
 TOPIC_SENSORS = "esp/sensors"
@@ -16,25 +24,29 @@ TOPIC_COMMANDS = "face-detection/commands"
 TOPIC_RESULT = "esp/cam"
 TOPIC_STATUS = "face-detection/status"
 
-def test_server_to_face_detection():
-    """Test server sending commands to face detection"""
-    print("🧪 Testing Server → Face Detection Communication")
-    print("=" * 50)
-    
-    # Test 1: Trigger camera manually
-    print("📤 Sending manual trigger command...")
+
+def send(topic, data):
+    mqtt_publisher.single(topic, json.dumps(data), hostname=BROKER, port=PORT)
+
+
+@pytest.fixture
+def server(mqtt_listener):
+    return mqtt_listener("esp/#", TOPIC_STATUS)
+
+
+@pytest.fixture
+def face_detection(mqtt_listener):
+    return mqtt_listener(TOPIC_SENSORS, TOPIC_COMMANDS)
+
+
+def test_server_to_face_detection(server, face_detection):
+    """Server commands reach face detection intact and in order"""
     trigger_command = {
         "action": "trigger_camera",
         "reason": "test_trigger",
         "priority": "high",
         "timestamp": time.time()
     }
-    publish.single(TOPIC_COMMANDS, json.dumps(trigger_command), hostname=BROKER)
-    print(f"✅ Sent: {trigger_command}")
-    time.sleep(2)
-    
-    # Test 2: Configure face detection
-    print("\n📤 Sending configuration command...")
     config_command = {
         "action": "configure",
         "timeout": 15,
@@ -42,26 +54,21 @@ def test_server_to_face_detection():
         "mode": "manual",
         "timestamp": time.time()
     }
-    publish.single(TOPIC_COMMANDS, json.dumps(config_command), hostname=BROKER)
-    print(f"✅ Sent: {config_command}")
-    time.sleep(2)
-    
-    # Test 3: Request status
-    print("\n📤 Sending status request...")
     status_command = {
         "action": "status_request",
         "timestamp": time.time()
     }
-    publish.single(TOPIC_COMMANDS, json.dumps(status_command), hostname=BROKER)
-    print(f"✅ Sent: {status_command}")
-
-def test_face_detection_to_server():
-    """Test face detection sending data to server"""
-    print("\n🧪 Testing Face Detection → Server Communication")
-    print("=" * 50)
-    
-    # Test 1: Send sensor data with motion
-    print("📤 Sending sensor data with motion...")
+    for command in (trigger_command, config_command, status_command):
+        send(TOPIC_COMMANDS, command)
+
+    received = face_detection.wait_for(TOPIC_COMMANDS, count=3)
+    assert received == [trigger_command, config_command, status_command]
+    # Commands are not on esp/#, the server listener must not see them
+    assert server.received(TOPIC_COMMANDS) == []
+
+
+def test_face_detection_to_server(server, face_detection):
+    """Sensor data, results and status reach the server"""
     sensor_data = {
         "temp": 26.5,
         "hum": 65.0,
@@ -69,12 +76,6 @@ def test_face_detection_to_server():
         "pir": 1,  # Motion detected
         "ir": 1    # IR triggered
     }
-    publish.single(TOPIC_SENSORS, json.dumps(sensor_data), hostname=BROKER)
-    print(f"✅ Sent: {sensor_data}")
-    time.sleep(3)
-    
-    # Test 2: Send face detection result
-    print("\n📤 Sending face detection result...")
     detection_result = {
         "timestamp": int(time.time()),
         "face_detected": True,
@@ -86,12 +87,6 @@ def test_face_detection_to_server():
         "ir": 1,
         "trigger_time": time.strftime("%Y-%m-%dT%H:%M:%S")
     }
-    publish.single(TOPIC_RESULT, json.dumps(detection_result), hostname=BROKER)
-    print(f"✅ Sent: {detection_result}")
-    time.sleep(2)
-    
-    # Test 3: Send status update
-    print("\n📤 Sending status update...")
     status_update = {
         "timestamp": time.time(),
         "status": "ready",
@@ -103,37 +98,32 @@ def test_face_detection_to_server():
         "system": "face_detection",
         "version": "1.0"
     }
-    publish.single(TOPIC_STATUS, json.dumps(status_update), hostname=BROKER)
-    print(f"✅ Sent: {status_update}")
-
-def test_bidirectional_flow():
-    """Test complete bidirectional communication flow"""
-    print("\n🧪 Testing Complete Bidirectional Flow")
-    print("=" * 50)
-    
-    print("1️⃣ Server → Face Detection: Configure system")
+    send(TOPIC_SENSORS, sensor_data)
+    send(TOPIC_RESULT, detection_result)
+    send(TOPIC_STATUS, status_update)
+
+    assert server.wait_for(TOPIC_SENSORS) == [sensor_data]
+    assert server.wait_for(TOPIC_RESULT) == [detection_result]
+    assert server.wait_for(TOPIC_STATUS) == [status_update]
+    # Face detection sees the sensors but not its own results
+    assert face_detection.wait_for(TOPIC_SENSORS) == [sensor_data]
+    assert face_detection.received(TOPIC_RESULT) == []
+
+
+def test_bidirectional_flow(server, face_detection):
+    """Complete configure → status → motion → result → trigger round trip"""
     config = {
         "action": "configure",
         "timeout": 20,
         "sensitivity": "medium",
         "mode": "auto"
     }
-    publish.single(TOPIC_COMMANDS, json.dumps(config), hostname=BROKER)
-    print(f"   📤 Sent config: {config}")
-    time.sleep(1)
-    
-    print("2️⃣ Face Detection → Server: Status update")
     status = {
         "timestamp": time.time(),
         "status": "ready",
         "config": config,
         "system": "face_detection"
     }
-    publish.single(TOPIC_STATUS, json.dumps(status), hostname=BROKER)
-    print(f"   📤 Sent status: {status}")
-    time.sleep(1)
-    
-    print("3️⃣ Sensors → Face Detection: Motion detected")
     motion_data = {
         "temp": 25.0,
         "hum": 60.0,
@@ -141,11 +131,6 @@ def test_bidirectional_flow():
         "pir": 1,
         "ir": 1
     }
-    publish.single(TOPIC_SENSORS, json.dumps(motion_data), hostname=BROKER)
-    print(f"   📤 Sent motion: {motion_data}")
-    time.sleep(2)
-    
-    print("4️⃣ Face Detection → Server: Detection result")
     result = {
         "timestamp": int(time.time()),
         "face_detected": False,
@@ -156,51 +141,35 @@ def test_bidirectional_flow():
         "pir": 1,
         "ir": 1
     }
-    publish.single(TOPIC_RESULT, json.dumps(result), hostname=BROKER)
-    print(f"   📤 Sent result: {result}")
-    time.sleep(1)
-    
-    print("5️⃣ Server → Face Detection: Manual trigger")
     trigger = {
         "action": "trigger_camera",
         "reason": "manual_verification",
         "priority": "normal"
     }
-    publish.single(TOPIC_COMMANDS, json.dumps(trigger), hostname=BROKER)
-    print(f"   📤 Sent trigger: {trigger}")
-
-def main():
-    print("🔧 Full Duplex MQTT Communication Test")
-    print("=" * 60)
-    print("This test demonstrates bidirectional communication between:")
-    print("• Server ↔ Face Detection System")
-    print("• Sensors → Face Detection System")
-    print("• Face Detection → Dashboard")
-    print()
-    
-    print("Make sure the following are running:")
-    print("1. Backend server: cd backend && node server.js")
-    print("2. Face detection: python face_recognition_simple.py")
-    print("3. Frontend: cd frontend && npm start")
-    print()
-    
-    input("Press Enter to start tests...")
-    
-    # Run tests
-    test_server_to_face_detection()
-    time.sleep(3)
-    
-    test_face_detection_to_server()
-    time.sleep(3)
-    
-    test_bidirectional_flow()
-    
-    print("\n✅ All tests completed!")
-    print("\n📊 Check the following for results:")
-    print("• Face detection console for command processing")
-    print("• Backend server logs for MQTT messages")
-    print("• Frontend dashboard for real-time updates")
-    print("• 'captured_faces' folder for saved images")
+
+    # 1️⃣ Server → Face Detection: Configure system
+    send(TOPIC_COMMANDS, config)
+    assert face_detection.wait_for(TOPIC_COMMANDS) == [config]
+
+    # 2️⃣ Face Detection → Server: Status update
+    send(TOPIC_STATUS, status)
+    assert server.wait_for(TOPIC_STATUS) == [status]
+
+    # 3️⃣ Sensors → Face Detection: Motion detected
+    send(TOPIC_SENSORS, motion_data)
+    assert face_detection.wait_for(TOPIC_SENSORS) == [motion_data]
+
+    # 4️⃣ Face Detection → Server: Detection result
+    send(TOPIC_RESULT, result)
+    assert server.wait_for(TOPIC_RESULT) == [result]
+
+    # 5️⃣ Server → Face Detection: Manual trigger
+    send(TOPIC_COMMANDS, trigger)
+    assert face_detection.wait_for(TOPIC_COMMANDS, count=2) == [config, trigger]
+
+    # The server saw every esp/ message exactly once
+    assert [t for t, _ in server.messages] == [TOPIC_STATUS, TOPIC_SENSORS, TOPIC_RESULT]
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests that the camera/detection scripts are cheap and side-effect free to
+import: no cv2/torch/face_recognition, no network connection and no
+directories created until main() runs.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python')
+
+PROBE = """
+import socket, sys
+def refuse(*args, **kwargs):
+    raise AssertionError("network connection at import time")
+socket.socket.connect = socket.create_connection = refuse
+sys.path[:0] = {paths!r}
+import {module}
+heavy = [m for m in ("cv2", "torch", "ultralytics", "face_recognition", "dlib") if m in sys.modules]
+assert not heavy, heavy
+"""
+
+
+@pytest.mark.parametrize("folder, module", [
+    ("core", "face_recognition_simple"),
+    ("network", "real_esp8266_integration"),
+    ("features", "face_recognition_entry"),
+    ("features", "fridge_detection"),
+    ("features", "fridge_detection_improved"),
+    ("features", "yolo_fridge_detection"),
+])
+def test_import_has_no_side_effects(tmp_path, folder, module):
+    paths = [os.path.join(PYTHON_DIR, folder), os.path.join(PYTHON_DIR, 'core')]
+    result = subprocess.run([sys.executable, "-c", PROBE.format(paths=paths, module=module)],
+                            cwd=tmp_path, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for trace stamping and the per-stage latency collector
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'benchmarks'))
+import latency_trace
+from latency_collector import LatencyCollector
+
+
+def test_trace_is_carried_through_stages():
+    payload = {"pir": 1, "ir": 1, "trace": latency_trace.start()}
+    trace = latency_trace.from_payload(payload)
+    for stage in ("started", "captured", "detected", "result_published"):
+        latency_trace.mark(trace, stage)
+
+    names = [stage[0] for stage in trace["stages"]]
+    assert names == ["published", "received", "started", "captured", "detected", "result_published"]
+    times = [stage[1] for stage in trace["stages"]]
+    assert times == sorted(times)
+
+
+def test_untraced_payload_starts_a_trace_and_none_is_ignored():
+    trace = latency_trace.from_payload({"pir": 1})
+    assert trace["stages"][0][0] == "received"
+    assert latency_trace.mark(None, "started") is None
+
+
+def test_deltas_across_hosts_are_skipped():
+    trace = {"id": "t", "host": "hardware-pc",
+             "stages": [["published", 100.0], ["received", 5.0, "dev-pc"], ["started", 5.5, "dev-pc"]]}
+    assert latency_trace.stage_deltas(trace) == [("received", "started", 0.5)]
+
+
+def test_collector_groups_by_stage_and_ignores_duplicates():
+    collector = LatencyCollector()
+    result = {"trace": {"id": "abc", "host": latency_trace.HOST,
+                        "stages": [["published", 1.0], ["received", 1.2], ["result_published", 3.2]]}}
+    assert collector.add(dict(result, trace=dict(result["trace"], stages=list(result["trace"]["stages"]))))
+    assert collector.add(dict(result, trace=dict(result["trace"], stages=list(result["trace"]["stages"]))))
+    assert not collector.add({"temp": 25})
+
+    assert collector.traces == 1
+    assert abs(collector.samples["received → result_published"][0] - 2.0) < 1e-9
+    assert "published → collected (total)" in collector.samples
+    assert "received → result_published" in collector.report()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the latest-value-per-topic cache
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+from latest_value_cache import LatestValueCache
+
+
+class RecordingConnection:
+    """Stands in for a mysql.connector connection, returning canned rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params):
+        self.queries.append((query, params))
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def test_load_uses_one_grouped_query_with_mysql_placeholders():
+    topics = ['esp/sensors', 'esp/status', 'home/sensors/fan']
+    rows = [
+        (1, 'esp/sensors', json.dumps({"temp": 24.0}), "2025-11-28 03:30:00"),
+        (2, 'esp/status', b'{"status": "online"}', "2025-11-28 03:30:00"),
+        # Two rows in the newest second: the higher id wins
+        (3, 'esp/sensors', json.dumps({"temp": 25.0}), "2025-11-28 03:30:00"),
+    ]
+    connection = RecordingConnection(rows)
+    cache = LatestValueCache(topics)
+    cache.load(connection)
+
+    assert len(connection.queries) == 1
+    query, params = connection.queries[0]
+    assert "?" not in query
+    assert query.count("%s") == len(topics)
+    assert "GROUP BY topic" in query
+    assert params == tuple(topics)
+
+    assert cache.get('esp/sensors') == {"temp": 25.0}
+    assert cache.get('esp/status') == {"status": "online"}
+    assert cache.get('home/sensors/fan') is None
+
+
+def test_live_messages_update_without_database_and_win_over_late_load():
+    cache = LatestValueCache(['esp/sensors'])
+    cache.update('esp/sensors', {"temp": 30.0}, received_at=100)
+    cache.load(RecordingConnection([(1, 'esp/sensors', '{"temp": 20.0}', "2025-11-28 03:30:00")]))
+
+    assert cache.get('esp/sensors') == {"temp": 30.0}
+    cache.update('esp/sensors', {"temp": 31.0}, received_at=102)
+    assert cache.snapshot() == {'esp/sensors': {"temp": 31.0}}
+    assert cache.db_loads == 1
+    assert cache.live_updates == 2
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for detector warm-up and cold/warm latency reporting
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import model_warmup
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ColdStartModel:
+    """First call costs 900 ms of setup, every later call 20 ms"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.inputs = []
+
+    def __call__(self, frames):
+        self.inputs.append(frames)
+        self.clock.now += 0.02 if len(self.inputs) > 1 else 0.9
+
+
+def test_warm_up_separates_cold_and_warm_latency():
+    clock = FakeClock()
+    model = ColdStartModel(clock)
+    result = model_warmup.warm_up(model, 640, 480, runs=3, clock=clock)
+
+    assert len(model.inputs) == 4
+    assert round(result["cold_ms"]) == 900 and round(result["warm_ms"]) == 20
+    assert "45.0x" in model_warmup.describe(result)
+
+
+def test_synthetic_frames_match_resolution_and_batch():
+    clock = FakeClock()
+    model = ColdStartModel(clock)
+    model_warmup.warm_up(model, 320, 240, batch_size=1, runs=0, clock=clock)
+    assert model.inputs[0].shape == (240, 320, 3)
+
+    model_warmup.warm_up(model, 320, 240, batch_size=4, runs=1, clock=clock)
+    assert len(model.inputs[-1]) == 4 and model.inputs[-1][0].dtype.name == "uint8"
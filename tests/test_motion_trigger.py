@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the PIR/IR trigger debounce and cooldown state machine
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+from motion_trigger import MotionTrigger
+
+
+def test_continuous_motion_is_debounced():
+    trigger = MotionTrigger(debounce=4, cooldown=0, recognized_window=0)
+    assert trigger.on_motion(now=0) == (True, None)
+    trigger.on_result(now=1)
+    assert trigger.on_motion(now=2) == (False, "debounce")
+    assert trigger.on_motion(now=4) == (False, "debounce")
+    assert trigger.on_motion(now=10) == (True, None)
+
+
+def test_busy_and_cooldown():
+    trigger = MotionTrigger(debounce=0, cooldown=15, recognized_window=0)
+    assert trigger.on_motion(now=0)[0]
+    assert trigger.on_motion(now=5) == (False, "busy")
+    trigger.on_result("Unknown", now=12)
+    assert trigger.on_motion(now=20) == (False, "cooldown")
+    assert trigger.on_motion(now=28) == (True, None)
+
+
+def test_repeat_result_for_same_person_is_dropped_but_camera_still_runs():
+    trigger = MotionTrigger(debounce=0, cooldown=5, recognized_window=60)
+    assert trigger.on_motion(now=0)[0]
+    assert trigger.on_result("Praveen", now=10)
+
+    # Motion right after a recognition still starts a session
+    assert trigger.on_motion(now=30) == (True, None)
+    assert not trigger.on_result("Praveen", now=35)
+
+    # Someone else walking in is reported
+    assert trigger.on_motion(now=45) == (True, None)
+    assert trigger.on_result("Intruder", now=50)
+
+    stats = trigger.get_stats(now=50)
+    assert stats["received"] == 3
+    assert stats["executed"] == 3
+    assert stats["repeat_results_suppressed"] == 1
+    assert stats["last_person"] == "Intruder"
+
+
+def test_cancelled_trigger_is_counted_as_busy():
+    # The dispatcher merged the trigger into a capture already running
+    trigger = MotionTrigger(debounce=0, cooldown=0)
+    assert trigger.on_motion(now=0) == (True, None)
+    trigger.on_cancel()
+
+    stats = trigger.get_stats(now=0)
+    assert stats["state"] == "idle"
+    assert stats["executed"] == 0
+    assert stats["suppressed"] == 1
+    assert stats["suppressed_by_reason"]["busy"] == 1
+    assert trigger.on_motion(now=1) == (True, None)
+
+
+def test_simulator_rate_triggers_are_mostly_suppressed():
+    # 2 s samples with ~10% motion, as published by the ESP32 simulators
+    rng = random.Random(7)
+    trigger = MotionTrigger(debounce=4, cooldown=15, recognized_window=60)
+    for i in range(1800):
+        now = i * 2.0
+        if rng.random() < 0.1:
+            fire, _ = trigger.on_motion(now=now)
+            if fire:
+                trigger.on_result("Unknown", now=now + 10)
+
+    stats = trigger.get_stats()
+    assert stats["received"] == stats["executed"] + stats["suppressed"]
+    assert stats["executed"] < stats["received"] * 0.6
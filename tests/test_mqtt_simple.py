@@ -1,39 +1,43 @@
-import paho.mqtt.publish as publish
+#!/usr/bin/env python3
+"""
+Simple MQTT round trip against the local broker stand-in (see conftest.py)
+"""
+
 import json
-import time
+import os
 import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import mqtt_publisher
+
+# MQTT Configuration (pointed at the local broker by the local_broker fixture)
+BROKER = "broker.hivemq.com"
+PORT = 1883
+TOPIC = "esp/sensors"
+
+
+def test_sensor_data_round_trip(mqtt_listener):
+    """20 sensor samples arrive complete and in order"""
+    listener = mqtt_listener(TOPIC)
+    sent = []
+    for i in range(20):
+        # Generate realistic sensor data with some variation
+        data = {
+            "temp": round(25 + random.uniform(-2, 3), 1),  # Temperature between 23-28°C
+            "hum": round(60 + random.uniform(-5, 10), 1),  # Humidity between 55-70%
+            "ldr": 300 + random.randint(-50, 50),          # Light sensor value
+            "pir": random.choice([0, 1]),                  # Motion detection
+            "ir": random.choice([0, 1]),                   # IR sensor
+            "seq": i
+        }
+        mqtt_publisher.single(TOPIC, json.dumps(data), hostname=BROKER, port=PORT)
+        sent.append(data)
+
+    assert listener.wait_for(TOPIC, count=20) == sent
+
 
-# Test with a more reliable MQTT broker
-broker = "broker.hivemq.com"  # Free public broker
-topic = "esp/sensors"
-
-print("Testing MQTT connection...")
-
-# Send test data every 3 seconds for 1 minute
-for i in range(20):
-    # Generate realistic sensor data with some variation
-    temp = 25 + random.uniform(-2, 3)  # Temperature between 23-28°C
-    hum = 60 + random.uniform(-5, 10)  # Humidity between 55-70%
-    ldr = 300 + random.randint(-50, 50)  # Light sensor value
-    pir = random.choice([0, 1])  # Motion detection
-    ir = random.choice([0, 1])   # IR sensor
-    
-    data = {
-        "temp": round(temp, 1),
-        "hum": round(hum, 1), 
-        "ldr": ldr,
-        "pir": pir,
-        "ir": ir
-    }
-    
-    print(f"[{i+1}/20] Sending sensor data: {data}")
-    
-    try:
-        publish.single(topic, json.dumps(data), hostname=broker)
-        print(f"✅ Successfully sent to {broker}")
-    except Exception as e:
-        print(f"❌ Error sending to {broker}: {e}")
-    
-    time.sleep(3)
-
-print("Test data sending completed!")
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
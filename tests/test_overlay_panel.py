@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached detector overlay panel
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+from overlay_panel import OverlayPanel
+
+LINES = [("Fridge", (10, 30), 0.7, (0, 255, 0), 2), ("Apple: 3", (10, 60), 0.5, (255, 255, 255), 1)]
+
+
+def frame(value=200):
+    return np.full((240, 320, 3), value, dtype=np.uint8)
+
+
+def test_matches_full_frame_blend_inside_the_band():
+    expected = frame()
+    overlay = expected.copy()
+    cv2.rectangle(overlay, (0, 0), (320, 100), (0, 0, 0), -1)
+    cv2.addWeighted(overlay, 0.3, expected, 0.7, 0, expected)
+    for text, origin, scale, color, thickness in LINES:
+        cv2.putText(expected, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+
+    panel = OverlayPanel(0, 100, alpha=0.3)
+    panel.render(320, LINES)
+    actual = panel.apply(frame())
+
+    assert np.abs(actual.astype(int) - expected.astype(int)).max() <= 1
+    assert (actual[100:] == 200).all()
+
+
+def test_renders_only_when_lines_change():
+    panel = OverlayPanel(0, 100)
+    assert panel.render(320, LINES)
+    assert not panel.render(320, list(LINES))
+    assert panel.render(320, LINES[:1])
+    assert panel.stats["renders"] == 2
+
+
+def test_band_from_the_bottom_without_blend():
+    panel = OverlayPanel(-40, 40, alpha=0)
+    panel.render(320, [("Press q", (10, 20), 0.5, (255, 255, 0), 1)])
+    out = panel.apply(frame(0))
+
+    assert out[:200].max() == 0
+    assert out[200:].any()
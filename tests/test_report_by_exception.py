@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for report-by-exception publishing
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+from report_by_exception import ExceptionReporter
+
+
+def sample(temp=25.0, hum=60.0, ldr=300, pir=0, ir=0):
+    return {"temp": temp, "hum": hum, "ldr": ldr, "pir": pir, "ir": ir}
+
+
+def offer(reporter, sample, now):
+    """should_publish, then record the publish as successful"""
+    publish, reason = reporter.should_publish(sample, now)
+    if publish:
+        reporter.published(sample, reason, now)
+    return publish, reason
+
+
+def test_changes_within_deadbands_are_suppressed():
+    reporter = ExceptionReporter(max_silence=30)
+    assert offer(reporter, sample(), 0) == (True, "first")
+    assert offer(reporter, sample(temp=25.2, hum=60.5, ldr=310), 2) == (False, None)
+    assert offer(reporter, sample(ldr=316), 4) == (True, "deadband:ldr")
+    assert reporter.stats["suppressed"] == 1
+
+
+def test_slow_drift_is_measured_from_last_published_value():
+    reporter = ExceptionReporter(max_silence=30)
+    offer(reporter, sample(temp=25.0), 0)
+    assert not offer(reporter, sample(temp=25.2), 2)[0]
+    assert offer(reporter, sample(temp=25.4), 4) == (True, "deadband:temp")
+
+
+def test_motion_edges_and_heartbeat_publish_immediately():
+    reporter = ExceptionReporter(max_silence=10)
+    offer(reporter, sample(), 0)
+    assert offer(reporter, sample(pir=1), 2) == (True, "edge:pir")
+    assert not offer(reporter, sample(pir=1), 4)[0]
+    assert offer(reporter, sample(pir=1, ir=1), 6) == (True, "edge:ir")
+    assert offer(reporter, sample(pir=1, ir=1), 16) == (True, "heartbeat")
+    assert reporter.stats["reasons"] == {"first": 1, "edge:pir": 1, "edge:ir": 1, "heartbeat": 1}
+
+
+def test_failed_publish_is_not_recorded():
+    reporter = ExceptionReporter(max_silence=30)
+    offer(reporter, sample(temp=25.0), 0)
+    assert reporter.should_publish(sample(temp=26.0), now=2) == (True, "deadband:temp")
+    # publish failed, published() not called: the next sample is compared to 25.0 again
+    assert offer(reporter, sample(temp=25.9), 4) == (True, "deadband:temp")
+    assert reporter.stats["published"] == 2
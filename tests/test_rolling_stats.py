@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental rolling sensor statistics
+"""
+
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import sensor_aggregates
+from rolling_stats import RollingStats
+
+
+def test_incremental_stats_match_a_full_recompute():
+    rng = random.Random(3)
+    rolling = RollingStats(window_hours=24)
+    temps = []
+    start = 1_700_000_000
+    for i in range(5000):
+        temp = 25 + rng.uniform(-3, 3)
+        temps.append(temp)
+        rolling.add({"temp": temp, "hum": 60, "pir": 1}, timestamp=start + i * 2)
+
+    stats = rolling.stats('temp', now=start + 5000 * 2)
+    assert stats["count"] == len(temps)
+    assert abs(stats["mean"] - statistics.fmean(temps)) < 1e-9
+    assert abs(stats["variance"] - statistics.pvariance(temps)) < 1e-9
+    assert stats["min"] == min(temps)
+    assert stats["max"] == max(temps)
+    assert rolling.stats('ldr') is None
+
+
+def test_old_buckets_expire_and_memory_stays_bounded():
+    rolling = RollingStats(window_hours=24)
+    hour = 3600
+    for h in range(72):
+        rolling.add({"temp": 10.0 if h < 48 else 30.0}, timestamp=h * hour)
+
+    assert len(rolling.buckets) <= 24
+    stats = rolling.stats('temp', now=71 * hour)
+    assert stats["count"] == 24
+    assert stats["mean"] == 30.0
+
+
+def test_seeded_buckets_merge_with_live_samples():
+    rng = random.Random(5)
+    history = [20 + rng.uniform(0, 10) for _ in range(100)]
+    live = [20 + rng.uniform(0, 10) for _ in range(50)]
+
+    rolling = RollingStats(window_hours=24)
+    # As returned by the grouped query: COUNT, AVG, VAR_POP, MIN, MAX
+    row = [len(history), statistics.fmean(history), statistics.pvariance(history), min(history), max(history)]
+    rolling.seed_bucket(0, sensor_aggregates.parse_stats(row, ("temp",)))
+    for value in live:
+        rolling.add({"temp": value}, timestamp=100)
+
+    stats = rolling.stats('temp', now=100)
+    assert stats["count"] == 150
+    assert abs(stats["mean"] - statistics.fmean(history + live)) < 1e-9
+    assert abs(stats["variance"] - statistics.pvariance(history + live)) < 1e-9
+
+
+def test_bucket_query_is_grouped_and_parameterized():
+    query = sensor_aggregates.bucketed_stats_query()
+    assert "GROUP BY bucket" in query
+    assert query.count("%s") == 2
+    assert "?" not in query
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQL-side sensor aggregate helpers
+"""
+
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import sensor_aggregates
+
+
+def test_window_query_returns_one_row_of_aggregates():
+    query = sensor_aggregates.window_stats_query()
+    assert "GROUP BY" not in query
+    # Reads the typed generated columns instead of parsing value_json
+    assert "value_json" not in query
+    assert "AVG(temp)" in query
+    for function in ("COUNT(", "AVG(", "VAR_POP(", "MIN(", "MAX("):
+        assert query.count(function) == len(sensor_aggregates.FIELDS)
+    assert query.count("%s") == 1
+
+
+def test_hour_of_day_query_groups_by_hour():
+    query = sensor_aggregates.hour_of_day_stats_query(("temp",))
+    assert "HOUR(recorded_at) AS hour_of_day" in query
+    assert "GROUP BY hour_of_day" in query
+    assert "INTERVAL %s DAY" in query
+
+
+def test_parse_stats_converts_decimals_and_skips_empty_fields():
+    # temp has values, hum has none, ldr has a single value (VAR_POP 0)
+    row = [Decimal(10), Decimal("24.5"), Decimal("4.0"), Decimal("21.0"), Decimal("28.0"),
+           0, None, None, None, None,
+           1, Decimal("300"), Decimal("0"), Decimal("300"), Decimal("300")]
+    stats = sensor_aggregates.parse_stats(row)
+
+    assert set(stats) == {"temp", "ldr"}
+    assert stats["temp"] == {"count": 10, "mean": 24.5, "variance": 4.0, "stddev": 2.0, "min": 21.0, "max": 28.0}
+    assert stats["ldr"]["stddev"] == 0.0
+
+
+def test_rollup_reads_pick_the_bucket_size_and_merge_exactly():
+    assert sensor_aggregates.rollup_for_hours(24) == "minute"
+    assert sensor_aggregates.rollup_for_hours(24 * 7) == "hour"
+
+    query = sensor_aggregates.rollup_window_stats_query(("temp",))
+    assert "FROM sensor_rollup_hour" in query
+    # Mean weighted by bucket counts, variance from E[x^2] - mean^2
+    assert "SUM(temp_avg * temp_count) / SUM(temp_count)" in query
+    assert "SUM(temp_count * (temp_var + temp_avg * temp_avg))" in query
+
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact sensor codec
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import sensor_codec
+
+
+def test_round_trip_keeps_schema_fields():
+    sample = {"temp": -3.4, "hum": 61.2, "ldr": 312, "pir": 1, "ir": 0, "timestamp": 1760000000.25,
+              "source": "hardware_machine", "hardware_ip": "192.168.1.50", "pattern_based": True,
+              "trace": {"id": "x"}}
+    encoded = sensor_codec.encode(sample)
+    assert len(encoded) == 19 and encoded[0] == sensor_codec.SCHEMA_V1
+
+    decoded = sensor_codec.decode(encoded)
+    assert decoded == {"temp": -3.4, "hum": 61.2, "ldr": 312, "pir": 1, "ir": 0, "timestamp": 1760000000.25,
+                       "source": "hardware_machine", "hardware_ip": "192.168.1.50", "pattern_based": True}
+
+
+def test_missing_fields_stay_missing():
+    decoded = sensor_codec.decode(sensor_codec.encode({"pir": 0, "ir": 1, "timestamp": 5}))
+    assert decoded == {"pir": 0, "ir": 1, "timestamp": 5.0}
+
+
+def test_unrepresentable_samples_and_unknown_schemas_raise():
+    with pytest.raises(ValueError):
+        sensor_codec.encode({"ldr": -1})
+    with pytest.raises(ValueError):
+        sensor_codec.encode({"source": "somewhere_else"})
+    with pytest.raises(ValueError):
+        sensor_codec.decode(b"\x02" + bytes(14))
+
+
+def test_decode_message_accepts_both_formats():
+    sample = {"temp": 25.0, "pir": 1, "ir": 0, "timestamp": 1}
+    assert sensor_codec.decode_message("esp/sensors", json.dumps(sample).encode()) == ("esp/sensors", sample)
+    topic, data = sensor_codec.decode_message("esp/sensors/bin", sensor_codec.encode(sample))
+    assert topic == "esp/sensors" and data == {"temp": 25.0, "pir": 1, "ir": 0, "timestamp": 1.0}
+
+
+def test_duplicate_filter_drops_the_copy_in_the_other_encoding():
+    duplicates = sensor_codec.DuplicateFilter()
+    sample = {"temp": 21.5, "pir": 1, "ir": 0, "timestamp": 1760000000.4567}
+    compact = sensor_codec.decode(sensor_codec.encode(sample))
+
+    assert not duplicates.duplicate("esp/sensors", sample)
+    assert duplicates.duplicate("esp/sensors/bin", compact)
+    # A repeat on the same topic, or a later sample, is a new message
+    assert not duplicates.duplicate("esp/sensors/bin", compact)
+    assert not duplicates.duplicate("esp/sensors", dict(sample, timestamp=1760000002.4567))
+    assert not duplicates.duplicate("esp/sensors", {"temp": 20})
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched sensor ingest service
+"""
+
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import sensor_codec
+import sensor_ingest
+
+
+class BatchConnection:
+    """Stands in for a pooled mysql.connector connection, recording executemany batches"""
+
+    def __init__(self, batches, fail=False):
+        self.batches = batches
+        self.fail = fail
+
+    def cursor(self):
+        return self
+
+    def executemany(self, query, rows):
+        if self.fail:
+            raise ConnectionError("MySQL unavailable")
+        self.batches.append(list(rows))
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_flush_writes_in_batch_size_chunks(tmp_path):
+    batches = []
+    ingest = sensor_ingest.SensorIngest(lambda: BatchConnection(batches), batch_size=2,
+                                        spill=sensor_ingest.SpillFile(str(tmp_path / "spill.jsonl")))
+    for i in range(5):
+        ingest.submit("esp/sensors", json.dumps({"temp": 20 + i}), received_at=1000 + i)
+    ingest.submit("esp/status", b"online")  # not a JSON object
+
+    assert ingest.flush() == 5
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0][0] == ("esp/sensors", '{"temp": 20}', 1000)
+    assert ingest.stats["skipped"] == 1
+
+
+def test_failed_flush_spills_and_replays_first(tmp_path):
+    spill = sensor_ingest.SpillFile(str(tmp_path / "spill.jsonl"))
+    batches = []
+    connection = BatchConnection(batches, fail=True)
+    ingest = sensor_ingest.SensorIngest(lambda: connection, spill=spill)
+
+    ingest.submit("esp/sensors", '{"temp": 1}', received_at=1)
+    assert ingest.flush() == 0
+    assert spill.load() == [("esp/sensors", '{"temp": 1}', 1)]
+
+    connection.fail = False
+    ingest.submit("esp/sensors", '{"temp": 2}', received_at=2)
+    assert ingest.flush() == 2
+    assert [row[2] for row in batches[0]] == [1, 2]
+    assert spill.load() == []
+    assert ingest.stats["replayed_rows"] == 1
+
+
+def test_stop_flushes_buffered_rows(tmp_path):
+    batches = []
+    ingest = sensor_ingest.SensorIngest(lambda: BatchConnection(batches), flush_interval=60,
+                                        spill=sensor_ingest.SpillFile(str(tmp_path / "spill.jsonl")))
+    ingest.start()
+    ingest.submit("home/sensors/fan", '{"state": "on"}')
+    ingest.stop()
+    assert ingest.stats["rows_written"] == 1
+
+
+def test_compact_samples_are_stored_as_esp_sensors(tmp_path):
+    batches = []
+    ingest = sensor_ingest.SensorIngest(lambda: BatchConnection(batches),
+                                        spill=sensor_ingest.SpillFile(str(tmp_path / "spill.jsonl")))
+    ingest.submit("esp/sensors/bin", sensor_codec.encode({"temp": 21.5, "pir": 1, "timestamp": 7}), received_at=7)
+    ingest.flush()
+    topic, value_json, _ = batches[0][0]
+    assert topic == "esp/sensors"
+    assert json.loads(value_json)["temp"] == 21.5
+
+
+def test_subscribes_to_the_backend_topics():
+    server = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'server.js')
+    with open(server, encoding="utf-8") as f:
+        source = f.read()
+    subscribed = re.search(r"mqttClient\.subscribe\(\[([^\]]*)\]", source).group(1)
+    assert tuple(re.findall(r"'([^']+)'", subscribed)) == sensor_ingest.INGEST_TOPICS
+
+
+def test_stores_what_the_backend_stores():
+    stored = {
+        ("fridge/inventory", '{"items": [], "timestamp": "t"}'): '{"items": [], "timestamp": "t"}',
+        ("device/boot", '{"device": "master"}'): '{"device": "master"}',
+        ("esp/sensors", '[1, 2]'): '[1, 2]',
+        ("esp/cam", 'null'): 'null',
+        ("home/control", '{"light": "on"}'): '{"light": "on"}',
+    }
+    for (topic, payload), value_json in stored.items():
+        assert sensor_ingest.parse_payload(topic, payload.encode()) == (topic, value_json)
+
+    skipped = [("esp/status", '{"status": "online"}'), ("esp/node/debug", '{"x": 1}'),
+               ("esp/switch/fan", '{"state": "on"}'), ("esp/button/1", '{"pressed": 1}'),
+               ("esp/water_level", '{"level": 40}'), ("home/sensors/water-motor", '{"state": "on"}'),
+               ("home/control", '{"cmd": "water-motor on"}'), ("esp/log", '[I] booted'),
+               ("esp/sensors", '23.5'), ("esp/sensors", 'ON')]
+    for topic, payload in skipped:
+        assert sensor_ingest.parse_payload(topic, payload.encode())[1] is None, topic
+
+
+def test_sample_sent_in_both_encodings_is_stored_once(tmp_path):
+    batches = []
+    ingest = sensor_ingest.SensorIngest(lambda: BatchConnection(batches),
+                                        spill=sensor_ingest.SpillFile(str(tmp_path / "spill.jsonl")))
+    sample = {"temp": 21.5, "pir": 1, "ir": 1, "timestamp": 1760000000.25}
+    ingest.submit("esp/sensors", json.dumps(sample).encode(), received_at=1)
+    ingest.submit("esp/sensors/bin", sensor_codec.encode(sample), received_at=1)
+    ingest.flush()
+    assert len(batches[0]) == 1
+    assert ingest.stats["duplicates"] == 1
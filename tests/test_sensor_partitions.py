@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the sensors partition and retention manager
+"""
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'setup'))
+import manage_sensor_partitions as partitions
+
+
+def test_partition_months_cover_history_and_future():
+    months = partitions.partition_months(date(2025, 11, 17), date(2026, 1, 5), ahead=2)
+    assert [partitions.partition_name(month) for month in months] == [
+        "p202511", "p202512", "p202601", "p202602", "p202603"
+    ]
+    assert "UNIX_TIMESTAMP('2026-01-01')" in partitions.partition_clause(date(2025, 12, 1))
+
+
+def test_expired_keeps_catch_all_and_recent_partitions():
+    existing = [("p202507", 100), ("p202508", 200), ("p202509", 300), ("pmax", None)]
+    assert partitions.expired(existing, cutoff_epoch=200) == [("p202507", 100), ("p202508", 200)]
+
+
+def test_rollup_chunks_cover_partition_without_gaps():
+    first, lower, upper = 3600 * 10 + 90, 3600 * 10, 3600 * 80
+    for granularity in ("minute", "hour"):
+        ranges = [(start, end) for g, start, end in partitions.rollup_chunks(first, lower, upper) if g == granularity]
+        assert ranges[0][0] <= first and ranges[-1][1] == upper
+        assert all(previous[1] == current[0] for previous, current in zip(ranges, ranges[1:]))
+
+
+def test_rollup_chunks_keep_buckets_split_by_half_hour_bounds_whole():
+    # Month starts at +05:30 fall on the half hour
+    lower, upper = 3600 * 10 + 1800, 3600 * 80 + 1800
+    hours = [(start, end) for g, start, end in partitions.rollup_chunks(lower, lower, upper) if g == "hour"]
+    # The 10:00 bucket was built before the previous partition was dropped; 80:00 still has rows in the next one
+    assert hours[0][0] == 3600 * 11
+    assert hours[-1][1] == 3600 * 81
+    minutes = [(start, end) for g, start, end in partitions.rollup_chunks(lower, lower, upper) if g == "minute"]
+    assert minutes[0][0] == lower and minutes[-1][1] == upper
+
+
+def test_month_of_partition_name():
+    assert partitions.month_of("p202511") == date(2025, 11, 1)
+
+
+def test_estimated_depth_grows_with_leaf_pages():
+    assert partitions.estimated_depth(1, 1) == 1
+    # ~100 keys per internal page: 10,000 leaves need two internal levels
+    assert partitions.estimated_depth(10101, 10000) == 3
+    assert partitions.estimated_depth(101, 100) == 2
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the minute/hour sensor rollup job
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import sensor_rollup
+
+
+class RecordingConnection:
+    """Stands in for a mysql.connector connection, recording statements"""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.rowcount = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params):
+        self.statements.append((query, params))
+
+    def close(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_rollup_query_upserts_every_rollup_column():
+    query = sensor_rollup.rollup_query("minute", 1)
+    assert "INSERT INTO sensor_rollup_minute" in query
+    assert "GROUP BY topic, bucket_start" in query
+    for column in sensor_rollup.ROLLUP_COLUMNS:
+        assert f"{column} = VALUES({column})" in query
+    # topic, start and end placeholders
+    assert query.count("%s") == 3
+
+
+def test_refresh_reaggregates_previous_and_current_bucket():
+    connection = RecordingConnection()
+    now = 10 * 3600 + 125  # 10:02:05
+    sensor_rollup.refresh(connection, now=now)
+
+    ranges = {query.split()[2]: params[1:] for query, params in connection.statements}
+    assert ranges["sensor_rollup_minute"] == (10 * 3600 + 60, now + 1)
+    assert ranges["sensor_rollup_hour"] == (9 * 3600, now + 1)
+    assert connection.commits == 2
+
+
+def test_backfill_walks_history_in_chunks():
+    connection = RecordingConnection()
+    now = 100 * 3600
+    sensor_rollup.backfill(connection, hours=72, now=now)
+
+    hour_ranges = [params[1:] for query, params in connection.statements if "sensor_rollup_hour" in query]
+    assert hour_ranges[0][0] == now - 72 * 3600
+    assert hour_ranges[-1][1] == now + 1
+    assert len(hour_ranges) == 3
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for shelf zone cropping and per-zone detection counts
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import shelf_zones
+from shelf_zones import Zone
+
+ZONES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'features', 'fridge_zones.json')
+
+
+def test_triangle_crop_greys_out_pixels_outside_polygon():
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    zone = Zone("door", [(0.5, 0), (1, 0), (1, 1)])  # upper-right triangle
+
+    crop, origin = zone.crop(frame)
+    assert origin == (100, 0) and crop.shape == (100, 100, 3)
+    assert crop[0, 99].tolist() == [0, 0, 0]  # inside, top-right corner
+    assert crop[99, 0].tolist() == [shelf_zones.MASK_VALUE] * 3  # outside, bottom-left corner
+
+
+def test_detections_are_batched_mapped_to_frame_and_counted_per_zone():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    zones = [Zone("shelf", [(0, 0), (0.5, 0), (0.5, 1), (0, 1)]),
+             Zone("door", [(0.5, 0), (1, 0), (1, 1), (0.5, 1)])]
+    calls = []
+
+    def infer(crops):
+        calls.append([crop.shape for crop in crops])
+        return [[("egg", 0.9, (10, 10, 20, 20)), ("egg", 0.8, (30, 10, 40, 20))],
+                [("bottle", 0.7, (5, 100, 25, 200))]]
+
+    found = shelf_zones.detect_in_zones(frame, zones, infer)
+    assert calls == [[(480, 320, 3), (480, 320, 3)]]  # one batched call
+    assert found["door"] == [("bottle", 0.7, (325, 100, 345, 200))]
+    assert shelf_zones.count_by_zone(found) == {"shelf": {"egg": 2}, "door": {"bottle": 1}}
+
+
+def test_detection_centred_outside_polygon_is_dropped():
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    zone = Zone("crisper", [(0, 0), (1, 0), (0, 1)])  # lower-right half is outside
+    found = shelf_zones.detect_in_zones(frame, [zone], lambda crops: [[("apple", 0.9, (80, 80, 95, 95))]])
+    assert found == {"crisper": []}
+
+
+def test_zone_config_and_whole_frame_fallback():
+    with open(ZONES_FILE) as f:
+        names = [zone["name"] for zone in json.load(f)["default"]]
+    assert [zone.name for zone in shelf_zones.load_zones(ZONES_FILE)] == names
+
+    (whole,) = shelf_zones.load_zones(None)
+    assert whole.bounds(640, 480) == (0, 0, 640, 480)
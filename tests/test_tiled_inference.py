@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for tiled inference and cross-tile NMS
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+import shelf_zones
+import tiled_inference
+from tiled_inference import Tiling
+
+
+def test_tiles_overlap_and_cover_the_image():
+    boxes = tiled_inference.tile_boxes(640, 480, size=320, overlap=0.25)
+    assert boxes[0] == (0, 0, 320, 320) and boxes[-1] == (320, 160, 640, 480)
+    assert {x0 for x0, _, _, _ in boxes} == {0, 240, 320}
+    assert tiled_inference.tile_boxes(200, 100, size=320) == [(0, 0, 200, 100)]
+    assert Tiling(320).tiles(np.zeros((100, 200, 3), np.uint8)) == []
+
+
+def test_nms_drops_duplicates_and_cut_fragments_per_class():
+    detections = [
+        ("egg", 0.9, (100, 100, 140, 150)),
+        ("egg", 0.6, (102, 101, 141, 149)),   # same egg seen by a neighbouring tile
+        ("egg", 0.5, (100, 100, 115, 150)),   # fragment cut at a tile edge
+        ("egg", 0.8, (150, 100, 190, 150)),   # the next egg in the carton
+        ("cup", 0.7, (100, 100, 140, 150)),   # other class, same place
+    ]
+    kept = tiled_inference.nms(detections)
+    assert [(label, confidence) for label, confidence, _ in kept] == [("egg", 0.9), ("egg", 0.8), ("cup", 0.7)]
+
+
+def test_tiled_zone_batches_tiles_and_only_adds_configured_classes():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    zone = shelf_zones.Zone("shelf", [(0, 0), (1, 0), (1, 1), (0, 1)], Tiling(320, 0.25, classes=["egg"]))
+    sizes = []
+
+    def infer(images):
+        sizes.append(len(images))
+        full = [("bottle", 0.9, (500, 50, 600, 300))]
+        tiles = [[("egg", 0.7, (10, 10, 30, 30)), ("bottle", 0.4, (5, 5, 50, 50))] for _ in images[1:]]
+        return [full] + tiles
+
+    found = shelf_zones.detect_in_zones(frame, [zone], infer)
+    tiles = len(tiled_inference.tile_boxes(640, 480, 320, 0.25))
+    assert sizes == [1 + tiles]  # full crop and every tile in one forward pass
+    labels = [label for label, _, _ in found["shelf"]]
+    assert labels.count("bottle") == 1 and labels.count("egg") == tiles
+    assert ("egg", 0.7, (330, 170, 350, 190)) in found["shelf"]  # last tile origin (320, 160)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the trigger dispatcher used by the face recognizers
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'core'))
+from trigger_dispatcher import TriggerDispatcher
+
+
+def test_duplicate_triggers_are_coalesced_while_in_flight():
+    dispatcher = TriggerDispatcher(workers=1, name="test")
+    dispatcher.start()
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def capture(reason):
+        runs.append(reason)
+        started.set()
+        release.wait(2)
+
+    assert dispatcher.submit("camera", capture, "motion")
+    assert started.wait(2)
+    assert not dispatcher.submit("camera", capture, "motion")
+    assert not dispatcher.submit("camera", capture, "server")
+    release.set()
+    dispatcher.stop(timeout=2)
+
+    metrics = dispatcher.get_metrics()
+    assert runs == ["motion"]
+    assert metrics["submitted"] == 1
+    assert metrics["coalesced"] == 2
+    assert metrics["executed"] == 1
+    assert metrics["queue_depth"] == 0
+
+
+def test_submit_returns_immediately_and_failures_are_counted():
+    dispatcher = TriggerDispatcher(workers=2, name="test")
+    dispatcher.start()
+    release = threading.Event()
+
+    def slow():
+        release.wait(2)
+
+    def broken():
+        raise RuntimeError("camera not accessible")
+
+    assert dispatcher.submit("camera", slow)
+    started = time.monotonic()
+    assert dispatcher.submit("other", broken)
+    assert not dispatcher.submit("camera", slow)
+    assert time.monotonic() - started < 0.1
+    assert dispatcher.is_busy("camera")
+    release.set()
+    dispatcher.stop(timeout=2)
+
+    metrics = dispatcher.get_metrics()
+    assert metrics["executed"] == 1
+    assert metrics["failed"] == 1
+    assert not dispatcher.is_busy("camera")
+    assert metrics["wait_max_ms"] >= 0
+
+
+def test_coalesced_triggers_are_handed_to_the_running_job():
+    dispatcher = TriggerDispatcher(workers=1, name="test")
+    dispatcher.start()
+    started = threading.Event()
+    release = threading.Event()
+    answered = []
+
+    def capture(reason):
+        started.set()
+        release.wait(2)
+        answered.append(reason)
+        answered.extend(merged['args'][0] for merged in dispatcher.pop_merged("camera"))
+
+    assert dispatcher.submit("camera", capture, "motion_detection")
+    assert started.wait(2)
+    assert not dispatcher.submit("camera", capture, "server_command")
+    release.set()
+    dispatcher.stop(timeout=2)
+
+    assert answered == ["motion_detection", "server_command"]
+    assert dispatcher.get_metrics()["coalesced"] == 1
+
+
+def test_triggers_after_pop_merged_start_a_new_job():
+    dispatcher = TriggerDispatcher(workers=1, name="test")
+    dispatcher.start()
+    popped = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def capture(reason):
+        runs.append(reason)
+        dispatcher.pop_merged("camera")
+        popped.set()
+        release.wait(2)
+
+    assert dispatcher.submit("camera", capture, "first")
+    assert popped.wait(2)
+    assert dispatcher.submit("camera", capture, "second")
+    release.set()
+    dispatcher.stop(timeout=2)
+
+    assert runs == ["first", "second"]
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for the YOLO fridge detector's headless scan bookkeeping
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python', 'features'))
+import yolo_fridge_detection
+
+
+def detector_with_scans(scans, updates):
+    detector = yolo_fridge_detection.YOLOFridgeDetector(headless=True)
+    detector.scan_items = lambda frame=None: scans.pop(0)
+    detector.update_backend = lambda item, quantity, absolute=False: updates.append((item, quantity, absolute))
+    return detector
+
+
+def test_periodic_scans_set_changed_counts_only():
+    updates = []
+    detector = detector_with_scans([{"apple": 3}, {"apple": 3}, {"apple": 2, "cup": 1}, {}], updates)
+    for _ in range(4):
+        detector.scan_and_report(absolute=True)
+
+    assert updates == [("apple", 3, True), ("apple", 2, True), ("cup", 1, True),
+                       ("apple", 0, True), ("cup", 0, True)]
+    assert detector.detected_items == {}
+
+
+def test_manual_scan_adds_what_it_sees():
+    updates = []
+    detector = detector_with_scans([{"apple": 3}, {"apple": 3}], updates)
+    detector.scan_and_report()
+    detector.scan_and_report()
+
+    assert updates == [("apple", 3, False), ("apple", 3, False)]